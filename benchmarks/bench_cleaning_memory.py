@@ -0,0 +1,81 @@
+"""
+Пиковая память цепочки очистки из GUI (пропуски -> дубликаты -> кодирование -> масштабирование):
+обычный режим DataCleaner (копия на каждом шаге) против ``DataCleaner(inplace=True)``.
+Память numpy/pandas считается через tracemalloc; пик (данные + временные массивы) сравнивается
+с max(вход, выход) — one-hot сам по себе делает результат больше входа.
+
+    python benchmarks/bench_cleaning_memory.py --rows 2000000 --num-cols 10 --cat-cols 3
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_cleaner import DataCleaner  # noqa: E402
+
+
+def make_frame(rows, num_cols, cat_cols, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(num_cols):
+        col = rng.normal(size=rows)
+        col[rng.random(rows) < 0.05] = np.nan
+        data[f"num_{i}"] = col
+    for i in range(cat_cols):
+        data[f"cat_{i}"] = pd.Categorical(rng.choice(["a", "b", "c", "d"], size=rows))
+    data["flag"] = rng.integers(0, 2, size=rows)
+    return pd.DataFrame(data)
+
+
+def run_chain(df, inplace):
+    cleaner = DataCleaner(inplace=inplace)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = cleaner.handle_missing_values(df, strategy="mean")
+        df = cleaner.drop_duplicates(df)
+        df = cleaner.encode_categorical(df, method="onehot")
+        df = cleaner.scale_numeric(df, method="standard")
+    return df
+
+
+def measure(args, inplace):
+    df = make_frame(args.rows, args.num_cols, args.cat_cols)
+    base = df.memory_usage(deep=True).sum()
+    tracemalloc.start()
+    # df создан до start(): его память учитываем отдельно как base
+    t0 = time.perf_counter()
+    out = run_chain(df, inplace)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del df
+    return base, base + peak, out.memory_usage(deep=True).sum(), elapsed, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--num-cols", type=int, default=10)
+    parser.add_argument("--cat-cols", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for name, inplace in (("копии", False), ("inplace", True)):
+        base, peak, size_out, elapsed, out = measure(args, inplace)
+        results[name] = out
+        print(f"{name:>8}: вход {base / 2**20:7.1f} МБ, выход {size_out / 2**20:7.1f} МБ, "
+              f"пик {peak / 2**20:7.1f} МБ ({peak / max(base, size_out):4.2f}x от большего), {elapsed:6.2f} с")
+
+    a, b = results["копии"], results["inplace"]
+    pd.testing.assert_frame_equal(a, b[a.columns], check_dtype=False)
+    print("Результаты совпадают.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Сравнение pd.read_sql_query и COPY TO STDOUT (DataLoader._copy_query) на локальном PostgreSQL.
+
+Запуск (нужен доступный сервер, например docker run -e POSTGRES_PASSWORD=postgres -p 5432:5432 postgres):
+    python benchmarks/bench_postgres_copy.py --rows 1000000
+Параметры подключения берутся из аргументов или переменных PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_loader import DataLoader  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PGPORT", 5432)))
+    parser.add_argument("--database", default=os.environ.get("PGDATABASE", "postgres"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "postgres"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "postgres"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with DataLoader() as loader:
+        engine = loader._get_engine(args.host, args.port, args.database, args.user, args.password)
+        rng = np.random.default_rng(0)
+        pd.DataFrame({
+            "id": np.arange(args.rows),
+            "value": rng.normal(size=args.rows),
+            "category": rng.choice(["a", "b", "c", "d"], size=args.rows),
+            "amount": rng.integers(0, 10_000, size=args.rows),
+        }).to_sql("bench_copy", engine, if_exists="replace", index=False, chunksize=100_000)
+
+        query = "SELECT * FROM bench_copy"
+        for name, load in [
+            ("read_sql_query", lambda: pd.read_sql_query(query, engine)),
+            ("COPY TO STDOUT", lambda: DataLoader._copy_query(engine, query)),
+        ]:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                df = load()
+                times.append(time.perf_counter() - start)
+            print(f"{name:>15}: {min(times):.3f} с (лучшее из {args.repeat}), строк: {len(df)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Сравнение прежней валидации (цикл по столбцам: dropna, два quantile, scipy.stats.zscore)
+с однопроходным numeric_profile из data_validator.
+
+    python benchmarks/bench_validation.py --rows 10000000 --cols 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_validator import numeric_profile  # noqa: E402
+
+
+def legacy_outliers(df):
+    result = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        col_data = df[col].dropna()
+        q1, q3 = col_data.quantile(0.25), col_data.quantile(0.75)
+        iqr = q3 - q1
+        outliers_iqr = ((col_data < (q1 - 1.5 * iqr)) | (col_data > (q3 + 1.5 * iqr))).sum()
+        outliers_z = (np.abs(stats.zscore(col_data)) > 3).sum()
+        result[col] = (int(outliers_iqr), int(outliers_z))
+    return result
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--nan-share", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = rng.standard_t(5, size=(args.rows, args.cols))
+    data[rng.random(data.shape) < args.nan_share] = np.nan
+    df = pd.DataFrame(data, columns=[f"c{i}" for i in range(args.cols)])
+
+    t_old, old = best_of(lambda: legacy_outliers(df), args.repeat)
+    t_new, new = best_of(lambda: numeric_profile(df), args.repeat)
+    same = all(old[c] == (new[c]["iqr_outliers"], new[c]["z_outliers"]) for c in old)
+    print(f"rows={args.rows} cols={args.cols}")
+    print(f"  прежняя реализация: {t_old:.3f} с")
+    print(f"  numeric_profile:    {t_new:.3f} с  (x{t_old / t_new:.1f}), результаты совпадают: {same}")
+
+
+if __name__ == "__main__":
+    main()
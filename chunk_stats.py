@@ -0,0 +1,487 @@
+import numpy as np
+import pandas as pd
+
+
+def is_chunk_stream(obj) -> bool:
+    """Проверка, что объект — поток чанков (итератор DataFrame), а не один DataFrame."""
+    return not isinstance(obj, (pd.DataFrame, pd.Series, str, bytes, dict)) and hasattr(obj, "__iter__")
+
+
+_HASH_PRIME = np.uint64(0x100000001B3)
+
+
+def _column_hashes(col: pd.Series) -> np.ndarray:
+    # Для строк с малым числом уникальных значений дешевле хэшировать категории,
+    # для почти уникальных (id, текст) — каждое значение напрямую
+    categorize = True
+    if col.dtype == object or isinstance(col.dtype, pd.StringDtype):
+        sample = col.iloc[:10_000]
+        categorize = sample.nunique(dropna=False) <= 0.5 * len(sample)
+    return pd.util.hash_pandas_object(col, index=False, categorize=categorize).to_numpy(dtype=np.uint64)
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-битный хэш каждой строки (без учёта индекса); одинаковые строки дают одинаковый хэш в любом чанке."""
+    h = np.zeros(len(df), dtype=np.uint64)
+    for _, col in df.items():
+        h ^= _column_hashes(col)
+        h *= _HASH_PRIME
+        h ^= h >> np.uint64(29)
+    return h
+
+
+def _values_differ(col: pd.Series, rows: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """
+    Попарное сравнение значений строк ``rows`` и ``reps`` с учётом пропусков: два пропуска равны,
+    пропуск и значение — различны, ``!=`` применяется только к парам без пропусков (иначе pd.NA
+    в string/nullable-столбцах даёт «boolean value of NA is ambiguous»).
+    """
+    na = col.isna().to_numpy()
+    row_na, rep_na = na[rows], na[reps]
+    differ = row_na != rep_na
+    both = np.flatnonzero(~(row_na | rep_na))
+    if both.size:
+        values = col.array
+        differ[both] = np.asarray(values.take(rows[both]) != values.take(reps[both]), dtype=bool)
+    return differ
+
+
+def duplicated_rows(df: pd.DataFrame, subset=None, keep="first", exact: bool = True) -> np.ndarray:
+    """
+    Маска дубликатов строк, как ``df.duplicated(subset, keep)``, но через 64-битные хэши строк.
+
+    Каждая строка хэшируется один раз; дальше — одна сортировка uint64 вместо факторизации
+    всех столбцов, что заметно быстрее и экономнее на широких таблицах с object-столбцами.
+    При ``exact`` строки с совпавшими хэшами дополнительно сравниваются по значениям
+    (только они, обычно малая доля), так что коллизии хэшей не дают ложных дубликатов.
+    """
+    if keep not in ("first", "last", False):
+        raise ValueError("keep должен быть 'first', 'last' или False")
+    if subset is not None:
+        subset = [subset] if isinstance(subset, str) else list(subset)
+        missing = [col for col in subset if col not in df.columns]
+        if missing:
+            raise KeyError(f"Нет столбцов для поиска дубликатов: {missing}")
+        df = df[subset]
+    n = len(df)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    h = row_hashes(df)
+    order = np.argsort(h, kind="stable")
+    hs = h[order]
+    same_prev = np.concatenate(([False], hs[1:] == hs[:-1]))
+    same_next = np.concatenate((hs[1:] == hs[:-1], [False]))
+    if keep == "first":
+        dup_sorted = same_prev
+    elif keep == "last":
+        dup_sorted = same_next
+    else:
+        dup_sorted = same_prev | same_next
+    mask = np.zeros(n, dtype=bool)
+    mask[order] = dup_sorted
+
+    if exact and mask.any():
+        # Каждая строка группы с одинаковым хэшем сравнивается с первой строкой группы;
+        # настоящие коллизии (крайне редкие) перепроверяются через DataFrame.duplicated
+        group_start = np.maximum.accumulate(np.where(same_prev, 0, np.arange(n)))
+        rows, reps = order[same_prev], order[group_start[same_prev]]
+        equal = np.ones(rows.size, dtype=bool)
+        for _, col in df.items():
+            equal &= ~_values_differ(col, rows, reps)
+        if not equal.all():
+            bad_groups = np.unique(group_start[same_prev][~equal])
+            suspect = np.sort(order[np.isin(group_start, bad_groups)])
+            mask[suspect] = df.iloc[suspect].duplicated(keep=keep).to_numpy()
+    return mask
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Уникальные значения через сортировку (для uint64 быстрее хэш-варианта np.unique)."""
+    values = np.sort(values)
+    if values.size:
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+    return values
+
+
+def sorted_contains(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Маска: какие ``values`` есть в отсортированном массиве ``sorted_values``."""
+    if sorted_values.size == 0:
+        return np.zeros(len(values), dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_values, values), sorted_values.size - 1)
+    return sorted_values[idx] == values
+
+
+class SortedRuns:
+    """
+    Множество 64-битных хэшей в виде отсортированных серий (как уровни LSM-дерева): новые значения
+    добавляются отдельной серией, и последние серии сливаются, пока предыдущая не больше чем вдвое
+    длиннее следующей. Поэтому каждый хэш пересортировывается O(log n) раз за весь поток, а не заново
+    на каждом чанке, и серий всегда O(log n) — проверка вхождения остаётся векторной (searchsorted).
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def contains(self, values: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(values), dtype=bool)
+        for run in self.runs:
+            mask |= sorted_contains(run, values)
+        return mask
+
+    def add(self, values: np.ndarray):
+        """Добавление значений, которых ещё нет в множестве (без повторов между собой)."""
+        if not len(values):
+            return
+        self.runs.append(np.sort(values))
+        self.size += len(values)
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            tail = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], tail]))
+
+
+class KLLSketch:
+    """
+    Квантильный скетч KLL (Karnin–Lang–Liberty) для потока чисел.
+
+    Память — O(k·log(n/k)) значений. Ошибка ранга любого квантиля с высокой вероятностью
+    не превышает ~1.7/k от числа значений (k=400 — около 0.4%). Скетчи объединяются
+    ``merge`` без потери точности гарантий, поэтому чанки можно обрабатывать независимо.
+    """
+
+    def __init__(self, k: int = 400, seed: int = 42):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        return 1.7 / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # При нечётном размере одно значение остаётся на текущем уровне
+                keep = items[:1] if items.size % 2 else items[:0]
+                pairs = items[keep.size:]
+                promoted = pairs[self.rng.integers(0, 2)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, qs):
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        values, cum = self._weighted()
+        # Интерполяция между соседними значениями, как в Series.quantile
+        pos = qs * (cum[-1] - 1)
+        ranks = cum - 1
+        lo = np.clip(np.searchsorted(ranks, pos, side="right") - 1, 0, len(values) - 1)
+        hi = np.clip(lo + 1, 0, len(values) - 1)
+        span = np.where(ranks[hi] > ranks[lo], ranks[hi] - ranks[lo], 1.0)
+        frac = np.clip((pos - ranks[lo]) / span, 0.0, 1.0)
+        return values[lo] + (values[hi] - values[lo]) * frac
+
+    def rank(self, x: float, inclusive: bool = False) -> float:
+        """Оценка числа значений < x (или <= x при ``inclusive``)."""
+        if self.n == 0:
+            return 0.0
+        values, cum = self._weighted()
+        idx = np.searchsorted(values, x, side="right" if inclusive else "left")
+        return float(cum[idx - 1]) if idx > 0 else 0.0
+
+
+class HyperLogLog:
+    """
+    Оценка числа различных 64-битных хэшей. 2**p регистров по байту;
+    стандартная относительная ошибка 1.04/sqrt(2**p) (p=14 — около 0.8%).
+    """
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = (hashes << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        # Число ведущих нулей + 1 через показатель степени float64 (frexp)
+        _, exp = np.frexp(rest.astype(np.float64))
+        rho = (65 - exp).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+        return self
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+
+class ChunkStats:
+    """
+    Накопитель статистик по потоку чанков; два накопителя объединяются ``merge``.
+
+    Точно: число строк, пропуски, среднее и дисперсия (Welford/Chan), min/max, корреляция
+    (центрированные co-моменты по попарно-полным строкам, слияние по Чану). Приближённо: квартили и медиана — скетч KLL (ошибка ранга
+    ~``1.7/sketch_k``), число выбросов по IQR/Z-оценке — через ранги в скетче (ошибка
+    не больше ~``2·1.7/sketch_k`` от числа значений столбца). Дубликаты считаются точно
+    по 64-битным хэшам строк, пока различных строк не больше ``max_exact_rows``; дальше —
+    оценка HyperLogLog (``rows - distinct``, ошибка ~0.8% от числа различных строк).
+    """
+
+    def __init__(self, sketch_k: int = 400, max_exact_rows: int = 50_000_000, hll_precision: int = 14,
+                 seed: int = 42):
+        self.sketch_k = sketch_k
+        self.max_exact_rows = max_exact_rows
+        self.seed = seed
+        self.rows = 0
+        self.chunks = 0
+        self.dtypes = None
+        self.missing = None
+        self.numeric_columns = []
+        self._exact_duplicates = 0
+        self._seen_hashes = SortedRuns()
+        self._hll = HyperLogLog(hll_precision)
+
+    def _init_numeric(self, columns):
+        k = len(columns)
+        self.numeric_columns = list(columns)
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        # Корреляция по попарно-полным строкам (как DataFrame.corr): для пары (i, j) — число строк,
+        # среднее и сумма квадратов отклонений столбца i по этим строкам и центрированный co-момент
+        self.pair_n = np.zeros((k, k))
+        self.pair_mean = np.zeros((k, k))
+        self.pair_m2 = np.zeros((k, k))
+        self.pair_cov = np.zeros((k, k))
+        self.sketches = [KLLSketch(self.sketch_k, seed=self.seed + i) for i in range(k)]
+
+    def _init_schema(self, dtypes):
+        self.dtypes = dtypes
+        self.missing = pd.Series(0, index=dtypes.index, dtype="int64")
+        self._init_numeric([col for col, dtype in dtypes.items()
+                            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)])
+
+    def update(self, chunk: pd.DataFrame):
+        if self.dtypes is None:
+            self._init_schema(chunk.dtypes)
+
+        self.rows += len(chunk)
+        self.chunks += 1
+        self.missing = self.missing.add(chunk.isnull().sum(), fill_value=0).astype("int64")
+        self._update_duplicates(row_hashes(chunk))
+
+        if self.numeric_columns:
+            block = chunk.reindex(columns=self.numeric_columns).to_numpy(dtype=np.float64, na_value=np.nan)
+            self._update_moments(block)
+            self._update_pairs(block)
+            for i, sketch in enumerate(self.sketches):
+                sketch.update(block[:, i])
+        return self
+
+    @property
+    def exact_duplicates(self) -> bool:
+        return self._seen_hashes is not None
+
+    @property
+    def duplicates(self) -> int:
+        if self.exact_duplicates:
+            return self._exact_duplicates
+        return max(0, int(round(self.rows - self._hll.estimate())))
+
+    def _update_duplicates(self, h):
+        self._hll.update(h)
+        if self._seen_hashes is None:
+            return
+        uniq = sorted_unique(h)
+        self._exact_duplicates += len(h) - len(uniq)
+        seen = self._seen_hashes.contains(uniq)
+        self._exact_duplicates += int(seen.sum())
+        self._seen_hashes.add(uniq[~seen])
+        if len(self._seen_hashes) > self.max_exact_rows:
+            self._seen_hashes = None
+
+    def _update_moments(self, block):
+        mask = ~np.isnan(block)
+        n_b = mask.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, np.nansum(block, axis=0) / np.maximum(n_b, 1), 0.0)
+            m2_b = np.nansum((block - mean_b) ** 2, axis=0)
+        min_b = np.where(n_b > 0, np.nanmin(np.where(mask, block, np.inf), axis=0), np.inf)
+        max_b = np.where(n_b > 0, np.nanmax(np.where(mask, block, -np.inf), axis=0), -np.inf)
+        self._merge_moments(n_b, mean_b, m2_b, min_b, max_b)
+
+    def _merge_moments(self, n_b, mean_b, m2_b, min_b, max_b):
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        safe_n = np.maximum(n, 1)
+        self.mean = self.mean + delta * n_b / safe_n
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_n
+        self.count = n
+        self.min = np.minimum(self.min, min_b)
+        self.max = np.maximum(self.max, max_b)
+
+    def _update_pairs(self, block):
+        """
+        Co-моменты чанка считаются по значениям, сдвинутым на среднее столбца в чанке (без потери
+        точности на больших по модулю значениях), и сливаются с накопленными формулой Чана, как дисперсия.
+        """
+        mask = ~np.isnan(block)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shift = np.nan_to_num(np.nanmean(np.where(mask, block, np.nan), axis=0))
+        weights = mask.astype(np.float64)
+        x = np.where(mask, block - shift, 0.0)
+        n_b = weights.T @ weights
+        sx = x.T @ weights  # [i, j]: сумма x_i по строкам, где заданы i и j
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = np.where(n_b > 0, sx / np.maximum(n_b, 1), 0.0)
+            m2_b = (x * x).T @ weights - sx * mean_x
+            cov_b = x.T @ x - sx * mean_x.T
+        self._merge_pairs(n_b, mean_x + shift[:, None], m2_b, cov_b)
+
+    def _merge_pairs(self, n_b, mean_b, m2_b, cov_b):
+        n = self.pair_n + n_b
+        safe_n = np.maximum(n, 1)
+        delta = mean_b - self.pair_mean
+        factor = self.pair_n * n_b / safe_n
+        self.pair_cov = self.pair_cov + cov_b + delta * delta.T * factor
+        self.pair_m2 = self.pair_m2 + m2_b + delta ** 2 * factor
+        self.pair_mean = self.pair_mean + delta * n_b / safe_n
+        self.pair_n = n
+
+    def merge(self, other: "ChunkStats"):
+        """Объединение с накопителем, посчитанным по другой части данных (той же схемы)."""
+        if other.dtypes is None:
+            return self
+        if self.dtypes is None:
+            self._init_schema(other.dtypes)
+        if self.numeric_columns != other.numeric_columns:
+            raise ValueError("Нельзя объединить статистики с разными наборами числовых столбцов.")
+
+        self.rows += other.rows
+        self.chunks += other.chunks
+        self.missing = self.missing.add(other.missing, fill_value=0).astype("int64")
+        self._hll.merge(other._hll)
+        if self._seen_hashes is not None and other._seen_hashes is not None:
+            self._exact_duplicates += other._exact_duplicates
+            for run in other._seen_hashes.runs:
+                seen = self._seen_hashes.contains(run)
+                self._exact_duplicates += int(seen.sum())
+                self._seen_hashes.add(run[~seen])
+            if len(self._seen_hashes) > self.max_exact_rows:
+                self._seen_hashes = None
+        else:
+            self._seen_hashes = None
+
+        if self.numeric_columns:
+            self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+            self._merge_pairs(other.pair_n, other.pair_mean, other.pair_m2, other.pair_cov)
+            for sketch, other_sketch in zip(self.sketches, other.sketches):
+                sketch.merge(other_sketch)
+        return self
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.where(self.count > ddof, self.m2 / np.maximum(self.count - ddof, 1), np.nan))
+
+    def quantile(self, q: float) -> np.ndarray:
+        return np.array([sketch.quantile(q)[0] for sketch in self.sketches])
+
+    def numeric_summary(self) -> pd.DataFrame:
+        empty = self.count == 0
+        return pd.DataFrame(
+            {
+                "mean": np.where(empty, np.nan, self.mean),
+                "median": self.quantile(0.5),
+                "std": self.std(ddof=1),
+                "min": np.where(empty, np.nan, self.min),
+                "max": np.where(empty, np.nan, self.max),
+            },
+            index=self.numeric_columns,
+        )
+
+    def correlation(self) -> pd.DataFrame:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = np.sqrt(self.pair_m2 * self.pair_m2.T)
+            corr = np.where((self.pair_n > 1) & (denom > 0), self.pair_cov / denom, np.nan)
+        corr = np.clip(corr, -1.0, 1.0)
+        return pd.DataFrame(corr, index=self.numeric_columns, columns=self.numeric_columns)
+
+    def numeric_profile(self, z_thresh: float = 3.0) -> dict:
+        """
+        Те же поля, что у data_validator.numeric_profile: count, mean, std (ddof=0), q1, q3,
+        iqr_outliers, z_outliers. Квартили и число выбросов — оценки по скетчу KLL.
+        """
+        std0 = self.std(ddof=0)
+        profile = {}
+        for i, col in enumerate(self.numeric_columns):
+            sketch, n = self.sketches[i], int(self.count[i])
+            q1, q3 = sketch.quantile([0.25, 0.75]) if n else (np.nan, np.nan)
+            iqr_out = z_out = 0
+            if n:
+                iqr = q3 - q1
+                iqr_out = sketch.rank(q1 - 1.5 * iqr) + n - sketch.rank(q3 + 1.5 * iqr, inclusive=True)
+                if std0[i] > 0:
+                    lo, hi = self.mean[i] - z_thresh * std0[i], self.mean[i] + z_thresh * std0[i]
+                    z_out = sketch.rank(lo, inclusive=True) + n - sketch.rank(hi, inclusive=True)
+            profile[col] = {
+                "count": n,
+                "mean": float(self.mean[i]) if n else float("nan"),
+                "std": float(std0[i]),
+                "q1": float(q1),
+                "q3": float(q3),
+                "iqr_outliers": int(round(iqr_out)),
+                "z_outliers": int(round(z_out)),
+            }
+        return profile
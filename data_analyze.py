@@ -11,10 +11,13 @@ from sklearn.metrics import (
 )
 from statsmodels.tsa.seasonal import seasonal_decompose
 
+from data_profile import DataProfile
+
 
 class DataAnalyzer:
-    def __init__(self, dataframe: pd.DataFrame):
+    def __init__(self, dataframe: pd.DataFrame, profile: DataProfile = None):
         self.df = dataframe
+        self.profile = DataProfile.of(dataframe, profile)  # общий кэш статистик (см. DataProfile)
         self.log_func = None  # Будет установлена извне
 
     def set_log_func(self, log_func):
@@ -28,31 +31,28 @@ class DataAnalyzer:
         else:
             print(" ".join(map(str, args)))
 
-    def basic_statistics(self):
-        numeric_df = self.df.select_dtypes(include=[np.number])
-        if numeric_df.empty:
+    def basic_statistics(self, mode="exact") -> pd.DataFrame:
+        """
+        Среднее, медиана, мода, std, min и max числовых колонок: выводятся в лог и возвращаются
+        DataFrame. Считаются одним ядром по float-блоку (см. DataProfile.summary); ``mode`` —
+        ``exact``, ``approx`` (по выборке, для очень больших данных) или None (без моды).
+        """
+        if self.profile.numeric.empty:
             self._log_print("[ANALYSIS] Нет числовых колонок для статистики.")
-            return
+            return pd.DataFrame()
 
-        stats = {
-            "mean": numeric_df.mean(),
-            "median": numeric_df.median(),
-            "mode": numeric_df.mode().iloc[0] if not numeric_df.mode().empty else np.nan,
-            "std": numeric_df.std(),
-            "min": numeric_df.min(),
-            "max": numeric_df.max()
-        }
-        stats_df = pd.DataFrame(stats)
+        stats_df = self.profile.summary(mode)
         self._log_print("\n[ANALYSIS] Базовые статистики:")
         self._log_print(stats_df.to_string())
+        return stats_df
 
     def find_anomalies(self, z_thresh=3.0):
-        numeric_df = self.df.select_dtypes(include=[np.number])
+        numeric_df = self.profile.numeric
         if numeric_df.empty:
             self._log_print("[ANALYSIS] Нет числовых колонок для поиска выбросов.")
             return
 
-        z_scores = np.abs((numeric_df - numeric_df.mean()) / (numeric_df.std() + 1e-8))
+        z_scores = np.abs((numeric_df - self.profile.stat("mean")) / (self.profile.stat("std") + 1e-8))
         anomalies = self.df[(z_scores > z_thresh).any(axis=1)]
         self._log_print(f"\n[ANALYSIS] Найдено выбросов (Z > {z_thresh}): {len(anomalies)}")
         if len(anomalies) > 0:
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def default_cache_dir(app: str = "dataloadapp") -> str:
+    """Каталог кэша пользователя: %LOCALAPPDATA% в Windows, иначе $XDG_CACHE_HOME или ~/.cache."""
+    base = os.environ.get("LOCALAPPDATA") if os.name == "nt" else os.environ.get("XDG_CACHE_HOME")
+    return os.path.join(base or os.path.join(os.path.expanduser("~"), ".cache"), app)
+
+
+class DatasetCache:
+    """
+    Локальный кэш загруженных DataFrame на диске.
+
+    Ключ — SHA-256 от описания источника: путь + mtime + размер + параметры для файлов,
+    текст SQL + подключение для PostgreSQL, URL + параметры для API. Данные хранятся в Parquet
+    или Feather (нужен pyarrow; без него — pickle). Суммарный размер ограничен ``max_bytes``,
+    при превышении удаляются давно не использованные записи (LRU). ``ttl`` (сек) ограничивает
+    срок жизни записей для SQL и API (по умолчанию 15 минут: ключ у них — текст запроса или URL,
+    и без срока жизни повторная загрузка всегда возвращала бы старые данные); ``ttl=None`` —
+    без ограничения. У файлов ключ меняется сам при изменении файла.
+    По умолчанию ``cache_dir`` — каталог кэша пользователя (``default_cache_dir``), а не текущий каталог.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 2 * 1024 ** 3,
+                 fmt: str = "parquet", ttl: float = 900.0):
+        if fmt not in ("parquet", "feather", "pickle"):
+            raise ValueError("Формат кэша должен быть 'parquet', 'feather' или 'pickle'")
+        if fmt != "pickle" and not HAS_PYARROW:
+            print(f"[WARNING] pyarrow не установлен, кэш использует pickle вместо {fmt}.")
+            fmt = "pickle"
+        cache_dir = cache_dir or default_cache_dir()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._read_index()
+
+    # --- ключи ---
+
+    @staticmethod
+    def make_key(kind: str, **parts) -> str:
+        payload = json.dumps({"kind": kind, **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def file_key(cls, path: str, **options) -> str:
+        st = os.stat(path)
+        return cls.make_key("file", path=os.path.abspath(path), mtime=st.st_mtime_ns, size=st.st_size, **options)
+
+    @classmethod
+    def sql_key(cls, sql_query: str, host, port, database, user, **options) -> str:
+        return cls.make_key("sql", sql=sql_query.strip(), host=host, port=int(port),
+                            database=database, user=user, **options)
+
+    @classmethod
+    def url_key(cls, url: str, params=None, headers=None, **options) -> str:
+        return cls.make_key("url", url=url, params=params or {}, headers=headers or {}, **options)
+
+    # --- хранение ---
+
+    def _read_index(self) -> dict:
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, path)
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            path = self._path(key, entry["fmt"])
+            expired = self.ttl is not None and entry.get("kind") != "file" and \
+                time.time() - entry["created"] > self.ttl
+            if expired or not os.path.exists(path):
+                self._remove(key)
+                self._write_index()
+                return None
+            entry["last_used"] = time.time()
+            self._write_index()
+            fmt = entry["fmt"]
+
+        # Чтение — вне блокировки: запись могла быть вытеснена другим потоком, это промах
+        try:
+            if fmt == "parquet":
+                return pd.read_parquet(path)
+            if fmt == "feather":
+                return pd.read_feather(path)
+            return pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, df: pd.DataFrame, kind: str = None) -> bool:
+        """Сохранение DataFrame в кэш. Возвращает False, если формат не поддерживает данные."""
+        path = self._path(key, self.fmt)
+        tmp = path + ".tmp"
+        try:
+            if self.fmt == "parquet":
+                df.to_parquet(tmp)
+            elif self.fmt == "feather":
+                df.reset_index(drop=True).to_feather(tmp)
+            else:
+                df.to_pickle(tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            print(f"[WARNING] Не удалось сохранить данные в кэш: {e}")
+            return False
+
+        now = time.time()
+        with self._lock:
+            old = self._index.get(key)
+            if old is not None and old["fmt"] != self.fmt:
+                self._remove(key)
+            self._index[key] = {"fmt": self.fmt, "size": os.path.getsize(path), "kind": kind,
+                                "created": now, "last_used": now}
+            self._evict()
+            self._write_index()
+        return True
+
+    def _remove(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            try:
+                os.remove(self._path(key, entry["fmt"]))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        total = sum(e["size"] for e in self._index.values())
+        for key, _ in sorted(self._index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            self._remove(key)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._remove(key)
+            self._write_index()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._write_index()
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(e["size"] for e in self._index.values())
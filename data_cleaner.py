@@ -1,12 +1,665 @@
+import os
+import pickle
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, StandardScaler, MinMaxScaler
+from pandas.tseries.api import guess_datetime_format
+
+from chunk_stats import KLLSketch, SortedRuns, duplicated_rows, is_chunk_stream, row_hashes, sorted_unique
+
+
+def categorical_columns(df: pd.DataFrame) -> list:
+    """Категориальные столбцы: object, строковые (в т.ч. str в pandas 3), category и bool."""
+    return [col for col, dtype in df.dtypes.items()
+            if dtype == object or isinstance(dtype, (pd.StringDtype, pd.CategoricalDtype))
+            or pd.api.types.is_bool_dtype(dtype)]
+
+
+def binary_columns(df: pd.DataFrame, columns) -> list:
+    """Числовые столбцы, содержащие только 0 и 1 — их не масштабируем."""
+    result = []
+    for col in columns:
+        # Векторное сравнение вместо set(unique()): без Python-объекта на каждое уникальное значение
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if ((values == 0) | (values == 1)).all():
+            result.append(col)
+    return result
+
+
+def take_rows(df: pd.DataFrame, keep: np.ndarray) -> pd.DataFrame:
+    """
+    Отбор строк по маске без второй полной копии: столбцы по одному извлекаются из ``df``
+    (pop) и переносятся в результат, так что в памяти одновременно исходник и один столбец.
+    Исходный DataFrame после вызова пуст.
+    """
+    if keep.all():
+        return df
+    result = pd.DataFrame(index=df.index[keep])
+    with warnings.catch_warnings():
+        # Фрагментация блоков здесь ожидаема: консолидация означала бы ещё одну полную копию
+        warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+        for col in list(df.columns):
+            result[col] = df.pop(col).array[keep]
+    return result
+
+
+def fit_label_vocabulary(values: pd.Series):
+    """
+    Коды и отсортированный словарь столбца через pd.factorize (для category — по её кодам)
+    без приведения значений к str. Пропуски получают код -1.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), pd.Index(values.cat.categories)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+def _factorize_releases_gil(dtype) -> bool:
+    """pd.factorize этого типа работает без GIL: числа и bool, строки и прочие типы на pyarrow."""
+    if isinstance(dtype, pd.ArrowDtype):
+        return True
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.storage == "pyarrow"
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufmM"
+
+
+def apply_label_vocabulary(values: pd.Series, vocab: pd.Index, unknown_value: int = -1) -> np.ndarray:
+    """Коды по ранее сохранённому словарю; значения вне словаря и пропуски -> ``unknown_value``."""
+    # Словарь сопоставляется только с уникальными значениями, строки берут результат по своим кодам
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        local_codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        local_codes, uniques = pd.factorize(values)
+    mapping = np.append(vocab.get_indexer(uniques), -1).astype(np.int64)
+    codes = mapping[local_codes]
+    if unknown_value != -1:
+        codes[codes < 0] = unknown_value
+    return codes
+
+
+def category_codes(values: pd.Series, max_categories: int = None, other_label: str = "other"):
+    """
+    Коды категорий (-1 для пропусков) и список категорий в порядке get_dummies. При ``max_categories``
+    остаются самые частые значения, остальные получают общий код категории ``other_label``.
+    """
+    if max_categories is not None:
+        counts = values.value_counts(dropna=True)
+        if len(counts) > max_categories:
+            kept = counts.index[:max_categories]
+            order = np.argsort(kept.astype(str))
+            kept = kept[order]
+            codes = kept.get_indexer(values)
+            codes[(codes < 0) & values.notna().to_numpy()] = len(kept)
+            return codes, list(kept) + [other_label]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), list(values.cat.categories)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, list(uniques)
+
+
+def dummy_frame(codes: np.ndarray, names: list, index, sparse: bool = False) -> pd.DataFrame:
+    """
+    Dummy-столбцы по кодам: плотные int8 одним блоком или разреженные (SparseDtype int8, хранятся
+    только единицы — для столбцов с десятками тысяч категорий). Код -1 — строка из нулей.
+    """
+    n, k = len(codes), len(names)
+    known = np.flatnonzero(codes >= 0)
+    if sparse:
+        from scipy import sparse as sp
+        matrix = sp.csc_matrix((np.ones(len(known), dtype=np.int8), (known, codes[known])), shape=(n, k))
+        return pd.DataFrame.sparse.from_spmatrix(matrix, index=index, columns=names)
+    # Массив (k, n) — уже раскладка блока pandas (столбец = строка массива): .T передаётся без копии
+    dense = np.zeros((k, n), dtype=np.int8)
+    dense[codes[known], known] = 1
+    return pd.DataFrame(dense.T, index=index, columns=names, copy=False)
+
+
+IMPUTE_STRATEGIES = ("mean", "median", "drop", "ffill", "bfill", "rolling")
+
+
+def _as_list(keys) -> list:
+    if keys is None:
+        return []
+    return [keys] if isinstance(keys, str) else list(keys)
+
+
+def impute_columns(df: pd.DataFrame, strategy: str, group_by=None, order_by=None, columns=None) -> list:
+    """Столбцы для заполнения: числовые для mean/median/rolling, все для ffill/bfill; ключи не трогаем."""
+    if columns is not None:
+        return list(columns)
+    exclude = set(_as_list(group_by)) | set(_as_list(order_by))
+    source = df.select_dtypes(include=[np.number]) if strategy in ("mean", "median", "rolling") else df
+    return [col for col in source.columns if col not in exclude]
+
+
+def impute_missing(df: pd.DataFrame, strategy: str, group_by=None, order_by=None, window: int = 3,
+                   columns=None) -> pd.DataFrame:
+    """
+    Заполненные копии столбцов ``columns`` (по умолчанию — см. impute_columns) без циклов на Python:
+
+    - ``mean`` / ``median`` — статистика группы ``group_by`` одним groupby(...).transform,
+      для групп без значений — общая статистика столбца;
+    - ``ffill`` / ``bfill`` — протягивание значений внутри группы в порядке ``order_by``;
+    - ``rolling`` — среднее последних ``window`` значений группы в порядке ``order_by``.
+
+    Строки один раз сортируются по группе и ``order_by`` (устойчиво), заполнение — numpy-операциями
+    над отсортированными массивами (накопленные max/min индексов, кумулятивные суммы), результат
+    возвращается в исходном порядке строк.
+    """
+    keys = _as_list(group_by)
+    cols = impute_columns(df, strategy, group_by, order_by, columns)
+    if strategy in ("mean", "median"):
+        data = df[cols]
+        if keys:
+            grouped = df.groupby(keys, dropna=False, observed=True, sort=False)[cols]
+            data = data.fillna(grouped.transform(strategy))
+        return data.fillna(getattr(data, strategy)())
+
+    order, group_start, group_end = _group_order(df, keys, order_by)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    positions = np.arange(len(order))
+    filled = {}
+    for col in cols:
+        values = df[col]
+        valid = values.notna().to_numpy()[order]
+        if strategy == "rolling":
+            # Скользящее среднее через кумулятивные суммы; окно не выходит за начало группы
+            x = values.to_numpy(dtype=np.float64, na_value=np.nan)[order]
+            csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+            ccount = np.concatenate(([0], np.cumsum(valid)))
+            lo = np.maximum(positions - window + 1, group_start)
+            count = ccount[positions + 1] - ccount[lo]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = (csum[positions + 1] - csum[lo]) / count
+            x = np.where(valid, x, np.where(count > 0, mean, np.nan))
+            filled[col] = x[inverse]
+            continue
+        # ffill / bfill: номер ближайшей непустой строки той же группы (в отсортированном порядке)
+        if strategy == "ffill":
+            source = np.maximum.accumulate(np.where(valid, positions, -1))
+            usable = source >= group_start
+        else:
+            source = np.minimum.accumulate(np.where(valid, positions, len(positions))[::-1])[::-1]
+            usable = source <= group_end
+        source = np.where(usable, source, positions)
+        # Один take по исходному столбцу сохраняет его dtype (в т.ч. строки и category)
+        filled[col] = values.array.take(order[source][inverse])
+    return pd.DataFrame(filled, index=df.index)
+
+
+def _sort_codes(values: pd.Series):
+    """Целые коды, сохраняющие порядок значений, и их число (пропуски — в конец)."""
+    is_datetime = pd.api.types.is_datetime64_any_dtype(values.dtype)
+    if (is_datetime or pd.api.types.is_integer_dtype(values.dtype)) and not values.hasnans:
+        # Даты — через int64-представление (для tz-aware — в UTC, порядок тот же)
+        x = np.asarray(values.array.asi8) if is_datetime else values.to_numpy()
+        if not len(x):
+            return x.astype(np.int64), 1
+        low, high = int(x.min()), int(x.max())
+        # Размах считается в Python int: у значений на краях int64 / uint64 разность переполнилась бы
+        if high - low < 2 ** 62:
+            return (x - x.dtype.type(low)).astype(np.int64), high - low + 1
+    codes, uniques = pd.factorize(values, sort=True)
+    codes = codes.astype(np.int64)
+    codes[codes < 0] = len(uniques)
+    return codes, len(uniques) + 1
+
+
+def _group_order(df: pd.DataFrame, keys: list, order_by):
+    """
+    Порядок строк «группа, затем order_by» (устойчивый) и для каждой позиции в нём — начало
+    и конец её группы. Группа и ключи сортировки сводятся к одному int64-ключу, если он
+    помещается (одна устойчивая сортировка вместо lexsort), иначе — lexsort по кодам.
+    """
+    n = len(df)
+    parts = [_sort_codes(df[col]) for col in _as_list(order_by)]
+    codes = None
+    if keys:
+        codes = df.groupby(keys, dropna=False, observed=True, sort=False).ngroup().to_numpy().astype(np.int64)
+        parts.insert(0, (codes, int(codes.max()) + 1 if n else 1))
+    if not parts:
+        order = np.arange(n)
+    elif np.prod([float(size) for _, size in parts]) < 2.0 ** 62:
+        key = np.zeros(n, dtype=np.int64)
+        for part, size in parts:
+            key = key * size + part
+        order = np.argsort(key, kind="stable")
+    else:
+        order = np.lexsort([part for part, _ in reversed(parts)])
+    if codes is None:
+        return order, np.zeros(n, dtype=np.int64), np.full(n, n - 1, dtype=np.int64)
+    sorted_codes = codes[order]
+    positions = np.arange(n)
+    is_start = np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1]))
+    is_end = np.concatenate((sorted_codes[1:] != sorted_codes[:-1], [True]))
+    group_start = np.maximum.accumulate(np.where(is_start, positions, 0))
+    group_end = np.minimum.accumulate(np.where(is_end, positions, n - 1)[::-1])[::-1]
+    return order, group_start, group_end
+
+
+class StreamingImputer:
+    """
+    Заполнение пропусков в потоке чанков с переносом состояния между ними:
+
+    - ``mean`` — накопленные суммы и количества (общие и по группам) по всем уже прочитанным чанкам:
+      чанк заполняется средним нарастающим итогом, поэтому ранние чанки получают другое значение,
+      чем DataFrame целиком (impute_missing). Точное среднее — два прохода: ``fit(chunks)`` по всему
+      потоку, затем ``transform`` для каждого чанка повторно открытого потока;
+    - ``median`` — медианы первого чанка (точная медиана потока требует всех данных);
+    - ``ffill`` — последние известные значения каждой группы переносятся в следующий чанк;
+    - ``rolling`` — хвост из ``window - 1`` строк каждой группы дописывается в начало следующего чанка;
+    - ``bfill`` — только внутри чанка (значения из будущих чанков недоступны).
+
+    Для ``ffill`` и ``rolling`` чанки должны идти в порядке ``order_by`` (например, по времени).
+    """
+
+    def __init__(self, strategy="mean", group_by=None, order_by=None, window: int = 3, columns=None):
+        if strategy not in IMPUTE_STRATEGIES:
+            raise ValueError(f"Стратегия должна быть одной из: {', '.join(IMPUTE_STRATEGIES)}")
+        if strategy == "bfill":
+            print("[WARNING] bfill в потоке заполняет пропуски только внутри чанка.")
+        self.strategy = strategy
+        self.keys = _as_list(group_by)
+        self.order_by = order_by
+        self.window = window
+        self.columns = columns
+        self.sums = None  # накопленные суммы и количества для mean
+        self.counts = None
+        self.group_sums = None
+        self.group_counts = None
+        self.fill_values = None  # медианы первого чанка: (по группам, общие)
+        self.carry = None  # хвост предыдущего чанка для ffill / rolling
+        self.fitted = False  # средние посчитаны fit по всему потоку и больше не обновляются
+
+    def fit(self, chunks) -> "StreamingImputer":
+        """Первый проход для ``mean``: суммы и количества по всем чанкам, без заполнения."""
+        if self.strategy != "mean":
+            raise ValueError("fit по всему потоку поддерживается только для стратегии mean")
+        for chunk in chunks:
+            if self.columns is None:
+                self.columns = impute_columns(chunk, self.strategy, self.keys, self.order_by)
+            self._accumulate(chunk, self.columns)
+        self.fitted = True
+        return self
+
+    def transform(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        if self.strategy == "drop":
+            return chunk.dropna()
+        if self.columns is None:
+            self.columns = impute_columns(chunk, self.strategy, self.keys, self.order_by)
+        cols = self.columns
+        if self.strategy == "mean":
+            if not self.fitted:
+                self._accumulate(chunk, cols)
+            filled = self._mean_fill(chunk, cols)
+        elif self.strategy == "median":
+            filled = self._first_chunk_median(chunk, cols)
+        elif self.strategy == "bfill":
+            filled = impute_missing(chunk, "bfill", self.keys or None, self.order_by, columns=cols)
+        else:
+            filled = self._with_carry(chunk, cols)
+        chunk = chunk.copy()
+        chunk[cols] = filled
+        return chunk
+
+    def _fill(self, chunk, data, group_values, global_values):
+        """Сначала значения группы строки (если есть группы), затем общие."""
+        if self.keys and group_values is not None:
+            if len(self.keys) == 1:
+                index = pd.Index(chunk[self.keys[0]])
+            else:
+                index = pd.MultiIndex.from_frame(chunk[self.keys])
+            per_row = group_values.reindex(index)
+            per_row.index = chunk.index
+            data = data.fillna(per_row)
+        return data.fillna(global_values)
+
+    def _accumulate(self, chunk, cols):
+        data = chunk[cols]
+        sums, counts = data.sum(), data.count()
+        if self.sums is None:
+            self.sums, self.counts = sums, counts
+        else:
+            self.sums, self.counts = self.sums.add(sums, fill_value=0), self.counts.add(counts, fill_value=0)
+        if self.keys:
+            grouped = data.groupby([chunk[k] for k in self.keys], dropna=False, observed=True)
+            g_sums, g_counts = grouped.sum(), grouped.count()
+            if self.group_sums is None:
+                self.group_sums, self.group_counts = g_sums, g_counts
+            else:
+                self.group_sums = self.group_sums.add(g_sums, fill_value=0)
+                self.group_counts = self.group_counts.add(g_counts, fill_value=0)
+
+    def _mean_fill(self, chunk, cols):
+        group_means = None
+        if self.group_sums is not None:
+            group_means = self.group_sums / self.group_counts.where(self.group_counts > 0)
+        return self._fill(chunk, chunk[cols], group_means, self.sums / self.counts.where(self.counts > 0))
+
+    def _first_chunk_median(self, chunk, cols):
+        data = chunk[cols]
+        if self.fill_values is None:
+            group_medians = None
+            if self.keys:
+                group_medians = data.groupby([chunk[k] for k in self.keys], dropna=False, observed=True).median()
+            self.fill_values = (group_medians, data.median())
+        return self._fill(chunk, data, *self.fill_values)
+
+    def _with_carry(self, chunk, cols):
+        """ffill / rolling: хвост предыдущего чанка дописывается в начало, затем отрезается."""
+        n_carry = 0 if self.carry is None else len(self.carry)
+        combined = chunk.reset_index(drop=True) if not n_carry else pd.concat([self.carry, chunk], ignore_index=True)
+        filled = impute_missing(combined, self.strategy, self.keys or None, self.order_by, self.window, cols)
+
+        state_cols = self.keys + _as_list(self.order_by)
+        source = combined[state_cols].copy()
+        # Для ffill переносятся уже заполненные значения, для rolling — исходные
+        source[cols] = filled if self.strategy == "ffill" else combined[cols]
+        if self.order_by is not None:
+            source = source.sort_values(_as_list(self.order_by), kind="stable")
+        tail = 1 if self.strategy == "ffill" else self.window - 1
+        if tail > 0:
+            self.carry = (source.groupby(self.keys, dropna=False, observed=True).tail(tail) if self.keys
+                          else source.tail(tail))
+
+        result = filled.iloc[n_carry:]
+        result.index = chunk.index
+        return result
+
+
+def infer_date_format(strings: pd.Index, sample_size: int = 1000, dayfirst: bool = False) -> str:
+    """
+    Один явный формат дат для столбца. По выборке из ``sample_size`` уникальных строк форматы
+    угадываются guess_datetime_format; берётся тот, которым разбирается больше всего строк выборки
+    (при равенстве — самый частый). Если часть выборки читается только другим форматом (например,
+    ISO и 17/02/2023 в одном столбце), ValueError — разные прочтения в одном столбце не смешиваются,
+    нужно задать ``formats=``.
+    """
+    if len(strings) > sample_size:
+        strings = strings[np.linspace(0, len(strings) - 1, sample_size).astype(np.int64)]
+
+    def guess(s):
+        fmt = guess_datetime_format(s, dayfirst=dayfirst)
+        # dayfirst относится к форматам вида 17/02/2023; ISO (год впереди) всегда год-месяц-день
+        if dayfirst and fmt is not None and fmt.startswith("%Y"):
+            fmt = guess_datetime_format(s)
+        return fmt
+
+    with warnings.catch_warnings():
+        # при dayfirst=True pandas предупреждает о каждой строке в ISO-формате
+        warnings.simplefilter("ignore", UserWarning)
+        guessed = Counter(guess(s) for s in strings)
+    guessed.pop(None, None)
+    if not guessed:
+        raise ValueError("формат дат не определён по выборке")
+    parsed = {fmt: ~pd.to_datetime(strings, format=fmt, errors="coerce").isna() for fmt, _ in guessed.most_common()}
+    best = max(parsed, key=lambda fmt: parsed[fmt].sum())
+    # Строки, не подходящие под выбранный формат, но читаемые другим, — конфликт прочтений;
+    # строки, не читаемые никаким форматом, — просто ошибки разбора (см. max_invalid)
+    rest = ~parsed[best]
+    conflicts = [fmt for fmt, ok in parsed.items() if fmt != best and (ok & rest).any()]
+    if conflicts:
+        raise ValueError(f"в выборке несовместимые форматы {[best] + conflicts}: задайте formats=")
+    return best
+
+
+def parse_dates(values: pd.Series, formats=None, sample_size: int = 1000, dayfirst: bool = False):
+    """
+    Преобразование столбца в datetime по одному явному формату (выведенному по выборке, см.
+    infer_date_format) или по заданным ``formats`` (строка или список, применяются по очереди).
+    Каждая уникальная строка разбирается один раз, результат раскладывается по строкам через коды
+    factorize. Пустые и пробельные строки считаются пропусками (NaT). Числа и даты передаются в
+    pd.to_datetime как есть. Возвращает (Series, список форматов, число неразобранных значений).
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values, [], 0
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        return pd.to_datetime(values), [], 0
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    strings = pd.Index(uniques).astype(str)
+    blank = np.asarray(strings.str.strip() == "", dtype=bool)
+    if blank.any():
+        codes = np.where((codes >= 0) & blank[np.maximum(codes, 0)], -1, codes)
+        if blank.all():
+            return pd.Series(pd.NaT, index=values.index, name=values.name, dtype="datetime64[ns]"), [], 0
+    if formats is None:
+        formats = [infer_date_format(strings[~blank], sample_size, dayfirst)]
+    elif isinstance(formats, str):
+        formats = [formats]
+
+    pieces = [pd.Series(pd.NaT, index=np.arange(0), dtype="datetime64[ns]")]
+    remaining = ~blank
+    for fmt in formats:
+        if not remaining.any():
+            break
+        chunk = pd.to_datetime(strings[remaining], format=fmt, errors="coerce", dayfirst=dayfirst)
+        ok = ~chunk.isna()
+        if ok.any():
+            idx = np.flatnonzero(remaining)[ok]
+            pieces.append(pd.Series(chunk[ok], index=idx))
+            remaining[idx] = False
+    parsed = pd.concat(pieces[1:] or pieces).reindex(np.arange(len(strings)))
+
+    result = pd.Series(parsed.array.take(codes, allow_fill=True), index=values.index, name=values.name)
+    failed = int(np.bincount(codes[codes >= 0], minlength=len(strings))[remaining].sum())
+    return result, list(formats), failed
+
+
+SCALE_METHODS = ("standard", "minmax", "robust", "quantile")
+
+
+class NumericScaler:
+    """
+    Масштабирование числовых столбцов с обучением по частям (``partial_fit``) — для данных больше
+    памяти, читаемых чанками. Методы: ``standard`` (среднее и std с ddof=0, как StandardScaler),
+    ``minmax``, ``robust`` (медиана и межквартильный размах ``quantile_range``), ``quantile``
+    (эмпирическая функция распределения на ``n_quantiles`` точках, результат в [0, 1]).
+
+    Столбцы только из 0 и 1 (во всех чанках) не масштабируются; проверка делается в том же проходе
+    по столбцу, что и накопление статистик. Для одного DataFrame квантили точные, для потока чанков —
+    по KLL-скетчу (ошибка ранга ~1.7/``sketch_k``). Обученные параметры сохраняются и применяются
+    к следующим батчам через ``transform``.
+    """
+
+    def __init__(self, method: str = "standard", quantile_range=(25.0, 75.0), n_quantiles: int = 1000,
+                 sketch_k: int = 2000):
+        if method not in SCALE_METHODS:
+            raise ValueError("Метод масштабирования должен быть 'standard', 'minmax', 'robust' или 'quantile'")
+        self.method = method
+        self.quantile_range = quantile_range
+        self.n_quantiles = n_quantiles
+        self.sketch_k = sketch_k
+        self.reset()
+
+    def reset(self):
+        self.columns = None
+        self.binary = {}
+        self.count, self.mean, self.m2 = {}, {}, {}
+        self.min, self.max = {}, {}
+        self.sketches, self.exact_quantiles = {}, {}
+        self.offset = self.scale = self.quantiles = None
+        return self
+
+    @property
+    def fitted(self) -> bool:
+        return self.offset is not None or self.quantiles is not None
+
+    @property
+    def scale_columns(self) -> list:
+        return [col for col in self.columns or [] if not self.binary[col]]
+
+    def _levels(self) -> np.ndarray:
+        if self.method == "robust":
+            low, high = self.quantile_range
+            return np.array([low / 100.0, 0.5, high / 100.0])
+        return np.linspace(0.0, 1.0, self.n_quantiles)
+
+    def fit(self, data):
+        """Обучение на DataFrame (точные статистики) или на итераторе чанков (по частям)."""
+        self.reset()
+        if is_chunk_stream(data):
+            for chunk in data:
+                self.partial_fit(chunk)
+            return self
+        return self._partial_fit(data, exact=True)
+
+    def partial_fit(self, df: pd.DataFrame):
+        """
+        Добавление чанка к накопленным статистикам; параметры пересчитываются сразу.
+        Для ``robust``/``quantile`` после ``fit(DataFrame)`` недоступно (RuntimeError): точные квантили
+        не объединяются со скетчем — обучайте такие масштабирования потоком чанков.
+        """
+        if self.exact_quantiles:
+            raise RuntimeError("После fit по DataFrame квантили точные и не дообучаются: "
+                               "используйте fit по итератору чанков или reset()")
+        return self._partial_fit(df, exact=False)
+
+    def _partial_fit(self, df, exact):
+        if self.columns is None:
+            self.columns = list(df.select_dtypes(include=[np.number]).columns)
+            self.binary = {col: True for col in self.columns}
+        for col in self.columns:
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            # Бинарность и статистики — за один проход по уже полученному массиву
+            self.binary[col] = self.binary[col] and bool(((values == 0) | (values == 1)).all())
+            missing = np.isnan(values)
+            if missing.any():
+                values = values[~missing]
+            if values.size:
+                self._update(col, values, exact)
+        self._finalize()
+        return self
+
+    def _update(self, col, values, exact):
+        if self.method == "standard":
+            # Объединение средних и сумм квадратов отклонений по формуле Чана
+            n_a, n_b = self.count.get(col, 0), values.size
+            mean_b = values.mean()
+            deviation = values - mean_b
+            m2_b = np.dot(deviation, deviation)
+            del deviation
+            mean_a = self.mean.get(col, 0.0)
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            self.mean[col] = mean_a + delta * n_b / n
+            self.m2[col] = self.m2.get(col, 0.0) + m2_b + delta ** 2 * n_a * n_b / n
+            self.count[col] = n
+        elif self.method == "minmax":
+            self.min[col] = min(self.min.get(col, np.inf), values.min())
+            self.max[col] = max(self.max.get(col, -np.inf), values.max())
+        elif exact:
+            self.exact_quantiles[col] = np.quantile(values, self._levels())
+        else:
+            self.sketches.setdefault(col, KLLSketch(self.sketch_k)).update(values)
+
+    def _finalize(self):
+        cols = self.scale_columns
+        if self.method == "standard":
+            offset = pd.Series({c: self.mean.get(c, np.nan) for c in cols}, dtype=np.float64)
+            scale = pd.Series({c: np.sqrt(self.m2[c] / self.count[c]) if c in self.count else np.nan
+                               for c in cols}, dtype=np.float64)
+        elif self.method == "minmax":
+            offset = pd.Series({c: self.min.get(c, np.nan) for c in cols}, dtype=np.float64)
+            scale = pd.Series({c: self.max.get(c, np.nan) for c in cols}, dtype=np.float64) - offset
+        else:
+            levels = self._levels()
+            self.quantiles = {}
+            for c in cols:
+                if c in self.exact_quantiles:
+                    self.quantiles[c] = self.exact_quantiles[c]
+                elif c in self.sketches:
+                    self.quantiles[c] = self.sketches[c].quantile(levels)
+                else:
+                    self.quantiles[c] = np.full(levels.size, np.nan)
+            if self.method == "quantile":
+                return
+            offset = pd.Series({c: q[1] for c, q in self.quantiles.items()}, dtype=np.float64)
+            scale = pd.Series({c: q[2] - q[0] for c, q in self.quantiles.items()}, dtype=np.float64)
+        self.offset = offset
+        # Постоянные столбцы не делим на ноль — как в sklearn
+        self.scale = scale.where(scale != 0, 1.0)
+
+    def transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        if not self.fitted:
+            raise RuntimeError("Масштабирование не обучено: сначала вызовите fit или partial_fit")
+        if is_chunk_stream(df):
+            return (self.transform(chunk, inplace) for chunk in df)
+        df = df if inplace else df.copy()
+        levels = self._levels() if self.method == "quantile" else None
+        for col in self.scale_columns:
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            if self.method == "quantile":
+                scaled = np.interp(values, self.quantiles[col], levels)
+                scaled[np.isnan(values)] = np.nan
+            else:
+                scaled = (values - self.offset[col]) / self.scale[col]
+            if inplace and df[col].dtype == np.float64:
+                # Запись в существующий блок: столбцы 2D-блока не копируются при замене
+                df.loc[:, col] = scaled
+            else:
+                df[col] = scaled
+        return df
+
+    def fit_transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        return self.fit(df).transform(df, inplace)
+
 
 class DataCleaner:
-    def __init__(self):
+    """
+    Очистка данных. По умолчанию методы не меняют переданный DataFrame и работают с копией.
+    При ``inplace=True`` (режим экономии памяти) DataFrame изменяется по столбцам: каждый
+    столбец заменяется сразу после обработки и старый массив освобождается, поэтому пик памяти
+    цепочки «пропуски → кодирование → масштабирование» остаётся около 1x размера данных
+    (замер: benchmarks/bench_cleaning_memory.py). Удаление строк (``drop``, дубликаты) и dummy-кодирование
+    переносят столбцы в новый DataFrame, а исходный опустошают — используйте возвращаемое значение.
+    """
+
+    def __init__(self, inplace: bool = False):
         self.label_encoders = {}
+        self.date_formats = {}
+        self.date_failures = {}
+        self.scaler = None
+        self.imputer = None
+        self.pipeline = None
+        self.inplace = inplace
 
-    def handle_missing_values(self, df, strategy="mean"):
+    def handle_missing_values(self, df, strategy="mean", group_by=None, order_by=None, window: int = 3,
+                              columns=None):
+        """
+        Заполнение пропусков: ``mean`` / ``median`` (общие или по группам ``group_by``), ``drop``,
+        ``ffill`` / ``bfill`` внутри группы в порядке ``order_by``, ``rolling`` — среднее последних
+        ``window`` значений группы. Всё считается векторно (см. impute_missing). Для итератора чанков
+        возвращается генератор с переносом состояния между чанками (см. StreamingImputer); если
+        средние обучены fit_imputer, поток заполняется ими (как DataFrame целиком).
+        """
+        if is_chunk_stream(df):
+            if strategy == "mean" and self.imputer is not None:
+                return (self.imputer.transform(chunk) for chunk in df)
+            return self._iter_missing_values(df, strategy, group_by, order_by, window, columns)
+        if group_by is not None or columns is not None or strategy in ("ffill", "bfill", "rolling"):
+            if strategy not in IMPUTE_STRATEGIES:
+                print(f"[WARNING] Неизвестная стратегия: {strategy}")
+                return df
+            if strategy == "drop":
+                keep = (df if columns is None else df[list(columns)]).notna().all(axis=1).to_numpy()
+                return take_rows(df, keep) if self.inplace else df[keep]
+            filled = impute_missing(df, strategy, group_by, order_by, window, columns)
+            df = df if self.inplace else df.copy()
+            for col in filled.columns:
+                df[col] = filled[col]
+            return df
+        if self.inplace:
+            return self._missing_values_inplace(df, strategy)
         df = df.copy()
         if strategy == "mean":
             df.fillna(df.mean(numeric_only=True), inplace=True)
@@ -18,52 +671,476 @@ class DataCleaner:
             print(f"[WARNING] Неизвестная стратегия: {strategy}")
         return df
 
-    def drop_duplicates(self, df):
-        before = df.shape[0]
-        df = df.drop_duplicates()
-        after = df.shape[0]
-        print(f"[INFO] Удалено дубликатов: {before - after}")
+    @staticmethod
+    def _missing_values_inplace(df, strategy):
+        if strategy in ("mean", "median"):
+            # Статистика — только для столбцов с пропусками и без общего числового блока;
+            # fillna(inplace=True) пишет прямо в блоки DataFrame, без копии
+            fill = {}
+            for col in df.select_dtypes(include=[np.number]).columns:
+                values = df[col]
+                if values.hasnans:
+                    fill[col] = values.mean() if strategy == "mean" else values.median()
+            if fill:
+                df.fillna(fill, inplace=True)
+        elif strategy == "drop":
+            df = take_rows(df, df.notna().all(axis=1).to_numpy())
+        else:
+            print(f"[WARNING] Неизвестная стратегия: {strategy}")
         return df
 
-    def encode_categorical(self, df, method="onehot"):
-        df_encoded = df.copy()
-        cat_cols = df_encoded.select_dtypes(include=["object", "category", "bool"]).columns
+    @staticmethod
+    def _iter_missing_values(chunks, strategy, group_by=None, order_by=None, window=3, columns=None):
+        """Потоковый режим: состояние заполнения переносится между чанками (см. StreamingImputer)."""
+        if strategy not in IMPUTE_STRATEGIES:
+            print(f"[WARNING] Неизвестная стратегия: {strategy}")
+            yield from chunks
+            return
+        imputer = StreamingImputer(strategy, group_by, order_by, window, columns)
+        for chunk in chunks:
+            yield imputer.transform(chunk)
+
+    def drop_duplicates(self, df, subset=None, keep="first", max_seen=50_000_000):
+        """
+        Удаление дубликатов строк (или по ключевым столбцам ``subset``) через хэши строк,
+        см. chunk_stats.duplicated_rows; результат совпадает с DataFrame.drop_duplicates.
+        Для потока чанков см. _iter_drop_duplicates (``keep`` — всегда ``first``).
+        """
+        if is_chunk_stream(df):
+            return self._iter_drop_duplicates(df, subset, max_seen)
+        mask = duplicated_rows(df, subset=subset, keep=keep)
+        print(f"[INFO] Удалено дубликатов: {int(mask.sum())}")
+        if self.inplace:
+            return take_rows(df, ~mask)
+        return df[~mask]
+
+    @staticmethod
+    def _iter_drop_duplicates(chunks, subset=None, max_seen=50_000_000):
+        """
+        Потоковое удаление дубликатов. Внутри чанка совпадения хэшей подтверждаются сравнением
+        значений (duplicated_rows), как в режиме DataFrame. Строки разных чанков сравниваются
+        только по 64-битным хэшам (предыдущие чанки не хранятся): при коллизии хэшей —
+        вероятность ~n²/2⁶⁵ — уникальная строка будет удалена.
+
+        Хэши хранятся в SortedRuns: каждый хэш пересортировывается O(log n) раз, а не заново на каждом чанке.
+        Запоминается не больше ``max_seen`` хэшей (8 байт каждый); дальше новые строки
+        не запоминаются, и их повторы в последующих чанках не удаляются (выводится предупреждение).
+        """
+        if isinstance(subset, str):
+            subset = [subset]
+        seen = SortedRuns()
+        removed = 0
+        for chunk in chunks:
+            frame = chunk if subset is None else chunk[subset]
+            h = row_hashes(frame)
+            first = ~pd.Series(h).duplicated().to_numpy()
+            if not first.all():
+                first = ~duplicated_rows(frame)
+            keep = first & ~seen.contains(h)
+            removed += int((~keep).sum())
+            fresh = sorted_unique(h[keep])
+            new = fresh[:max_seen - len(seen)]
+            if len(new) < len(fresh) and len(seen) < max_seen:
+                print(f"[WARNING] Запомнено {max_seen} строк: повторы более поздних строк "
+                      f"в следующих чанках не удаляются")
+            seen.add(new)
+            yield chunk[keep]
+        print(f"[INFO] Удалено дубликатов: {removed}")
+
+    def encode_categorical(self, df, method="onehot", sparse=False, max_categories=None, other_label="other",
+                           n_features=32, target=None, smoothing=10.0, max_workers=None):
+        """
+        Кодирование категориальных столбцов.
+
+        - ``label`` — код по отсортированному словарю столбца (pd.factorize, без приведения к str),
+          пропуски -> -1; словари сохраняются в ``self.label_encoders`` для apply_label_encoding
+          и decode_labels; в широких таблицах числовые и Arrow-столбцы кодируются в ``max_workers``
+          потоках (object-столбцы — последовательно: их factorize держит GIL);
+        - ``onehot`` — dummy-столбцы int8 (или разреженные при ``sparse=True``); ``max_categories``
+          оставляет самые частые значения, остальные попадают в столбец ``<столбец>_<other_label>``;
+        - ``hash`` — hashing trick: значение хэшируется в один из ``n_features`` столбцов,
+          ширина не зависит от числа категорий;
+        - ``frequency`` — доля строк с этим значением;
+        - ``target`` — сглаженное среднее столбца ``target`` по категории
+          ((n·mean + smoothing·общее среднее) / (n + smoothing)); сам ``target`` не кодируется.
+        """
+        if method not in ("label", "onehot", "hash", "frequency", "target"):
+            raise ValueError("Метод кодирования должен быть 'label', 'onehot', 'hash', 'frequency' или 'target'")
+        if method == "target" and (target is None or target not in df.columns):
+            raise ValueError("Для target-кодирования укажите существующий столбец target")
+
+        df_encoded = df if self.inplace else df.copy()
+        cat_cols = [col for col in categorical_columns(df_encoded) if col != target]
 
         if method == "label":
-            le = LabelEncoder()
+            self._encode_labels(df_encoded, cat_cols, max_workers)
+        elif method == "frequency":
             for col in cat_cols:
-                df_encoded[col] = le.fit_transform(df_encoded[col].astype(str))
-        elif method == "onehot":
-            df_encoded = pd.get_dummies(df_encoded, columns=cat_cols, drop_first=False)
-            bool_cols = df_encoded.select_dtypes(include=["bool"]).columns
-            df_encoded[bool_cols] = df_encoded[bool_cols].astype(int)
+                freq = df_encoded[col].value_counts(normalize=True, dropna=False)
+                df_encoded[col] = df_encoded[col].map(freq).astype(np.float64)
+        elif method == "target":
+            y = pd.to_numeric(df_encoded[target], errors="coerce")
+            prior = y.mean()
+            for col in cat_cols:
+                stats = y.groupby(df_encoded[col], dropna=False, observed=True).agg(["sum", "count"])
+                smoothed = (stats["sum"] + smoothing * prior) / (stats["count"] + smoothing)
+                df_encoded[col] = df_encoded[col].map(smoothed).astype(np.float64)
         else:
-            raise ValueError("Метод кодирования должен быть 'label' или 'onehot'")
+            df_encoded = self._encode_dummies(df_encoded, cat_cols, method, sparse, max_categories,
+                                              other_label, n_features)
         return df_encoded
 
-    def scale_numeric(self, df, method="standard"):
-        df = df.copy()
-        num_cols = df.select_dtypes(include=[np.number]).columns
-        binary_cols = [col for col in num_cols if set(df[col].unique()) <= {0, 1}]
-        scale_cols = [col for col in num_cols if col not in binary_cols]
-
-        if method == "standard":
-            scaler = StandardScaler()
-        elif method == "minmax":
-            scaler = MinMaxScaler()
-        else:
+    def _encode_labels(self, df, cat_cols, max_workers=None):
+        def encode(col):
+            return col, fit_label_vocabulary(df[col])
+
+        # GIL отпускается только при factorize числовых и Arrow-столбцов (хэш-таблица pandas / pyarrow);
+        # object-столбцы хэшируют Python-объекты под GIL, и потоки для них только добавляют накладные расходы
+        parallel = [col for col in cat_cols if _factorize_releases_gil(df[col].dtype)]
+        workers = min(len(parallel), max_workers or os.cpu_count() or 1)
+        results = {}
+        if workers > 1 and len(parallel) >= 8:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results.update(pool.map(encode, parallel))
+        results.update(encode(col) for col in cat_cols if col not in results)
+        for col in cat_cols:
+            codes, vocab = results[col]
+            df[col] = codes
+            self.label_encoders[col] = vocab
+
+    def apply_label_encoding(self, df, unknown_value: int = -1):
+        """
+        Кодирование новых батчей (или итератора чанков) по словарям, сохранённым в
+        encode_categorical(method="label"); неизвестные категории и пропуски -> ``unknown_value``.
+        """
+        if not self.label_encoders:
+            raise RuntimeError("Словари не обучены: сначала вызовите encode_categorical(method='label')")
+        if is_chunk_stream(df):
+            return (self.apply_label_encoding(chunk, unknown_value) for chunk in df)
+        df = df if self.inplace else df.copy()
+        for col, vocab in self.label_encoders.items():
+            if col in df.columns:
+                df[col] = apply_label_vocabulary(df[col], vocab, unknown_value)
+        return df
+
+    def decode_labels(self, df):
+        """Обратное преобразование кодов в исходные значения (код вне словаря -> NaN)."""
+        df = df if self.inplace else df.copy()
+        for col, vocab in self.label_encoders.items():
+            if col in df.columns:
+                codes = df[col].to_numpy()
+                valid = (codes >= 0) & (codes < len(vocab))
+                values = np.full(len(codes), np.nan, dtype=object)
+                values[valid] = vocab.to_numpy(dtype=object)[codes[valid]]
+                df[col] = values
+        return df
+
+    def _encode_dummies(self, df, cat_cols, method, sparse, max_categories, other_label, n_features):
+        """One-hot и hashing trick: столбцы по одному извлекаются и заменяются dummy-блоком (см. dummy_frame)."""
+        parts = []
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+            for col in cat_cols:
+                values = df.pop(col)
+                if method == "hash":
+                    codes = (pd.util.hash_array(values.to_numpy(dtype=object)) % np.uint64(n_features)).astype(np.int64)
+                    codes[values.isna().to_numpy()] = -1
+                    names = [f"{col}_hash_{i}" for i in range(n_features)]
+                else:
+                    codes, uniques = category_codes(values, max_categories, other_label)
+                    names = [f"{col}_{v}" for v in uniques]
+                del values
+                parts.append(dummy_frame(codes, names, df.index, sparse))
+        if parts:
+            # При Copy-on-Write concat по столбцам не копирует блоки: dummy-блок int8 каждого
+            # столбца вставляется целиком, без k отдельных вставок (O(n·k) сравнений и фрагментации)
+            result = pd.concat([df] + parts, axis=1)
+            if self.inplace:
+                # Исходник больше не ссылается на общие блоки — последующая запись в них
+                # (scale_numeric) не вызывает копирования
+                df.drop(columns=df.columns, inplace=True)
+            df = result
+        return df
+
+    def scale_numeric(self, df, method="standard", fit: bool = True):
+        """
+        Масштабирование числовых столбцов (кроме 0/1): ``standard``, ``minmax``, ``robust``, ``quantile``
+        (см. NumericScaler). Обученный масштаб сохраняется в ``self.scaler``; ``fit=False`` применяет его
+        к новым батчам. Итератор чанков масштабируется по ранее обученному масштабу (fit_scaler).
+        """
+        if method not in SCALE_METHODS:
             print(f"[WARNING] Неизвестный метод масштабирования: {method}")
             return df
+        if is_chunk_stream(df) or not fit:
+            if self.scaler is None:
+                raise RuntimeError("Масштабирование не обучено: сначала вызовите fit_scaler или scale_numeric")
+            return self.scaler.transform(df, self.inplace)
+        self.scaler = NumericScaler(method).fit(df)
+        return self.scaler.transform(df, self.inplace)
+
+    def fit_scaler(self, data, method="standard", **options):
+        """
+        Обучение масштаба на DataFrame или итераторе чанков (например, load_csv(path, chunksize=...))
+        без загрузки всех данных в память; затем scale_numeric(batch, fit=False) или scale_numeric(chunks).
+        """
+        self.scaler = NumericScaler(method, **options).fit(data)
+        return self.scaler
+
+    def fit_imputer(self, chunks, group_by=None, columns=None):
+        """
+        Первый проход по потоку для точного заполнения средним: затем handle_missing_values(chunks,
+        strategy="mean") для повторно открытого потока (например, второй load_csv(path, chunksize=...)).
+        """
+        self.imputer = StreamingImputer("mean", group_by, columns=columns).fit(chunks)
+        return self.imputer
 
-        if len(scale_cols) > 0:
-            df[scale_cols] = scaler.fit_transform(df[scale_cols])
+    def fit_pipeline(self, df, missing="mean", encode="onehot", scale="standard"):
+        """Обучение CleaningPipeline на эталонных данных теми же методами, что и у DataCleaner."""
+        steps = []
+        if missing:
+            steps.append(("missing", {"strategy": missing}))
+        if encode:
+            steps.append(("encode", {"method": encode}))
+        if scale:
+            steps.append(("scale", {"method": scale}))
+        self.pipeline = CleaningPipeline(steps).fit(df)
+        return self.pipeline
+
+    def convert_dates(self, df, date_columns, formats=None, dayfirst: bool = False, max_invalid: float = 0.0,
+                      sample_size: int = 1000, max_workers=None):
+        """
+        Преобразование столбцов в datetime с одним явным форматом на столбец, выведенным по выборке
+        значений (или заданным в ``formats``: {столбец: формат или список форматов}); уникальные строки
+        разбираются один раз (см. parse_dates), столбцы обрабатываются в ``max_workers`` потоках.
+        Если выборке нужны несовместимые форматы, столбец не преобразуется (см. infer_date_format).
+        Пустые строки становятся NaT и не считаются ошибками разбора.
+
+        Столбец, в котором не разобрана доля непустых значений больше ``max_invalid``, остаётся без
+        изменений и попадает в ``self.date_failures`` ({столбец: причина}); при допустимой доле
+        неразобранные значения становятся NaT. Использованные форматы — в ``self.date_formats``.
+        Для итератора чанков форматы и набор преобразуемых столбцов определяются по первому чанку
+        (см. _iter_convert_dates).
+        """
+        if is_chunk_stream(df):
+            return self._iter_convert_dates(df, date_columns, formats, dayfirst, max_invalid, sample_size,
+                                            max_workers)
+        df = df if self.inplace else df.copy()
+        self.date_formats, self.date_failures = {}, {}
+        results = self._parse_date_columns(df, date_columns, formats or {}, dayfirst, max_invalid, sample_size,
+                                           max_workers)
+        for col, converted, error in results:
+            if error is not None:
+                self.date_failures[col] = error
+                print(f"[ERROR] Не удалось преобразовать колонку {col} в datetime: {error}")
+                continue
+            parsed, used, failed, _ = converted
+            df[col] = parsed
+            self.date_formats[col] = used
+            if failed:
+                print(f"[WARNING] Колонка {col}: {failed} значений не разобрано и заменено на NaT")
         return df
 
-    def convert_dates(self, df, date_columns):
-        df = df.copy()
-        for col in date_columns:
+    @staticmethod
+    def _parse_date_columns(df, date_columns, formats, dayfirst, max_invalid, sample_size, max_workers):
+        """
+        [(столбец, (parsed, форматы, не разобрано, непустых) или None, ошибка или None)];
+        ``max_invalid=None`` — столбец преобразуется при любой доле ошибок.
+        """
+        def convert(col):
+            if col not in df.columns:
+                return col, None, "столбец отсутствует"
+            fmt = formats.get(col)
             try:
-                df[col] = pd.to_datetime(df[col])
+                parsed, used, failed = parse_dates(df[col], fmt, sample_size, dayfirst)
             except Exception as e:
-                print(f"[ERROR] Не удалось преобразовать колонку {col} в datetime: {e}")
-        return df
\ No newline at end of file
+                return col, None, str(e)
+            # Пустые строки — пропуски, в число непустых значений не входят
+            total = int(parsed.notna().sum()) + failed
+            if max_invalid is not None and failed and (failed == total or failed > max_invalid * total):
+                return col, None, f"не разобрано {failed} из {total} значений (форматы: {used or 'не найдены'})"
+            return col, (parsed, used, failed, total), None
+
+        workers = min(len(date_columns), max_workers or os.cpu_count() or 1)
+        if workers > 1 and len(date_columns) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(convert, date_columns))
+        return [convert(col) for col in date_columns]
+
+    def _iter_convert_dates(self, chunks, date_columns, formats, dayfirst, max_invalid, sample_size, max_workers):
+        """
+        Решение о столбце принимается один раз — по первому чанку (выборка для формата и порог
+        ``max_invalid``), поэтому тип столбца одинаков во всех чанках. В следующих чанках
+        выбранные столбцы разбираются теми же форматами, неразобранные значения становятся NaT;
+        счётчики ошибок копятся по всему потоку, и превышение порога в целом попадает
+        в ``self.date_failures`` в конце потока.
+        """
+        formats = dict(formats or {})
+        self.date_formats, self.date_failures = {}, {}
+        columns, counts = None, {}
+        for chunk in chunks:
+            chunk = chunk if self.inplace else chunk.copy()
+            first = columns is None
+            if first:
+                results = self._parse_date_columns(chunk, date_columns, formats, dayfirst, max_invalid,
+                                                   sample_size, max_workers)
+            else:
+                # Формат не найден в первом чанке (там только пропуски) — выводится по текущему
+                chunk_formats = {col: self.date_formats[col] or formats.get(col) for col in columns}
+                results = self._parse_date_columns(chunk, columns, chunk_formats, dayfirst, None,
+                                                   sample_size, max_workers)
+            for col, converted, error in results:
+                if error is not None:
+                    self.date_failures[col] = error
+                    print(f"[ERROR] Не удалось преобразовать колонку {col} в datetime: {error}")
+                    if not first and col in chunk.columns:
+                        chunk[col] = pd.Series(pd.NaT, index=chunk.index, dtype="datetime64[ns]")
+                    continue
+                parsed, used, failed, total = converted
+                chunk[col] = parsed
+                if used:
+                    self.date_formats[col] = used
+                else:
+                    self.date_formats.setdefault(col, used)
+                done = counts.setdefault(col, [0, 0])
+                done[0] += failed
+                done[1] += total
+            if first:
+                columns = [col for col in date_columns if col in self.date_formats]
+            yield chunk
+
+        for col, (failed, total) in counts.items():
+            if failed:
+                print(f"[WARNING] Колонка {col}: {failed} значений не разобрано и заменено на NaT")
+            if failed > max_invalid * total and col not in self.date_failures:
+                self.date_failures[col] = (f"не разобрано {failed} из {total} значений в потоке "
+                                           f"(порог превышен после первого чанка, значения заменены на NaT)")
+
+
+class MissingValuesStep:
+    """Заполнение пропусков средним/медианой, запомненными при fit, или удаление строк."""
+
+    def __init__(self, strategy="mean"):
+        if strategy not in ("mean", "median", "drop"):
+            raise ValueError("Стратегия должна быть 'mean', 'median' или 'drop'")
+        self.strategy = strategy
+        self.fill_values = None
+
+    def fit(self, df):
+        if self.strategy == "mean":
+            self.fill_values = df.mean(numeric_only=True)
+        elif self.strategy == "median":
+            self.fill_values = df.median(numeric_only=True)
+        return self
+
+    def transform(self, df):
+        if self.strategy == "drop":
+            return df.dropna()
+        return df.fillna(self.fill_values)
+
+
+class CategoricalEncodingStep:
+    """
+    Кодирование категорий по словарям, запомненным при fit. ``label``: код по отсортированному
+    словарю (как DataCleaner.encode_categorical), неизвестные значения и пропуски -> -1. ``onehot``: фиксированный
+    набор столбцов ``<столбец>_<значение>``, неизвестные значения дают нули во всех столбцах.
+    """
+
+    def __init__(self, method="onehot"):
+        if method not in ("label", "onehot"):
+            raise ValueError("Метод кодирования должен быть 'label' или 'onehot'")
+        self.method = method
+        self.vocabularies = {}
+
+    def fit(self, df):
+        self.vocabularies = {}
+        for col in categorical_columns(df):
+            _, self.vocabularies[col] = fit_label_vocabulary(df[col])
+        return self
+
+    def transform(self, df):
+        df = df.copy()
+        if self.method == "label":
+            for col, vocab in self.vocabularies.items():
+                if col in df.columns:
+                    df[col] = apply_label_vocabulary(df[col], vocab)
+            return df
+
+        parts, drop = [], []
+        for col, vocab in self.vocabularies.items():
+            if col not in df.columns:
+                continue
+            codes = apply_label_vocabulary(df[col], vocab)
+            parts.append(dummy_frame(codes, [f"{col}_{v}" for v in vocab], df.index))
+            drop.append(col)
+        return pd.concat([df.drop(columns=drop)] + parts, axis=1)
+
+
+class ScalingStep:
+    """Масштабирование по параметрам, запомненным при fit (см. NumericScaler)."""
+
+    def __init__(self, method="standard"):
+        self.scaler = NumericScaler(method)
+        self.method = method
+
+    def fit(self, df):
+        self.scaler.fit(df)
+        return self
+
+    def transform(self, df):
+        return self.scaler.transform(df)
+
+
+class CleaningPipeline:
+    """
+    Обучаемый пайплайн очистки: ``fit`` один раз на эталонных данных запоминает средние/медианы,
+    словари категорий и параметры масштабирования; ``transform`` применяет их к новым батчам
+    или итератору чанков за O(n) без повторного обучения, поэтому поток очищается согласованно.
+    Шаги — пары ``(имя, параметры)`` (``missing``, ``encode``, ``scale``) или готовые объекты
+    с методами fit/transform. Пайплайн сериализуется pickle (``save`` / ``load``).
+    """
+
+    STEP_TYPES = {
+        "missing": MissingValuesStep,
+        "encode": CategoricalEncodingStep,
+        "scale": ScalingStep,
+    }
+
+    def __init__(self, steps):
+        self.steps = []
+        for step in steps:
+            if isinstance(step, tuple):
+                name, params = step
+                if name not in self.STEP_TYPES:
+                    raise ValueError(f"Неизвестный шаг пайплайна: {name}")
+                step = self.STEP_TYPES[name](**(params or {}))
+            self.steps.append(step)
+        self.fitted = False
+
+    def fit(self, df):
+        """Шаги обучаются последовательно: каждый — на выходе предыдущего."""
+        self.fit_transform(df)
+        return self
+
+    def fit_transform(self, df):
+        for step in self.steps:
+            df = step.fit(df).transform(df)
+        self.fitted = True
+        return df
+
+    def transform(self, df):
+        if not self.fitted:
+            raise RuntimeError("Пайплайн не обучен: сначала вызовите fit()")
+        if is_chunk_stream(df):
+            return (self.transform(chunk) for chunk in df)
+        for step in self.steps:
+            df = step.transform(df)
+        return df
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
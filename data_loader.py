@@ -1,16 +1,231 @@
+import codecs
+import contextlib
+import glob
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
 from sqlalchemy.exc import SQLAlchemyError
 
+from data_cache import DatasetCache
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = tuple(int(p) for p in pd.__version__.split(".")[:2]) >= (2, 2)
+except ImportError:
+    HAS_CALAMINE = False
+
+
+# Строковые литералы и идентификаторы в кавычках оставляются как есть, комментарии -- и /* */ вырезаются
+_SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|--[^\n]*|/\*.*?\*/""", re.DOTALL)
+
+
+def _wrap_copy_query(sql_query: str) -> str:
+    """Запрос SELECT -> ``COPY (...) TO STDOUT``: без комментариев и завершающей ``;``, один оператор."""
+    query = _SQL_TOKENS.sub(lambda m: m.group(1) or " ", sql_query).strip().rstrip(";").strip()
+    if not query or ";" in _SQL_TOKENS.sub("", query):
+        raise ValueError("Для COPY нужен ровно один запрос SELECT")
+    return f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if abs(n) < 1024 or unit == "ГБ":
+            return f"{n:.1f} {unit}" if unit != "Б" else f"{int(n)} {unit}"
+        n /= 1024
+
+
+def _read_excel_sheet(filepath, sheet_name, engine):
+    # Функция уровня модуля, чтобы её можно было выполнить в отдельном процессе
+    return sheet_name, pd.read_excel(filepath, sheet_name=sheet_name, engine=engine)
+
+
+def _read_data_file(filepath, sheet_name=0):
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in (".xlsx", ".xlsm", ".xls", ".xlsb", ".ods"):
+        return pd.read_excel(filepath, sheet_name=sheet_name, engine=DataLoader.excel_engine(filepath))
+    if ext == ".parquet":
+        return pd.read_parquet(filepath)
+    if ext in (".feather", ".arrow"):
+        return pd.read_feather(filepath)
+    return pd.read_csv(filepath)
+
+
+def _same_dtype_kind(a, b) -> bool:
+    """Типы столбца в разных файлах совместимы: совпадают или оба числовые (int/float, без bool) либо строковые."""
+    if a == b:
+        return True
+    types = pd.api.types
+    if types.is_bool_dtype(a) or types.is_bool_dtype(b):
+        return False
+    if types.is_numeric_dtype(a) and types.is_numeric_dtype(b):
+        return True
+    return all(types.is_object_dtype(t) or types.is_string_dtype(t) for t in (a, b))
+
 
 class DataLoader:
-    def load_csv(self, filepath: str) -> pd.DataFrame:
+    """
+    Загрузка данных из файлов, PostgreSQL и REST API.
+
+    SQLAlchemy-движки PostgreSQL кэшируются по (host, port, database, user) и переиспользуют
+    пул соединений между запросами. Движки, не использовавшиеся дольше ``idle_timeout`` секунд,
+    закрываются при следующем обращении; ``close()`` (или выход из ``with``) закрывает все.
+    HTTP-запросы идут через общую ``requests.Session`` с пулом соединений и повтором
+    запросов при 429/5xx с экспоненциальной задержкой.
+    Если передан ``cache`` (``DatasetCache``), результаты загрузки CSV, Excel, SQL и API
+    (кроме потоковых режимов) кэшируются на диске; ``refresh=True`` в методе загрузки читает
+    источник заново в обход кэша и обновляет запись.
+    ``mp_context`` — контекст multiprocessing для процессов разбора файлов (load_files, листы Excel);
+    из многопоточного приложения (GUI) нужен ``multiprocessing.get_context("spawn")``: fork копирует
+    процесс вместе с блокировками, захваченными другими потоками.
+    """
+
+    USER_AGENT = 'DataLoaderApp/1.0 (https://example.com; contact@example.com)'
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_size: int = 5, max_overflow: int = 10, pool_pre_ping: bool = True,
+                 pool_recycle: int = 1800, idle_timeout: float = 600.0,
+                 http_pool_size: int = 16, http_retries: int = 3, http_backoff: float = 0.5,
+                 cache: DatasetCache = None, mp_context=None):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+        self.idle_timeout = idle_timeout
+        self.http_pool_size = http_pool_size
+        self.http_retries = http_retries
+        self.http_backoff = http_backoff
+        self._engines = {}
+        self._engines_lock = threading.Lock()
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.cache = cache
+        self.mp_context = mp_context
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Закрытие всех кэшированных движков и их пулов соединений."""
+        with self._engines_lock:
+            engines, self._engines = self._engines, {}
+        for entry in engines.values():
+            entry["engine"].dispose()
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def _cache_get(self, key, refresh: bool = False):
+        # refresh: запись в кэше не читается, но свежий результат её заменит
+        if self.cache is None or key is None or refresh:
+            return None
+        df = self.cache.get(key)
+        if df is not None:
+            print("[INFO] Данные загружены из кэша.")
+        return df
+
+    def _cache_put(self, key, df, kind):
+        if self.cache is not None and key is not None and isinstance(df, pd.DataFrame) and not df.empty:
+            self.cache.put(key, df, kind=kind)
+
+    def _get_session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                retry = Retry(
+                    total=self.http_retries,
+                    backoff_factor=self.http_backoff,
+                    status_forcelist=self.RETRY_STATUSES,
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=self.http_pool_size,
+                                      pool_maxsize=self.http_pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = self.USER_AGENT
+                self._session = session
+            return self._session
+
+    def _evict_idle_engines(self, now):
+        stale = [key for key, entry in self._engines.items() if now - entry["last_used"] > self.idle_timeout]
+        for key in stale:
+            self._engines.pop(key)["engine"].dispose()
+
+    def _get_engine(self, host, port, database, user, password):
+        key = (host, int(port), database, user)
+        now = time.monotonic()
+        with self._engines_lock:
+            self._evict_idle_engines(now)
+            entry = self._engines.get(key)
+            if entry is not None and entry["password"] != password:
+                self._engines.pop(key)["engine"].dispose()
+                entry = None
+            if entry is None:
+                url = URL.create("postgresql+psycopg2", username=user, password=password,
+                                 host=host, port=int(port), database=database)
+                engine = create_engine(
+                    url,
+                    connect_args={'connect_timeout': 10},
+                    pool_size=self.pool_size,
+                    max_overflow=self.max_overflow,
+                    pool_pre_ping=self.pool_pre_ping,
+                    pool_recycle=self.pool_recycle,
+                )
+                entry = {"engine": engine, "password": password}
+                self._engines[key] = entry
+            entry["last_used"] = now
+            return entry["engine"]
+
+    def load_csv(self, filepath: str, chunksize: int = None, lock_dtypes: bool = True,
+                 compact: bool = False, refresh: bool = False) -> pd.DataFrame:
+        """
+        Загрузка CSV. При ``chunksize`` возвращает итератор DataFrame-чанков по ``chunksize`` строк,
+        не читая файл целиком. С ``lock_dtypes`` типы столбцов определяются по первому чанку
+        и фиксируются для всех последующих. ``compact`` — см. ``compact_dtypes``; в потоковом
+        режиме карта компактных типов строится по первому чанку и одинакова для всех чанков.
+        """
         try:
+            if chunksize:
+                reader = pd.read_csv(filepath, chunksize=chunksize)
+                first = reader.get_chunk()
+                if first.empty:
+                    raise ValueError("Файл CSV пуст.")
+                print(f"[INFO] CSV файл открыт в потоковом режиме: {filepath}, чанк: {chunksize} строк")
+                return self._iter_csv_chunks(first, reader, first.dtypes if lock_dtypes else None, compact)
+
+            key = DatasetCache.file_key(filepath, source="csv", compact=compact) if self.cache else None
+            df = self._cache_get(key, refresh)
+            if df is not None:
+                return df
+
             df = pd.read_csv(filepath)
             if df.empty:
                 raise ValueError("Файл CSV пуст.")
             print(f"[INFO] CSV файл успешно загружен: {filepath}")
+            df = self.compact_dtypes(df) if compact else df
+            self._cache_put(key, df, "file")
             return df
         except pd.errors.EmptyDataError:
             error_msg = "Файл CSV пуст или содержит только заголовки."
@@ -29,17 +244,169 @@ class DataLoader:
             print(f"[ERROR] {error_msg}")
             return None
 
-    def load_excel(self, filepath: str, sheet_name=0) -> pd.DataFrame:
+    @staticmethod
+    def _iter_csv_chunks(first, reader, dtypes=None, compact=False):
+        dtypes = dtypes.copy() if dtypes is not None else None
+        compact_map = None
+        with reader:
+            chunk = first
+            while chunk is not None:
+                if dtypes is not None:
+                    chunk = DataLoader._lock_chunk_dtypes(chunk, dtypes)
+                if compact:
+                    if compact_map is None:
+                        compact_map = DataLoader.compact_dtype_map(chunk, stream=True)
+                    chunk = DataLoader._compact_chunk(chunk, compact_map)
+                yield chunk
+                try:
+                    chunk = reader.get_chunk()
+                except StopIteration:
+                    chunk = None
+
+    @staticmethod
+    def _lock_chunk_dtypes(chunk, dtypes):
+        """Приведение чанка к типам первого чанка; при несовместимости тип расширяется до float64/object."""
+        for col, dtype in dtypes.items():
+            if col not in chunk.columns or chunk[col].dtype == dtype:
+                continue
+            try:
+                chunk[col] = chunk[col].astype(dtype)
+            except (ValueError, TypeError):
+                wider = np.float64 if pd.api.types.is_numeric_dtype(chunk[col]) else object
+                print(f"[WARNING] Колонка '{col}' не приводится к {dtype}, тип расширен до {np.dtype(wider)}.")
+                dtypes[col] = np.dtype(wider)
+                chunk[col] = chunk[col].astype(wider)
+        return chunk
+
+    @staticmethod
+    def compact_dtypes(df: pd.DataFrame, category_ratio: float = 0.5, use_arrow_strings: bool = True,
+                       verbose: bool = True) -> pd.DataFrame:
+        """
+        Компактные типы без потери данных: целые приводятся к минимальной разрядности,
+        float64 — к float32, если значения представимы точно, строковые столбцы с долей
+        уникальных значений не выше ``category_ratio`` — к ``category``, остальные строки —
+        к Arrow-строкам (если установлен pyarrow).
+        """
+        before = int(df.memory_usage(deep=True).sum())
+        df = df.copy()
+        for col, dtype in DataLoader.compact_dtype_map(df, category_ratio, use_arrow_strings).items():
+            df[col] = df[col].astype(dtype)
+        after = int(df.memory_usage(deep=True).sum())
+        if verbose:
+            print(f"[INFO] Компактные типы: {format_bytes(before)} → {format_bytes(after)} "
+                  f"(сэкономлено {format_bytes(before - after)})")
+        return df
+
+    @staticmethod
+    def compact_dtype_map(df: pd.DataFrame, category_ratio: float = 0.5, use_arrow_strings: bool = True,
+                          stream: bool = False) -> dict:
+        """
+        {столбец: компактный тип} по правилам ``compact_dtypes`` (в карту попадают только меняющиеся
+        столбцы). При ``stream`` карта строится по первому чанку и применяется ко всем (см.
+        ``_compact_chunk``), поэтому строки не переводятся в ``category``: у каждого чанка был бы свой
+        набор категорий, и pd.concat потока дал бы object — вместо этого используются строковые типы.
+        """
+        dtypes = {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            if pd.api.types.is_integer_dtype(series):
+                downcast = "unsigned" if len(series) and series.min() >= 0 else "integer"
+                dtype = pd.to_numeric(series, downcast=downcast).dtype
+            elif pd.api.types.is_float_dtype(series) and series.dtype.itemsize > 4:
+                as32 = series.astype(np.float32)
+                exact = np.array_equal(as32.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64),
+                                       equal_nan=True)
+                dtype = as32.dtype if exact else series.dtype
+            elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+                if not pd.api.types.is_string_dtype(series.dropna()):
+                    continue
+                if not stream and len(series) and series.nunique(dropna=True) <= category_ratio * len(series):
+                    dtype = pd.CategoricalDtype()
+                elif use_arrow_strings and HAS_PYARROW:
+                    dtype = pd.StringDtype("pyarrow")
+                elif stream:
+                    dtype = pd.StringDtype()
+                else:
+                    continue
+            else:
+                continue
+            if dtype != series.dtype:
+                dtypes[col] = dtype
+        return dtypes
+
+    @staticmethod
+    def _compact_chunk(chunk: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+        """
+        Приведение чанка потока к карте компактных типов первого чанка (``compact_dtype_map``). Если
+        значения чанка не помещаются в тип (целые вне диапазона, float не представим в float32),
+        тип в карте расширяется с предупреждением и дальше используется расширенный.
+        """
+        chunk = chunk.copy()
+        for col, dtype in list(dtypes.items()):
+            if col not in chunk.columns:
+                continue
+            series = chunk[col]
+            wider = None
+            if pd.api.types.is_integer_dtype(dtype):
+                if not pd.api.types.is_integer_dtype(series):
+                    wider = series.dtype
+                elif len(series) and series.notna().any():
+                    info = np.iinfo(getattr(dtype, "numpy_dtype", dtype))
+                    if series.min() < info.min or series.max() > info.max:
+                        wider = pd.Int64Dtype() if isinstance(dtype, pd.api.extensions.ExtensionDtype) \
+                            else np.promote_types(dtype, pd.to_numeric(series, downcast="integer").dtype)
+            elif dtype == np.float32:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                if not np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True):
+                    wider = np.dtype(np.float64)
+            if wider is not None and wider != dtype:
+                print(f"[WARNING] Колонка '{col}' не помещается в {dtype}, тип расширен до {wider}.")
+                dtypes[col] = dtype = wider
+            chunk[col] = series.astype(dtype)
+        return chunk
+
+    @staticmethod
+    def excel_engine(filepath: str, engine: str = "auto") -> str:
+        """
+        Выбор движка чтения Excel: при ``"auto"`` — calamine (Rust, если установлен python-calamine),
+        иначе стандартный для расширения файла (openpyxl в режиме read-only для .xlsx).
+        """
+        if engine != "auto":
+            return engine
+        if HAS_CALAMINE:
+            return "calamine"
+        ext = os.path.splitext(filepath)[1].lower()
+        return {".xls": "xlrd", ".xlsb": "pyxlsb", ".ods": "odf"}.get(ext, "openpyxl")
+
+    def load_excel(self, filepath: str, sheet_name=0, compact: bool = False, engine: str = "auto",
+                   max_workers: int = None, refresh: bool = False) -> pd.DataFrame:
+        """
+        Загрузка листа Excel. ``engine`` — движок pandas или ``"auto"`` (см. ``excel_engine``).
+        Если ``sheet_name`` — список листов или ``None`` (все листы), возвращается словарь
+        {имя листа: DataFrame}; листы читаются параллельно в ``max_workers`` процессах.
+        """
         try:
-            df = pd.read_excel(filepath, sheet_name=sheet_name)
-            if isinstance(df, dict):
-                raise ValueError("Выбрано несколько листов. Укажите один лист.")
+            engine = self.excel_engine(filepath, engine)
+            if sheet_name is None or isinstance(sheet_name, (list, tuple)):
+                return self._load_excel_sheets(filepath, sheet_name, engine, compact, max_workers)
+
+            key = DatasetCache.file_key(filepath, source="excel", sheet=sheet_name, compact=compact) \
+                if self.cache else None
+            df = self._cache_get(key, refresh)
+            if df is not None:
+                return df
+
+            df = pd.read_excel(filepath, sheet_name=sheet_name, engine=engine)
             if df.empty:
                 raise ValueError("Лист Excel пуст.")
             print(f"[INFO] Excel файл успешно загружен: {filepath}, лист: {sheet_name}")
+            df = self.compact_dtypes(df) if compact else df
+            self._cache_put(key, df, "file")
             return df
         except ValueError as ve:
-            if "No sheet named" in str(ve):
+            if "No sheet named" in str(ve) or "Worksheet named" in str(ve):
                 error_msg = f"Лист '{sheet_name}' не найден в файле."
             else:
                 error_msg = str(ve)
@@ -58,17 +425,212 @@ class DataLoader:
             print(f"[ERROR] {error_msg}")
             return None
 
-    def load_from_postgresql(self, host, port, database, user, password, sql_query) -> pd.DataFrame:
+    def _load_excel_sheets(self, filepath, sheet_names, engine, compact=False, max_workers=None) -> dict:
+        if sheet_names is None:
+            with pd.ExcelFile(filepath, engine=engine) as book:
+                sheet_names = book.sheet_names
+        sheet_names = list(sheet_names)
+
+        workers = min(len(sheet_names), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=self.mp_context) as pool:
+                results = list(pool.map(_read_excel_sheet, [filepath] * len(sheet_names), sheet_names,
+                                        [engine] * len(sheet_names)))
+        else:
+            results = [_read_excel_sheet(filepath, name, engine) for name in sheet_names]
+
+        frames = {}
+        for name, df in results:
+            if df.empty:
+                print(f"[WARNING] Лист '{name}' пуст.")
+            frames[name] = self.compact_dtypes(df, verbose=False) if compact else df
+        print(f"[INFO] Excel файл успешно загружен: {filepath}, листов: {len(frames)} (движок: {engine})")
+        return frames
+
+    def load_parquet(self, filepath: str, columns=None, filters=None, compact: bool = False) -> pd.DataFrame:
+        """
+        Загрузка Parquet (файл или директория датасета) через pyarrow.
+        ``columns`` — читаемые столбцы, ``filters`` — условия в формате pyarrow
+        (``[("year", "=", 2024), ("amount", ">", 0)]``): группы строк, которые по статистикам
+        не могут им удовлетворять, не читаются с диска.
+        """
+        try:
+            if not HAS_PYARROW:
+                raise ImportError("Для чтения Parquet нужен pyarrow (pip install pyarrow).")
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(filepath, columns=columns, filters=filters)
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+            del table
+            print(f"[INFO] Parquet успешно загружен: {filepath}, строк: {len(df)}")
+            return self.compact_dtypes(df) if compact else df
+        except FileNotFoundError:
+            print("[ERROR] Файл Parquet не найден.")
+            return None
+        except Exception as e:
+            print(f"[ERROR] Ошибка при загрузке Parquet: {e}")
+            return None
+
+    def load_arrow(self, filepath: str, columns=None, filters=None, memory_map: bool = True,
+                   compact: bool = False) -> pd.DataFrame:
+        """
+        Загрузка Arrow IPC / Feather. При ``memory_map`` файл отображается в память и читаются
+        только страницы выбранных ``columns``; ``filters`` — как в ``load_parquet``.
+        """
         try:
-            engine = create_engine(
-                f"postgresql://{user}:{password}@{host}:{port}/{database}",
-                connect_args={'connect_timeout': 10}
+            if not HAS_PYARROW:
+                raise ImportError("Для чтения Arrow/Feather нужен pyarrow (pip install pyarrow).")
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            import pyarrow.parquet as pq
+
+            try:
+                table = feather.read_table(filepath, columns=columns, memory_map=memory_map)
+            except pa.ArrowInvalid:
+                # Потоковый формат IPC (без футера файла)
+                source = pa.memory_map(filepath) if memory_map else pa.OSFile(filepath)
+                with source, pa.ipc.open_stream(source) as reader:
+                    table = reader.read_all()
+                if columns is not None:
+                    table = table.select(columns)
+            if filters:
+                table = table.filter(pq.filters_to_expression(filters))
+            df = table.to_pandas(split_blocks=True)
+            del table
+            print(f"[INFO] Arrow файл успешно загружен: {filepath}, строк: {len(df)}")
+            return self.compact_dtypes(df) if compact else df
+        except FileNotFoundError:
+            print("[ERROR] Файл Arrow не найден.")
+            return None
+        except Exception as e:
+            print(f"[ERROR] Ошибка при загрузке Arrow: {e}")
+            return None
+
+    DATA_FILE_EXTENSIONS = (".csv", ".xlsx", ".xlsm", ".xls", ".xlsb", ".ods", ".parquet", ".feather", ".arrow")
+
+    @classmethod
+    def expand_paths(cls, source) -> list:
+        """Список файлов по glob-шаблону, директории (CSV/Excel/Parquet/Feather внутри) или списку путей."""
+        if isinstance(source, (list, tuple)):
+            return [str(p) for p in source]
+        if os.path.isdir(source):
+            return sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(cls.DATA_FILE_EXTENSIONS)
             )
-            df = pd.read_sql_query(sql_query, engine)
+        return sorted(glob.glob(source, recursive=True))
+
+    def load_files(self, source, source_column: str = "source_file", sheet_name=0, max_workers: int = None,
+                   strict_schema: bool = True, compact: bool = False, progress=None) -> pd.DataFrame:
+        """
+        Загрузка набора CSV/Excel/Parquet/Feather-файлов (glob-шаблон, директория или список путей) в один DataFrame.
+
+        Файлы разбираются параллельно в ``max_workers`` процессах. Схема сверяется с первым файлом:
+        набор столбцов (порядок не важен — столбцы выравниваются по первому файлу перед concat;
+        недостающие и лишние перечисляются отдельно) и типы (int и float, строки и object считаются
+        совместимыми). При ``strict_schema`` расхождение — ошибка, иначе предупреждение, недостающие
+        столбцы заполняются NaN, лишние добавляются в конец. ``source_column`` (если задан) хранит имя файла-источника
+        в виде ``category``. Результат собирается одним ``pd.concat``.
+        ``progress(done, total, path)`` вызывается после разбора каждого файла.
+        """
+        try:
+            paths = self.expand_paths(source)
+            if not paths:
+                raise ValueError(f"Файлы не найдены: {source}")
+
+            frames = [None] * len(paths)
+            workers = min(len(paths), max_workers or os.cpu_count() or 1)
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=self.mp_context) as pool:
+                    futures = {pool.submit(_read_data_file, path, sheet_name): i for i, path in enumerate(paths)}
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        i = futures[future]
+                        frames[i] = future.result()
+                        if progress:
+                            progress(done, len(paths), paths[i])
+            else:
+                for i, path in enumerate(paths):
+                    frames[i] = _read_data_file(path, sheet_name)
+                    if progress:
+                        progress(i + 1, len(paths), path)
+
+            columns = list(frames[0].columns)
+            expected = frames[0].dtypes
+            for path, df in zip(paths[1:], frames[1:]):
+                problems = []
+                missing = [c for c in columns if c not in df.columns]
+                if missing:
+                    problems.append(f"нет столбцов {missing}")
+                extra = [c for c in df.columns if c not in expected.index]
+                if extra:
+                    problems.append(f"лишние столбцы {extra}")
+                    columns += extra
+                    expected = pd.concat([expected, df.dtypes[extra]])
+                mismatched = [f"{c}: {df[c].dtype} вместо {expected[c]}" for c in df.columns
+                              if c not in extra and not _same_dtype_kind(df[c].dtype, expected[c])]
+                if mismatched:
+                    problems.append(f"другие типы {mismatched}")
+                if not problems:
+                    continue
+                msg = f"Схема файла {os.path.basename(path)} отличается: {'; '.join(problems)}"
+                if strict_schema:
+                    raise ValueError(msg)
+                print(f"[WARNING] {msg}")
+            # Один порядок столбцов во всех файлах: concat не переупорядочивает каждый файл по именам
+            for i, df in enumerate(frames):
+                ordered = [c for c in columns if c in df.columns]
+                if list(df.columns) != ordered:
+                    frames[i] = df[ordered]
+
+            if source_column:
+                labels = [os.path.basename(p) for p in paths]
+                if len(set(labels)) < len(labels):
+                    labels = paths
+                categories = pd.Index(labels)
+                for i, df in enumerate(frames):
+                    df[source_column] = pd.Categorical.from_codes(np.full(len(df), i, dtype=np.int32),
+                                                                  categories=categories)
+
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            print(f"[INFO] Загружено файлов: {len(paths)}, строк: {len(df)}")
+            return self.compact_dtypes(df) if compact else df
+        except Exception as e:
+            print(f"[ERROR] Ошибка при загрузке набора файлов: {e}")
+            return None
+
+    def load_from_postgresql(self, host, port, database, user, password, sql_query,
+                             compact: bool = False, chunksize: int = None, progress=None,
+                             bulk: bool = False, refresh: bool = False) -> pd.DataFrame:
+        """
+        Выполнение SQL-запроса. При ``chunksize`` результат читается через серверный (именованный)
+        курсор и возвращается итератор DataFrame по ``chunksize`` строк; ``progress(rows)``
+        вызывается после каждого чанка с накопленным числом строк. Итератор держит соединение
+        с базой, пока не дочитан: если поток читается не до конца, закройте его
+        (``with contextlib.closing(chunks): ...``).
+        При ``bulk`` запрос выгружается через ``COPY ... TO STDOUT`` (см. ``_copy_query``) целиком,
+        поэтому ``bulk`` и ``chunksize`` вместе не задаются (ValueError).
+        """
+        if chunksize and bulk:
+            raise ValueError("bulk (COPY) и chunksize несовместимы: COPY выгружает результат целиком")
+        try:
+            engine = self._get_engine(host, port, database, user, password)
+            if chunksize:
+                return self._stream_sql_query(engine, sql_query, chunksize, progress, compact)
+            key = DatasetCache.sql_key(sql_query, host, port, database, user, compact=compact) \
+                if self.cache else None
+            df = self._cache_get(key, refresh)
+            if df is not None:
+                return df
+            if bulk:
+                df = self._copy_query(engine, sql_query)
+            else:
+                df = pd.read_sql_query(sql_query, engine)
             if df.empty:
                 print("[WARNING] Запрос выполнен, но данные пусты.")
             else:
                 print("[INFO] Данные успешно загружены из PostgreSQL.")
+            df = self.compact_dtypes(df) if compact else df
+            self._cache_put(key, df, "sql")
             return df
         except SQLAlchemyError as e:
             orig = e.orig
@@ -84,23 +646,118 @@ class DataLoader:
             print(f"[ERROR] {error_msg}")
             return None
 
-    def load_from_api(self, url, headers=None, params=None, expect_json=True):
+    @staticmethod
+    def _copy_query(engine, sql_query) -> pd.DataFrame:
+        """
+        Выгрузка результата запроса через ``COPY (...) TO STDOUT (FORMAT csv)``.
+        Поток CSV передаётся из psycopg2 в парсер через pipe, без временного файла и без
+        буферизации всего ответа; при установленном pyarrow используется его CSV-парсер.
+        Типы столбцов определяются парсером по тексту, а не по схеме PostgreSQL.
+        Комментарии SQL и завершающая ``;`` вырезаются; несколько операторов — ValueError.
+        """
+        copy_sql = _wrap_copy_query(sql_query)
+        raw = engine.raw_connection()
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def write_copy():
+            try:
+                with os.fdopen(write_fd, "wb") as sink:
+                    cursor = raw.cursor()
+                    try:
+                        cursor.copy_expert(copy_sql, sink)
+                    finally:
+                        cursor.close()
+            except BrokenPipeError:
+                pass
+            except Exception as e:
+                errors.append(e)
+
+        writer = threading.Thread(target=write_copy, daemon=True)
+        writer.start()
+        try:
+            with os.fdopen(read_fd, "rb") as source:
+                try:
+                    df = pd.read_csv(source, engine="pyarrow" if HAS_PYARROW else "c")
+                except pd.errors.EmptyDataError:
+                    df = pd.DataFrame()
+        finally:
+            writer.join()
+            raw.close()
+        if errors:
+            raise errors[0]
+        return df
+
+    def _stream_sql_query(self, engine, sql_query, chunksize, progress=None, compact=False):
+        conn = engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize)
+        try:
+            chunks = pd.read_sql_query(sql_query, conn, chunksize=chunksize)
+            first = next(chunks, None)
+        except Exception:
+            conn.close()
+            raise
+        if first is None:
+            print("[WARNING] Запрос выполнен, но данные пусты.")
+        else:
+            print(f"[INFO] Потоковая загрузка из PostgreSQL, чанк: {chunksize} строк")
+        return self._iter_sql_chunks(conn, first, chunks, progress, compact)
+
+    @staticmethod
+    def _iter_sql_chunks(conn, first, chunks, progress=None, compact=False):
+        """Соединение закрывается, когда итератор дочитан, закрыт (``close()``) или прерван исключением."""
+        total = 0
+        compact_map = None
+        with contextlib.closing(conn):
+            chunk = first
+            while chunk is not None:
+                total += len(chunk)
+                if progress:
+                    progress(total)
+                if compact:
+                    if compact_map is None:
+                        compact_map = DataLoader.compact_dtype_map(chunk, stream=True)
+                    chunk = DataLoader._compact_chunk(chunk, compact_map)
+                yield chunk
+                chunk = next(chunks, None)
+
+    def load_from_api(self, url, headers=None, params=None, expect_json=True, compact=False,
+                      stream=False, batch_size=10_000, refresh=False):
+        """
+        Загрузка JSON из API. При ``stream`` ответ читается потоком: NDJSON — построчно,
+        JSON-массив верхнего уровня — поэлементно, и DataFrame собирается пачками по ``batch_size``
+        записей, не держа в памяти весь текст ответа и всё дерево Python-объектов.
+        """
         try:
-            default_headers = {
-                'User-Agent': 'DataLoaderApp/1.0 (https://example.com; contact@example.com)'
-            }
-            if headers:
-                default_headers.update(headers)
+            key = DatasetCache.url_key(url, params, headers, compact=compact) \
+                if self.cache and expect_json else None
+            df = self._cache_get(key, refresh)
+            if df is not None:
+                return df
 
-            response = requests.get(url, headers=default_headers, params=params, timeout=10)
+            response = self._get_session().get(url, headers=headers, params=params, timeout=10,
+                                               stream=stream and expect_json)
             response.raise_for_status()
 
+            if expect_json and stream:
+                with response:
+                    try:
+                        df = self._records_to_frame(self._iter_json_records(response), batch_size, compact)
+                    except ValueError as e:
+                        print(f"[ERROR] Ответ не в формате JSON: {e}")
+                        return None
+                if df.empty:
+                    print("[WARNING] JSON получен, но структура пуста.")
+                self._cache_put(key, df, "url")
+                return df
+
             if expect_json:
                 try:
                     data = response.json()
                     df = pd.json_normalize(data)
                     if df.empty:
                         print("[WARNING] JSON получен, но структура пуста.")
+                    df = self.compact_dtypes(df) if compact else df
+                    self._cache_put(key, df, "url")
                     return df
                 except ValueError as e:
                     error_msg = f"Ответ не в формате JSON: {e}"
@@ -128,4 +785,207 @@ class DataLoader:
         except Exception as e:
             error_msg = f"Неизвестная ошибка при запросе к API: {e}"
             print(f"[ERROR] {error_msg}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _records_to_frame(records, batch_size, compact=False) -> pd.DataFrame:
+        frames, batch = [], []
+        compact_map = None
+
+        def add(frame):
+            nonlocal compact_map
+            if compact:
+                if compact_map is None:
+                    compact_map = DataLoader.compact_dtype_map(frame, stream=True)
+                frame = DataLoader._compact_chunk(frame, compact_map)
+            frames.append(frame)
+
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                add(pd.json_normalize(batch))
+                batch = []
+        if batch:
+            add(pd.json_normalize(batch))
+        if not frames:
+            return pd.DataFrame()
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _iter_json_records(response, chunk_size=1 << 16):
+        """
+        Поток записей из ответа: JSON-массив верхнего уровня разбирается поэлементно,
+        иначе ответ считается NDJSON (один объект на строку). Одиночный объект
+        верхнего уровня отдаётся как одна запись.
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+        chunks = response.iter_content(chunk_size=chunk_size)
+        buf, eof, pos = "", False, 0
+
+        def fill():
+            nonlocal buf, eof, pos
+            try:
+                buf = buf[pos:] + text_decoder.decode(next(chunks))
+            except StopIteration:
+                buf, eof = buf[pos:] + text_decoder.decode(b"", final=True), True
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip_ws()
+        in_array = pos < len(buf) and buf[pos] == "["
+        if in_array:
+            pos += 1
+
+        while True:
+            skip_ws()
+            if pos >= len(buf):
+                if in_array:
+                    raise ValueError("JSON-массив не закрыт")
+                return
+            if in_array and buf[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buf) and not eof:
+                # Значение может продолжаться в следующем блоке (например, число)
+                fill()
+                continue
+            pos = end
+            yield record
+            if in_array:
+                skip_ws()
+                if pos < len(buf) and buf[pos] == ",":
+                    pos += 1
+
+    def load_from_api_paginated(self, url, headers=None, params=None, pagination="offset",
+                                page_size=1000, records_key=None, max_pages=None, max_workers=8,
+                                offset_param="offset", limit_param="limit",
+                                cursor_param="cursor", cursor_key="next_cursor",
+                                timeout=30, compact=False, progress=None):
+        """
+        Загрузка постраничного API.
+
+        ``pagination``:
+          - ``"offset"`` — страницы запрашиваются параллельно (до ``max_workers`` одновременно)
+            с параметрами ``offset_param``/``limit_param``, пока не придёт неполная страница;
+          - ``"cursor"`` — следующий курсор берётся из поля ``cursor_key`` ответа;
+          - ``"link"`` — следующая страница берётся из заголовка ``Link: <...>; rel="next"``.
+        Курсорная и Link-пагинация последовательны по своей природе.
+        Записи страницы берутся из ``records_key`` (или из самого ответа, если это список),
+        каждая страница сразу нормализуется в DataFrame; ``progress(pages, rows)`` вызывается
+        после каждой страницы.
+        """
+        try:
+            if pagination == "offset":
+                frames = self._fetch_offset_pages(url, headers, params, page_size, records_key, max_pages,
+                                                  max_workers, offset_param, limit_param, timeout, progress)
+            elif pagination in ("cursor", "link"):
+                frames = self._fetch_sequential_pages(url, headers, params, pagination, page_size, records_key,
+                                                      max_pages, limit_param, cursor_param, cursor_key,
+                                                      timeout, progress)
+            else:
+                raise ValueError(f"Неизвестный тип пагинации: {pagination}")
+
+            frames = [f for f in frames if not f.empty]
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            if df.empty:
+                print("[WARNING] JSON получен, но структура пуста.")
+            else:
+                print(f"[INFO] Загружено страниц: {len(frames)}, строк: {len(df)}")
+            return self.compact_dtypes(df) if compact else df
+        except requests.exceptions.Timeout:
+            print("[ERROR] Таймаут запроса к API.")
+            return None
+        except requests.exceptions.ConnectionError:
+            print("[ERROR] Ошибка подключения к API (проверьте URL и интернет-соединение).")
+            return None
+        except requests.exceptions.HTTPError as e:
+            print(f"[ERROR] HTTP ошибка: {e.response.status_code} — {e.response.reason}")
+            return None
+        except Exception as e:
+            print(f"[ERROR] Ошибка при постраничной загрузке API: {e}")
+            return None
+
+    def _get_page(self, url, headers, params, timeout):
+        response = self._get_session().get(url, headers=headers, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _json_path(data, path):
+        for key in path.split("."):
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    @staticmethod
+    def _page_records(data, records_key):
+        if records_key:
+            data = DataLoader._json_path(data, records_key)
+        if data is None:
+            return []
+        return data if isinstance(data, list) else [data]
+
+    def _fetch_offset_pages(self, url, headers, params, page_size, records_key, max_pages,
+                            max_workers, offset_param, limit_param, timeout, progress):
+        def fetch(page):
+            page_params = dict(params or {}, **{offset_param: page * page_size, limit_param: page_size})
+            records = self._page_records(self._get_page(url, headers, page_params, timeout).json(), records_key)
+            return pd.json_normalize(records), len(records)
+
+        frames, rows, page, done = [], 0, 0, False
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while not done:
+                wave = range(page, page + max_workers)
+                if max_pages is not None:
+                    wave = range(page, min(page + max_workers, max_pages))
+                if not wave:
+                    break
+                for frame, count in pool.map(fetch, wave):
+                    frames.append(frame)
+                    rows += len(frame)
+                    if progress:
+                        progress(len(frames), rows)
+                    if count < page_size:
+                        done = True
+                        break
+                page += len(wave)
+        return frames
+
+    def _fetch_sequential_pages(self, url, headers, params, pagination, page_size, records_key, max_pages,
+                                limit_param, cursor_param, cursor_key, timeout, progress):
+        frames, rows = [], 0
+        page_params = dict(params or {}, **{limit_param: page_size})
+        while url and (max_pages is None or len(frames) < max_pages):
+            response = self._get_page(url, headers, page_params, timeout)
+            data = response.json()
+            frame = pd.json_normalize(self._page_records(data, records_key))
+            frames.append(frame)
+            rows += len(frame)
+            if progress:
+                progress(len(frames), rows)
+
+            if pagination == "link":
+                url = response.links.get("next", {}).get("url")
+                page_params = None  # ссылка уже содержит все параметры
+            else:
+                cursor = self._json_path(data, cursor_key)
+                if cursor is None or frame.empty:
+                    break
+                page_params = dict(page_params, **{cursor_param: cursor})
+        return frames
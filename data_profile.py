@@ -0,0 +1,154 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+SUMMARY_STATS = ("mean", "median", "std", "min", "max")
+MODE_METHODS = ("exact", "approx")
+
+
+def column_quantiles(block: np.ndarray, counts: np.ndarray, qs) -> np.ndarray:
+    """
+    Квантили по столбцам с линейной интерполяцией (как Series.quantile), NaN игнорируются.
+    Столбцы с одинаковым числом непустых значений обрабатываются одним np.partition — O(n),
+    без полной сортировки.
+    """
+    result = np.full((len(qs), block.shape[1]), np.nan)
+    for n in np.unique(counts):
+        cols = np.flatnonzero(counts == n)
+        if n == 0:
+            continue
+        pos = np.asarray(qs) * (n - 1)
+        lo, hi = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+        # NaN при partition уходят в конец, первые n позиций — непустые значения
+        part = np.partition(block[:, cols], np.unique(np.concatenate([lo, hi])), axis=0)
+        # Без интерполяции там, где она не нужна: иначе inf - inf даёт NaN для min/max
+        frac = (pos - lo)[:, None]
+        with np.errstate(invalid="ignore"):
+            result[:, cols] = np.where(frac > 0, part[lo] + (part[hi] - part[lo]) * frac, part[lo])
+    return result
+
+
+def numeric_summary(num: pd.DataFrame) -> pd.DataFrame:
+    """
+    Среднее, медиана, std (ddof=1, как DataFrame.std), min и max всех числовых столбцов по общему
+    float64-блоку: сумма и сумма квадратов отклонений — два векторных прохода, а медиана, min и max —
+    один np.partition (квантили 0, 0.5 и 1) вместо отдельного прохода на каждую статистику.
+    """
+    block = num.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(block)
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if counts.min(initial=len(block)) == len(block):
+            mean = block.sum(axis=0) / counts
+            squares = ((block - mean) ** 2).sum(axis=0)
+        else:
+            mean = np.where(valid, block, 0.0).sum(axis=0) / counts
+            squares = np.where(valid, block - mean, 0.0)
+            squares = (squares * squares).sum(axis=0)
+        std = np.sqrt(squares / (counts - 1))
+    low, median, high = column_quantiles(block, counts, [0.0, 0.5, 1.0])
+    empty = counts == 0
+    std[counts < 2] = np.nan
+    mean[empty] = np.nan
+    return pd.DataFrame({"mean": mean, "median": median, "std": std, "min": low, "max": high},
+                        index=num.columns)
+
+
+def column_mode(values: np.ndarray, method: str = "exact", sample_size: int = 100_000, seed: int = 0) -> float:
+    """
+    Мода столбца (при равенстве частот — наименьшее значение, как DataFrame.mode). Целые значения
+    с небольшим размахом считаются через np.bincount, остальные — по сериям после сортировки.
+    ``approx`` считает по случайной выборке из ``sample_size`` значений: для колонок с явно
+    преобладающим значением результат тот же, для почти уникальных — любое из частых значений.
+    """
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.nan
+    if method == "approx" and values.size > sample_size:
+        values = values[np.random.default_rng(seed).integers(0, values.size, sample_size)]
+    low, high = values.min(), values.max()
+    if np.isfinite(high - low) and high - low <= 4 * values.size + 1024 and (values == np.floor(values)).all():
+        counts = np.bincount((values - low).astype(np.int64))
+        return float(low + counts.argmax())
+    # Длины серий одинаковых значений в отсортированном массиве; первая самая длинная — наименьшее значение.
+    # Векторная сортировка float64 здесь в десятки раз быстрее хэш-подсчёта value_counts
+    values = np.sort(values)
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    runs = np.diff(np.append(starts, values.size))
+    return float(values[starts[runs.argmax()]])
+
+
+class DataProfile:
+    """
+    Кэш статистик одного загруженного DataFrame, общий для DataValidator, DataAnalyzer и DataReport.
+
+    Каждая статистика считается лениво — при первом запросе — и дальше берётся из кэша, поэтому
+    валидация, анализ, PDF и Excel не пересчитывают среднее, std, медиану, корреляцию и т. п.
+    по одному и тому же набору данных. Профиль привязан к версии данных (``version``): при замене
+    или очистке ``DataLoadApp.df`` GUI создаёт новый профиль, старый больше не используется.
+    Данные после создания профиля менять нельзя — для изменённого DataFrame нужен новый профиль.
+    Доступ потокобезопасен: статистики запрашиваются из рабочих потоков GUI.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int = 0):
+        self.df = df
+        self.version = version
+        self.computations = 0  # сколько статистик посчитано (остальные запросы — из кэша)
+        self._values = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def of(cls, df: pd.DataFrame, profile: "DataProfile" = None) -> "DataProfile":
+        """``profile``, если он построен именно для ``df``, иначе новый профиль."""
+        if profile is not None and profile.df is df:
+            return profile
+        return cls(df)
+
+    def get(self, key, compute):
+        """Значение по ключу; ``compute()`` вызывается только при первом запросе."""
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = compute()
+                self.computations += 1
+            return self._values[key]
+
+    @property
+    def numeric(self) -> pd.DataFrame:
+        return self.get("numeric", lambda: self.df.select_dtypes(include=[np.number]))
+
+    @property
+    def numeric_columns(self) -> list:
+        return list(self.numeric.columns)
+
+    def missing(self) -> pd.Series:
+        return self.get("missing", lambda: self.df.isna().sum())
+
+    def stat(self, name: str) -> pd.Series:
+        """Статистика числовых столбцов: ``mean``, ``median``, ``std`` (ddof=1), ``min``, ``max``."""
+        if name not in SUMMARY_STATS:
+            raise ValueError(f"Неизвестная статистика: {name}")
+        # Все пять считаются вместе одним ядром (см. numeric_summary)
+        return self.get("summary", lambda: numeric_summary(self.numeric))[name]
+
+    def mode(self, method: str = "exact") -> pd.Series:
+        """Мода числовых столбцов: ``exact`` или ``approx`` (по выборке, см. column_mode)."""
+        if method not in MODE_METHODS:
+            raise ValueError("Метод моды должен быть 'exact' или 'approx'")
+
+        def compute():
+            return pd.Series([column_mode(self.numeric[col].to_numpy(dtype=np.float64, na_value=np.nan), method)
+                              for col in self.numeric.columns], index=self.numeric.columns, dtype=np.float64)
+        return self.get(("mode", method), compute)
+
+    def summary(self, mode: str = "exact") -> pd.DataFrame:
+        """Таблица mean / median / mode / std / min / max по числовым столбцам (``mode=None`` — без моды)."""
+        stats = {name: self.stat(name) for name in ("mean", "median")}
+        if mode is not None:
+            stats["mode"] = self.mode(mode)
+        stats.update({name: self.stat(name) for name in ("std", "min", "max")})
+        return pd.DataFrame(stats, index=self.numeric.columns)
+
+    def corr(self) -> pd.DataFrame:
+        return self.get("corr", lambda: self.numeric.corr())
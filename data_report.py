@@ -25,39 +25,78 @@ from datetime import datetime
 from email.message import EmailMessage
 import ssl
 
+from chunk_stats import ChunkStats
+from data_profile import DataProfile
+
 class DataReport:
     """
     Генерация отчётов с визуализацией и отправкой по email.
     """
 
-    def __init__(self, df: pd.DataFrame, report_name: str = "report"):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame = None, report_name: str = "report", profile: DataProfile = None):
+        self.df = df.copy() if df is not None else None
+        # Статистики считаются один раз на отчёт (метрики, PDF, Excel, графики) или берутся
+        # из общего профиля загруженных данных, если он передан для этого же df
+        if df is None:
+            self.profile = None
+        elif profile is not None and profile.df is df:
+            self.profile = profile
+        else:
+            self.profile = DataProfile(self.df)
         self.report_name = report_name
         self.created_at = datetime.now()
 
-    def generate_key_metrics(self) -> dict:
-        numeric = self.df.select_dtypes(include=[np.number])
+    def generate_key_metrics(self, chunks=None) -> dict:
+        """
+        Ключевые метрики по self.df или, если передан ``chunks``, по итератору чанков
+        (медиана в потоковом режиме — оценка по выборке).
+        """
+        if chunks is not None:
+            return self._generate_key_metrics_from_chunks(chunks)
+
+        numeric = self.profile.numeric
+        missing = self.profile.missing()
         metrics = {
             "generated_at": self.created_at.isoformat(timespec="seconds"),
             "rows": int(self.df.shape[0]),
             "columns": int(self.df.shape[1]),
-            "missing_values_total": int(self.df.isna().sum().sum()),
-            "missing_values_by_column": self.df.isna().sum().to_dict(),
+            "missing_values_total": int(missing.sum()),
+            "missing_values_by_column": missing.to_dict(),
             "numeric_columns": list(numeric.columns),
         }
 
         if not numeric.empty:
+            stats = {name: self.profile.stat(name) for name in ("mean", "median", "std", "min", "max")}
             metrics["numeric_summary"] = {
-                col: {
-                    "mean": float(numeric[col].mean()),
-                    "median": float(numeric[col].median()),
-                    "std": float(numeric[col].std()),
-                    "min": float(numeric[col].min()),
-                    "max": float(numeric[col].max()),
-                }
+                col: {name: float(values[col]) for name, values in stats.items()}
                 for col in numeric.columns
             }
-            metrics["correlation"] = numeric.corr(numeric_only=True).to_dict()
+            metrics["correlation"] = self.profile.corr().to_dict()
+
+        return metrics
+
+    def _generate_key_metrics_from_chunks(self, chunks) -> dict:
+        acc = ChunkStats()
+        for chunk in chunks:
+            acc.update(chunk)
+
+        missing = acc.missing if acc.missing is not None else pd.Series(dtype="int64")
+        metrics = {
+            "generated_at": self.created_at.isoformat(timespec="seconds"),
+            "rows": int(acc.rows),
+            "columns": int(len(acc.dtypes)) if acc.dtypes is not None else 0,
+            "missing_values_total": int(missing.sum()),
+            "missing_values_by_column": {col: int(v) for col, v in missing.items()},
+            "numeric_columns": list(acc.numeric_columns),
+        }
+
+        if acc.numeric_columns:
+            summary = acc.numeric_summary()
+            metrics["numeric_summary"] = {
+                col: {k: float(v) for k, v in row.items()}
+                for col, row in summary.iterrows()
+            }
+            metrics["correlation"] = acc.correlation().to_dict()
 
         return metrics
 
@@ -65,7 +104,7 @@ class DataReport:
         os.makedirs(out_dir, exist_ok=True)
         paths = {}
 
-        numeric = self.df.select_dtypes(include=[np.number])
+        numeric = self.profile.numeric
         cols = list(numeric.columns)[:max_numeric_cols]
 
         for col in cols:
@@ -80,7 +119,7 @@ class DataReport:
 
         if numeric.shape[1] >= 2:
             plt.figure(figsize=(8, 6))
-            corr = numeric.corr(numeric_only=True)
+            corr = self.profile.corr()
             sns.heatmap(corr, cmap="coolwarm", center=0, square=False)
             plt.title("Correlation heatmap")
             plt.tight_layout()
@@ -95,8 +134,7 @@ class DataReport:
         os.makedirs(out_dir, exist_ok=True)
         paths = {}
 
-        numeric = self.df.select_dtypes(include=[np.number])
-        cols = list(numeric.columns)
+        cols = self.profile.numeric_columns
 
         if len(cols) >= 2:
             fig = px.scatter(self.df, x=cols[0], y=cols[1], title=f"Scatter: {cols[0]} vs {cols[1]}")
@@ -0,0 +1,398 @@
+import json
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from chunk_stats import SortedRuns, duplicated_rows, is_chunk_stream, row_hashes, sorted_unique
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+
+# Проверки столбцов, которые умеет компилятор; порядок — порядок вывода в отчёте
+RULE_KINDS = ("dtype", "nullable", "min", "max", "pattern", "isin", "unique", "foreign_key")
+
+_DTYPE_CHECKS = {
+    "int": pd.api.types.is_integer_dtype,
+    "float": pd.api.types.is_float_dtype,
+    "number": pd.api.types.is_numeric_dtype,
+    "bool": pd.api.types.is_bool_dtype,
+    "string": lambda dtype: pd.api.types.is_string_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype),
+    "category": lambda dtype: isinstance(dtype, pd.CategoricalDtype),
+    "datetime": pd.api.types.is_datetime64_any_dtype,
+}
+
+
+@dataclass
+class RuleResult:
+    """Итог одного правила: число нарушивших строк и первые из них (метки индекса)."""
+    name: str
+    column: str
+    kind: str
+    violations: int = 0
+    sample_index: list = field(default_factory=list)
+    error: str = None  # правило не удалось применить (нет столбца, нет справочника и т.п.)
+
+    @property
+    def ok(self) -> bool:
+        return self.violations == 0 and self.error is None
+
+
+@dataclass
+class RulesReport:
+    """Результат проверки набора правил."""
+    rows: int
+    results: list
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.results)
+
+    @property
+    def failed(self) -> list:
+        return [r for r in self.results if not r.ok]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([{
+            "rule": r.name, "column": r.column, "kind": r.kind, "violations": r.violations,
+            "sample_index": r.sample_index, "error": r.error,
+        } for r in self.results])
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "ok": self.ok,
+            "results": [{
+                "rule": r.name, "column": r.column, "kind": r.kind, "violations": r.violations,
+                "sample_index": [x.item() if isinstance(x, np.generic) else x for x in r.sample_index],
+                "error": r.error,
+            } for r in self.results],
+        }
+
+    def report_lines(self) -> list:
+        lines = [f"📋 Проверено правил: {len(self.results)}, строк: {self.rows}"]
+        for r in self.results:
+            if r.error is not None:
+                lines.append(f" ⚠️ {r.name}: не применено — {r.error}")
+            elif r.violations:
+                lines.append(f" ❌ {r.name}: нарушений {r.violations}, примеры строк: {r.sample_index}")
+            else:
+                lines.append(f" ✅ {r.name}")
+        return lines
+
+
+class _Rule:
+    """Скомпилированное правило: функция (контекст столбца) -> маска нарушений."""
+
+    def __init__(self, name, column, kind, check=None, scope="column", target=None):
+        self.name = name
+        self.column = column
+        self.kind = kind
+        self.check = check
+        self.scope = scope  # "column" — по одному столбцу, "frame" — выражение по нескольким
+        self.target = target  # для foreign_key: имя справочника "таблица.столбец"
+
+
+class _ColumnContext:
+    """Общие для всех правил столбца вычисления (isna, числовое приведение) — считаются один раз на чанк."""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+        self._isna = None
+        self._numeric = None
+
+    @property
+    def isna(self) -> np.ndarray:
+        if self._isna is None:
+            self._isna = self.series.isna().to_numpy()
+        return self._isna
+
+    @property
+    def numeric(self) -> pd.Series:
+        if self._numeric is None:
+            s = self.series
+            if pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_datetime64_any_dtype(s.dtype):
+                self._numeric = s
+            else:
+                self._numeric = pd.to_numeric(s, errors="coerce")
+        return self._numeric
+
+
+def _on_uniques(series: pd.Series, func) -> np.ndarray:
+    """
+    Применение проверки к уникальным значениям вместо всех строк: для категорий и столбцов
+    с повторами регулярное выражение считается по словарю, результат разворачивается по кодам.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        bad = np.asarray(func(pd.Series(series.cat.categories)), dtype=bool)
+    else:
+        codes, uniques = pd.factorize(series)
+        if len(uniques) > 0.5 * len(series):
+            return np.asarray(func(series), dtype=bool) & (codes >= 0)
+        bad = np.asarray(func(pd.Series(uniques)), dtype=bool)
+    bad = np.append(bad, False)  # код -1 (NaN) — не нарушение, пропуски проверяет nullable
+    return bad[codes]
+
+
+def _non_strings(series: pd.Series) -> np.ndarray:
+    """
+    Маска значений, не являющихся str. Тип содержимого определяется один раз на чанк
+    (infer_dtype); поэлементное сравнение с приведённым к string — только для смешанных столбцов.
+    """
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if kind in ("string", "empty"):
+        return np.zeros(len(series), dtype=bool)
+    if kind == "categorical":
+        return _on_uniques(series, _non_strings)
+    if not kind.startswith("mixed"):
+        return np.ones(len(series), dtype=bool)
+    values = series.astype(object)
+    return (values.astype("string").astype(object) != values).to_numpy(dtype=bool)
+
+
+class RuleSet:
+    """
+    Декларативные правила проверки данных, компилируемые один раз в векторные маски.
+
+    Спецификация — словарь (или YAML/JSON файл) вида::
+
+        columns:
+          id:      {dtype: int, nullable: false, unique: true}
+          age:     {dtype: number, min: 0, max: 130}
+          email:   {pattern: "^[^@]+@[^@]+\\.[a-z]+$"}
+          country: {isin: [RU, KZ, BY]}
+          client:  {foreign_key: clients.id}
+        checks:
+          - {name: dates_order, expr: "start <= end"}
+
+    Все правила выполняются за один проход по данным: для каждого столбца общие вычисления
+    (пропуски, приведение к числу) делаются один раз, регулярные выражения и ``isin`` по столбцам
+    с повторами считаются по уникальным значениям. ``foreign_key`` ссылается на справочник из
+    ``references`` (``{"clients": df}`` или ``{"clients.id": series}``). Пропуски нарушают только
+    ``nullable: false``; ``unique`` считает повторы после первого вхождения. Поддерживаются
+    итераторы чанков: счётчики суммируются, уникальность проверяется по хэшам значений.
+    """
+
+    def __init__(self, spec: dict = None, sample_size: int = 5):
+        self.spec = spec or {}
+        self.sample_size = sample_size
+        self.rules = self._compile(self.spec)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "RuleSet":
+        with open(path, "r", encoding="utf-8") as f:
+            if path.lower().endswith((".yaml", ".yml")):
+                if not HAS_YAML:
+                    raise ImportError("Для YAML-правил установите PyYAML: pip install pyyaml")
+                spec = yaml.safe_load(f)
+            else:
+                spec = json.load(f)
+        return cls(spec, **kwargs)
+
+    # --- компиляция ---
+
+    def _compile(self, spec: dict) -> list:
+        unknown = set(spec) - {"columns", "checks"}
+        if unknown:
+            raise ValueError(f"Неизвестные разделы спецификации: {sorted(unknown)}")
+        rules = []
+        for column, checks in (spec.get("columns") or {}).items():
+            unknown = set(checks) - set(RULE_KINDS)
+            if unknown:
+                raise ValueError(f"Неизвестные правила для столбца {column}: {sorted(unknown)}")
+            for kind in RULE_KINDS:
+                if kind in checks:
+                    rules.append(self._compile_column_rule(column, kind, checks[kind]))
+        for i, check in enumerate(spec.get("checks") or []):
+            name = check.get("name", f"check_{i}")
+            rules.append(_Rule(name, None, "expr", self._compile_expr(check["expr"]), scope="frame"))
+        return [r for r in rules if r is not None]
+
+    @staticmethod
+    def _compile_column_rule(column, kind, value):
+        name = f"{column}.{kind}"
+        if kind == "dtype":
+            if value not in _DTYPE_CHECKS:
+                raise ValueError(f"Неизвестный тип '{value}' для {column}, допустимо: {sorted(_DTYPE_CHECKS)}")
+            return _Rule(name, column, kind, RuleSet._dtype_check(value))
+        if kind == "nullable":
+            return None if value else _Rule(name, column, kind, lambda ctx: ctx.isna)
+        if kind in ("min", "max"):
+            bound = value
+
+            def check(ctx, bound=bound, kind=kind):
+                values = ctx.numeric
+                if pd.api.types.is_datetime64_any_dtype(values.dtype):
+                    b = pd.Timestamp(bound)
+                else:
+                    b = float(bound)
+                bad = values < b if kind == "min" else values > b
+                return bad.to_numpy(dtype=bool, na_value=False)
+
+            return _Rule(name, column, kind, check)
+        if kind == "pattern":
+            regex = re.compile(value)
+
+            def match(values: pd.Series):
+                return ~values.astype(str).str.fullmatch(regex.pattern, flags=regex.flags).to_numpy(
+                    dtype=bool, na_value=False)
+
+            return _Rule(name, column, kind, lambda ctx: _on_uniques(ctx.series, match))
+        if kind == "isin":
+            allowed = pd.Index(list(value))
+            return _Rule(name, column, kind,
+                         lambda ctx: _on_uniques(ctx.series, lambda v: ~v.isin(allowed).to_numpy()))
+        if kind == "unique":
+            return _Rule(name, column, kind) if value else None
+        if kind == "foreign_key":
+            return _Rule(name, column, kind, target=str(value))
+        raise ValueError(f"Правило {kind} не поддерживается для столбца")
+
+    @staticmethod
+    def _dtype_check(expected):
+        is_expected = _DTYPE_CHECKS[expected]
+
+        def check(ctx):
+            s = ctx.series
+            # object-столбец формально строковый, но может содержать что угодно — проверяется содержимое
+            if is_expected(s.dtype) and not (expected == "string" and s.dtype == object):
+                return np.zeros(len(s), dtype=bool)
+            # Тип столбца другой: нарушения — непустые значения, не приводимые к ожидаемому типу
+            if expected in ("int", "float", "number"):
+                coerced = ctx.numeric
+                bad = coerced.isna().to_numpy()
+                if expected == "int":
+                    values = coerced.to_numpy(dtype=np.float64, na_value=np.nan)
+                    bad = bad | (np.isfinite(values) & (values != np.round(values)))
+            elif expected == "datetime":
+                bad = pd.to_datetime(s, errors="coerce", format="mixed").isna().to_numpy()
+            elif expected == "string":
+                bad = _non_strings(s)
+            elif expected == "bool":
+                bad = ~s.isin([True, False]).to_numpy()
+            else:
+                bad = np.ones(len(s), dtype=bool)
+            return bad & ~ctx.isna
+
+        return check
+
+    @staticmethod
+    def _compile_expr(expr: str):
+        def check(df):
+            result = df.eval(expr)
+            return ~np.asarray(result.to_numpy(dtype=bool, na_value=False) if isinstance(result, pd.Series)
+                               else np.broadcast_to(bool(result), len(df)))
+
+        return check
+
+    @property
+    def reference_tables(self) -> list:
+        """Имена справочников (``таблица`` из ``foreign_key: таблица.столбец``), нужных для проверки."""
+        return sorted({r.target.partition(".")[0] for r in self.rules if r.kind == "foreign_key"})
+
+    # --- выполнение ---
+
+    @staticmethod
+    def _reference_values(target: str, references: dict) -> pd.Index:
+        if target in references:
+            values = references[target]
+        else:
+            table, _, column = target.partition(".")
+            if table not in references or not column:
+                raise KeyError(f"справочник '{target}' не передан в references")
+            values = references[table][column]
+        return pd.Index(pd.unique(pd.Series(values).dropna()))
+
+    def validate(self, data, references: dict = None, verbose: bool = True, progress=None) -> RulesReport:
+        """
+        Проверка DataFrame или итератора чанков. Возвращает RulesReport.
+        ``progress(rows)`` вызывается после каждого чанка с числом проверенных строк.
+        """
+        references = references or {}
+        results = [RuleResult(r.name, r.column, r.kind) for r in self.rules]
+        # Справочники для foreign_key готовятся один раз на весь поток
+        fk_values = {}
+        for rule, res in zip(self.rules, results):
+            if rule.kind == "foreign_key":
+                try:
+                    fk_values[rule.name] = self._reference_values(rule.target, references)
+                except KeyError as e:
+                    res.error = str(e).strip("'\"")
+        seen = {r.name: SortedRuns() for r in self.rules if r.kind == "unique"}
+
+        rows = 0
+        chunks = data if is_chunk_stream(data) else [data]
+        for chunk in chunks:
+            rows += len(chunk)
+            self._validate_chunk(chunk, results, fk_values, seen)
+            if progress is not None:
+                progress(rows)
+
+        report = RulesReport(rows=rows, results=results)
+        if verbose:
+            print("\n[RULES] Проверка правил...\n")
+            for line in report.report_lines():
+                print(line)
+            print(f"\n[RULES] Нарушено правил: {len(report.failed)}\n")
+        return report
+
+    def _validate_chunk(self, df: pd.DataFrame, results: list, fk_values: dict, seen: dict):
+        contexts = {}
+        for rule, res in zip(self.rules, results):
+            if res.error is not None:
+                continue
+            if rule.scope == "frame":
+                try:
+                    mask = rule.check(df)
+                except Exception as e:
+                    res.error = f"выражение не вычислено: {e}"
+                    continue
+            else:
+                if rule.column not in df.columns:
+                    res.error = "столбец отсутствует"
+                    continue
+                ctx = contexts.get(rule.column)
+                if ctx is None:
+                    ctx = contexts[rule.column] = _ColumnContext(df[rule.column])
+                if rule.kind == "unique":
+                    mask = self._unique_mask(ctx, seen, rule.name)
+                elif rule.kind == "foreign_key":
+                    allowed = fk_values[rule.name]
+                    mask = _on_uniques(ctx.series, lambda v: ~v.isin(allowed).to_numpy())
+                else:
+                    mask = rule.check(ctx)
+            self._record(res, mask, df.index)
+
+    @staticmethod
+    def _unique_mask(ctx: _ColumnContext, seen: dict, name: str) -> np.ndarray:
+        """
+        Повторы внутри чанка подтверждаются сравнением значений (как duplicated_rows), поэтому
+        для DataFrame коллизии хэшей ложных нарушений не дают. С прошлыми чанками значения
+        сравниваются только по 64-битным хэшам — сами значения потока не хранятся.
+        """
+        notna = ~ctx.isna
+        values = ctx.series[notna].to_frame()
+        h = row_hashes(values)
+        mask = np.zeros(len(ctx.series), dtype=bool)
+        dup = pd.Series(h).duplicated().to_numpy()
+        if dup.any():
+            dup = duplicated_rows(values)
+        dup = dup | seen[name].contains(h)
+        mask[np.flatnonzero(notna)[dup]] = True
+        seen[name].add(sorted_unique(h[~dup]))
+        return mask
+
+    def _record(self, res: RuleResult, mask: np.ndarray, index: pd.Index):
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return
+        res.violations += count
+        need = self.sample_size - len(res.sample_index)
+        if need > 0:
+            res.sample_index.extend(index[np.flatnonzero(mask)[:need]].tolist())
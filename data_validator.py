@@ -1,46 +1,217 @@
+import json
 import pandas as pd
 import numpy as np
-from scipy import stats
+from dataclasses import dataclass, field
+
+from chunk_stats import ChunkStats, duplicated_rows, is_chunk_stream
+from data_profile import DataProfile, column_quantiles
+from data_rules import RuleSet
+
+
+@dataclass
+class ValidationEvent:
+    """Событие прогресса валидации для ``progress``-колбэка (колбэк вызывается из того же потока)."""
+    stage: str  # start / duplicates / missing / dtypes / numeric / chunk / rules / done
+    message: str
+    fraction: float = None  # доля выполненной работы, None — если объём заранее неизвестен (поток чанков)
+
+
+def _emit(progress, stage: str, message: str, fraction: float = None):
+    if progress is not None:
+        progress(ValidationEvent(stage, message, fraction))
+
+
+@dataclass
+class ValidationResult:
+    """Результат валидации: всё, что раньше только печаталось, в виде данных."""
+    rows: int
+    duplicates: int
+    missing: dict
+    dtypes: dict
+    numeric: dict = field(default_factory=dict)  # столбец -> count/mean/std/q1/q3/iqr_outliers/z_outliers
+    approximate: bool = False  # True для потоковой валидации: квартили и выбросы оценены по скетчу
+
+    @property
+    def missing_total(self) -> int:
+        return int(sum(self.missing.values()))
+
+    def numeric_frame(self) -> pd.DataFrame:
+        return pd.DataFrame.from_dict(self.numeric, orient="index")
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "duplicates": self.duplicates,
+            "missing": dict(self.missing),
+            "dtypes": dict(self.dtypes),
+            "numeric": {col: dict(s) for col, s in self.numeric.items()},
+            "approximate": self.approximate,
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str, **kwargs)
+
+    def report_lines(self) -> list:
+        lines = [f"🔍 Дубликатов: {self.duplicates}"]
+        missing = pd.Series(self.missing, dtype="int64")
+        if self.missing_total > 0:
+            lines.append(f"\n📉 Пропущенные значения:\n{missing[missing > 0]}")
+        else:
+            lines.append("\n📉 Пропущенные значения: не обнаружены ✅")
+        lines.append(f"\n🧾 Типы данных:\n{pd.Series(self.dtypes, dtype=object)}")
+        if self.numeric:
+            note = ", оценка" if self.approximate else ""
+            lines.append(f"\n📊 Выбросы (по IQR и Z-оценке{note}):")
+            for col, s in self.numeric.items():
+                lines.append(f" - {col}: выбросов по IQR = {s['iqr_outliers']}, по Z-score = {s['z_outliers']}")
+        else:
+            lines.append("[INFO] Числовых столбцов не найдено для определения выбросов.")
+        return lines
+
+
+def numeric_profile(df: pd.DataFrame, z_thresh: float = 3.0) -> dict:
+    """
+    Статистики и выбросы для всех числовых столбцов за один векторный проход по общему
+    float64-блоку: число значений, среднее, std (ddof=0, как scipy.stats.zscore), квартили,
+    число выбросов по IQR (1.5·IQR) и по Z-оценке.
+    """
+    num = df.select_dtypes(include=[np.number])
+    if num.empty:
+        return {}
+    block = num.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(block)
+    counts = valid.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        safe = np.maximum(counts, 1)
+        if counts.min() == len(block):
+            # Быстрый путь без пропусков: не нужны маскированные копии блока
+            mean = block.sum(axis=0) / safe
+            centered = block - mean
+        else:
+            mean = np.where(valid, block, 0.0).sum(axis=0) / safe
+            centered = np.where(valid, block - mean, 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=0) / safe)
+        q1, q3 = column_quantiles(block, counts, [0.25, 0.75])
+        iqr = q3 - q1
+        iqr_out = ((block < q1 - 1.5 * iqr) | (block > q3 + 1.5 * iqr)).sum(axis=0)
+        z_out = np.where(std > 0, (np.abs(centered) > z_thresh * std).sum(axis=0), 0)
+
+    empty = counts == 0
+    return {
+        col: {
+            "count": int(counts[i]),
+            "mean": float("nan") if empty[i] else float(mean[i]),
+            "std": float("nan") if empty[i] else float(std[i]),
+            "q1": float(q1[i]),
+            "q3": float(q3[i]),
+            "iqr_outliers": int(iqr_out[i]),
+            "z_outliers": int(z_out[i]),
+        }
+        for i, col in enumerate(num.columns)
+    }
 
 
 class DataValidator:
     @staticmethod
-    def validate_data(df):
+    def validate_data(df, z_thresh: float = 3.0, verbose: bool = True, duplicate_subset=None, progress=None,
+                      profile: DataProfile = None):
+        """
+        Валидация DataFrame: дубликаты, пропуски, типы, выбросы по IQR и Z-оценке.
+        Дубликаты ищутся по хэшам строк (или только столбцов ``duplicate_subset``).
+        Возвращает ValidationResult; при ``verbose`` печатает отчёт как раньше.
+        ``progress`` получает ValidationEvent после каждого этапа — так GUI может показывать
+        ход проверки из рабочего потока, не перехватывая print. ``profile`` — общий кэш статистик
+        (DataProfile) этих данных: повторная валидация и анализ не пересчитывают их заново.
+        """
+        if is_chunk_stream(df):
+            return DataValidator.validate_chunks(df, z_thresh=z_thresh, verbose=verbose, progress=progress)
         if not isinstance(df, pd.DataFrame):
             print("[WARNING] Переданные данные не являются DataFrame.")
             return
 
-        print("\n[VALIDATION] Начало валидации данных...\n")
-
-        duplicates = df.duplicated().sum()
-        print(f"🔍 Дубликатов: {duplicates}")
-
-        missing = df.isnull().sum()
-        missing_total = missing.sum()
-        if missing_total > 0:
-            print(f"\n📉 Пропущенные значения:\n{missing[missing > 0]}")
-        else:
-            print("\n📉 Пропущенные значения: не обнаружены ✅")
+        profile = DataProfile.of(df, profile)
+        _emit(progress, "start", f"Строк: {len(df)}, столбцов: {df.shape[1]}", 0.0)
+        subset_key = tuple(duplicate_subset) if isinstance(duplicate_subset, (list, tuple, pd.Index)) \
+            else duplicate_subset
+        duplicates = profile.get(("duplicates", subset_key),
+                                 lambda: int(duplicated_rows(df, subset=duplicate_subset).sum()))
+        _emit(progress, "duplicates", f"Дубликатов: {duplicates}", 0.4)
+        missing = {col: int(v) for col, v in profile.missing().items()}
+        _emit(progress, "missing", f"Пропусков: {sum(missing.values())}", 0.55)
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        _emit(progress, "dtypes", "Типы данных определены", 0.6)
+        numeric = profile.get(("numeric_profile", z_thresh), lambda: numeric_profile(profile.numeric, z_thresh))
+        _emit(progress, "numeric", f"Числовых столбцов проверено: {len(numeric)}", 0.95)
 
-        print(f"\n🧾 Типы данных:\n{df.dtypes}")
+        result = ValidationResult(
+            rows=int(len(df)),
+            duplicates=duplicates,
+            missing=missing,
+            dtypes=dtypes,
+            numeric=numeric,
+        )
+        _emit(progress, "done", "Валидация завершена", 1.0)
 
-        num_cols = df.select_dtypes(include=[np.number])
-        if not num_cols.empty:
-            print("\n📊 Выбросы (по IQR и Z-оценке):")
+        if verbose:
+            print("\n[VALIDATION] Начало валидации данных...\n")
+            for line in result.report_lines():
+                print(line)
+            print("\n[VALIDATION] Валидация завершена.\n")
+        return result
 
-            for col in num_cols.columns:
-                col_data = num_cols[col].dropna()
+    @staticmethod
+    def validate_chunks(chunks, z_thresh: float = 3.0, verbose: bool = True, stats: ChunkStats = None,
+                        progress=None, **stats_options):
+        """
+        Потоковая валидация итератора чанков (например, из DataLoader.load_csv(..., chunksize=...)).
+        Возвращает такой же ValidationResult, как validate_data, с ``approximate=True``:
+        пропуски, среднее и std точные, квартили и число выбросов — оценки по скетчу KLL
+        (погрешность см. ChunkStats). Можно передать уже заполненный ``stats``
+        (например, объединённый через ChunkStats.merge из параллельных частей).
+        """
+        acc = stats if stats is not None else ChunkStats(**stats_options)
+        for chunk in chunks:
+            acc.update(chunk)
+            _emit(progress, "chunk", f"Чанк {acc.chunks}: всего строк {acc.rows}")
 
-                Q1 = col_data.quantile(0.25)
-                Q3 = col_data.quantile(0.75)
-                IQR = Q3 - Q1
-                outliers_iqr = ((col_data < (Q1 - 1.5 * IQR)) | (col_data > (Q3 + 1.5 * IQR))).sum()
+        if acc.dtypes is None:
+            print("[WARNING] Поток не содержит данных.")
+            return
 
-                z_scores = np.abs(stats.zscore(col_data))
-                outliers_z = (z_scores > 3).sum()
+        result = ValidationResult(
+            rows=int(acc.rows),
+            duplicates=int(acc.duplicates),
+            missing={col: int(v) for col, v in acc.missing.items()},
+            dtypes={col: str(dtype) for col, dtype in acc.dtypes.items()},
+            numeric=acc.numeric_profile(z_thresh=z_thresh),
+            approximate=True,
+        )
+        _emit(progress, "done", "Валидация завершена", 1.0)
 
-                print(f" - {col}: выбросов по IQR = {outliers_iqr}, по Z-score = {outliers_z}")
-        else:
-            print("[INFO] Числовых столбцов не найдено для определения выбросов.")
+        if verbose:
+            print("\n[VALIDATION] Начало потоковой валидации данных...\n")
+            print(f"📦 Обработано чанков: {acc.chunks}, строк: {acc.rows}")
+            for line in result.report_lines():
+                print(line)
+            print("\n[VALIDATION] Валидация завершена.\n")
+        return result
 
-        print("\n[VALIDATION] Валидация завершена.\n")
\ No newline at end of file
+    @staticmethod
+    def validate_rules(df, rules, references: dict = None, verbose: bool = True, progress=None):
+        """
+        Проверка данных по декларативным правилам (см. data_rules.RuleSet): ``rules`` —
+        RuleSet, словарь спецификации или путь к YAML/JSON файлу. Возвращает RulesReport.
+        """
+        if isinstance(rules, str):
+            rules = RuleSet.from_file(rules)
+        elif isinstance(rules, dict):
+            rules = RuleSet(rules)
+        if not is_chunk_stream(df) and not isinstance(df, pd.DataFrame):
+            print("[WARNING] Переданные данные не являются DataFrame.")
+            return
+        report = rules.validate(df, references=references, verbose=verbose,
+                                progress=None if progress is None else
+                                lambda rows: _emit(progress, "rules", f"Проверено строк: {rows}"))
+        _emit(progress, "done", f"Нарушено правил: {len(report.failed)}", 1.0)
+        return report
@@ -1,29 +1,74 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext,filedialog
 import threading
-import builtins
+import multiprocessing
+import contextlib
 import pandas as pd
 import numpy as np
 import os
 # Импорты из других модулей
-from data_loader import DataLoader
+from data_loader import DataLoader, format_bytes
+from data_cache import DatasetCache
 from data_validator import DataValidator
+from data_rules import RuleSet
 from data_cleaner import DataCleaner
 from data_analyze import DataAnalyzer
 from data_report import DataReport
+from data_profile import DataProfile
 
 class DataLoadApp(tk.Tk):
     def __init__(self):
         super().__init__()
-        self.loader = DataLoader()
+        self.loader = DataLoader(cache=DatasetCache(), mp_context=multiprocessing.get_context("spawn"))
         self.cleaner = DataCleaner()
         self.analyzer = None
+        self.df_version = 0
+        self._readers = 0  # фоновые задачи, читающие self.df (см. _start_reader)
+        self._readers_lock = threading.Lock()
         self.df = None
         self.report = None
         self.title("Загрузчик данных")
-        self.geometry("900x700")
+        self.geometry("1100x700")
 
         self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    @property
+    def df(self):
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        # Любая замена или очистка данных — новая версия: общий кэш статистик создаётся заново
+        self._df = value
+        self.df_version += 1
+        self.profile = DataProfile(value, self.df_version) if value is not None else None
+
+    def _start_reader(self, task):
+        """
+        Запуск фоновой задачи, читающей текущие данные. Счётчик увеличивается в главном потоке
+        до старта, поэтому очистка без копий (apply_cleaning) видит все ещё работающие задачи.
+        """
+        with self._readers_lock:
+            self._readers += 1
+
+        def run():
+            try:
+                task()
+            finally:
+                with self._readers_lock:
+                    self._readers -= 1
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def clear_cache(self):
+        size = format_bytes(self.loader.cache.size_bytes)
+        self.loader.cache.clear()
+        self.log(f"[INFO] Кэш очищен ({size}).")
+
+    def on_close(self):
+        self.loader.close()
+        self.destroy()
 
     def create_widgets(self):
         title = tk.Label(self, text="Выберите источник данных", font=("Arial", 14, "bold"))
@@ -33,15 +78,23 @@ class DataLoadApp(tk.Tk):
         frame1 = tk.Frame(self)
         frame1.pack(pady=5)
         tk.Button(frame1, text="CSV файл", width=15, command=self.load_csv).pack(side=tk.LEFT, padx=5)
+        tk.Button(frame1, text="Parquet / Arrow", width=15, command=self.load_columnar).pack(side=tk.LEFT, padx=5)
         tk.Button(frame1, text="Excel файл", width=15, command=self.load_excel).pack(side=tk.LEFT, padx=5)
         tk.Button(frame1, text="PostgreSQL", width=15, command=self.load_postgresql).pack(side=tk.LEFT, padx=5)
         tk.Button(frame1, text="REST API", width=15, command=self.load_api).pack(side=tk.LEFT, padx=5)
+        self.compact_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame1, text="Компактные типы", variable=self.compact_var).pack(side=tk.LEFT, padx=5)
+        # Загрузка в обход кэша: источник читается заново, запись в кэше обновляется
+        self.refresh_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame1, text="Без кэша", variable=self.refresh_var).pack(side=tk.LEFT, padx=5)
 
         # Вторая строка: обработка данных
         frame2 = tk.Frame(self)
         frame2.pack(pady=5)
         tk.Button(frame2, text="Валидация данных", width=18, command=self.validate_data, bg="#FFD700").pack(
             side=tk.LEFT, padx=5)
+        tk.Button(frame2, text="Проверка правил", width=15, command=self.validate_rules, bg="#FFD700").pack(
+            side=tk.LEFT, padx=5)
         tk.Button(frame2, text="Очистка данных", width=15, command=self.open_cleaning_dialog, bg="#98FB98").pack(
             side=tk.LEFT, padx=5)
         tk.Button(frame2, text="Анализ данных", width=15, command=self.open_analysis_dialog, bg="#87CEEB").pack(
@@ -50,7 +103,9 @@ class DataLoadApp(tk.Tk):
         # Третья строка: отчет
         frame3 = tk.Frame(self)
         frame3.pack(pady=5)
-        tk.Button(frame3, text="Отправить отчет", width=32, command=self.open_report_dialog, bg="#FFB6C1").pack()
+        tk.Button(frame3, text="Отправить отчет", width=32, command=self.open_report_dialog, bg="#FFB6C1").pack(
+            side=tk.LEFT, padx=5)
+        tk.Button(frame3, text="Очистить кэш", width=15, command=self.clear_cache).pack(side=tk.LEFT, padx=5)
 
         log_label = tk.Label(self, text="Лог и превью данных:")
         log_label.pack(anchor="w", padx=10, pady=(20, 5))
@@ -127,6 +182,10 @@ class DataLoadApp(tk.Tk):
         self.log_text.see(tk.END)
         self.log_text.config(state="disabled")
 
+    def log_async(self, message):
+        """Вывод в лог из рабочего потока: Tk-виджеты меняются только в главном потоке."""
+        self.after(0, self.log, message)
+
     def clear_log(self):
         self.log_text.config(state="normal")
         self.log_text.delete(1.0, tk.END)
@@ -142,17 +201,71 @@ class DataLoadApp(tk.Tk):
             return
 
         self.log("\n[VALIDATION] Начало валидации данных...\n")
+        df, profile = self.df, self.profile
 
-        def log_print(*args):
-            self.log(" ".join(map(str, args)))
+        def on_progress(event):
+            percent = f" ({event.fraction:.0%})" if event.fraction is not None else ""
+            self.log_async(f"[VALIDATION] {event.message}{percent}")
 
-        original_print = builtins.print
-        builtins.print = log_print
+        def task():
+            try:
+                result = DataValidator.validate_data(df, verbose=False, progress=on_progress, profile=profile)
+            except Exception as e:
+                self.after(0, self.show_error, "Ошибка валидации", str(e))
+                return
+            for line in result.report_lines():
+                self.log_async(line)
+            self.log_async("\n[VALIDATION] Валидация завершена.\n")
+
+        self._start_reader(task)
+
+    def validate_rules(self):
+        if self.df is None:
+            self.show_error("Ошибка", "Сначала загрузите данные.")
+            return
+        path = tk.filedialog.askopenfilename(
+            title="Выберите файл правил",
+            filetypes=[("Правила", "*.yaml *.yml *.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
 
         try:
-            DataValidator.validate_data(self.df)
-        finally:
-            builtins.print = original_print
+            rules = RuleSet.from_file(path)
+        except Exception as e:
+            self.show_error("Ошибка правил", str(e))
+            return
+
+        self.log(f"\n[RULES] Файл правил: {path}")
+        # Для foreign_key нужен справочник: файл выбирается для каждой таблицы, без него правило
+        # попадает в отчёт как ошибка «справочник не передан»
+        reference_paths = {}
+        for table in rules.reference_tables:
+            ref_path = tk.filedialog.askopenfilename(
+                title=f"Справочник «{table}» для foreign_key",
+                filetypes=[("Данные", "*.csv *.xlsx *.xls *.parquet *.feather"), ("All files", "*.*")]
+            )
+            if ref_path:
+                reference_paths[table] = ref_path
+                self.log(f"[RULES] Справочник {table}: {ref_path}")
+        df = self.df
+
+        def task():
+            try:
+                references = {}
+                for table, ref_path in reference_paths.items():
+                    ref = self.loader.load_files(ref_path, source_column=None)
+                    if ref is None:
+                        raise ValueError(f"не удалось загрузить справочник {table}: {ref_path}")
+                    references[table] = ref
+                report = DataValidator.validate_rules(df, rules, references=references, verbose=False)
+            except Exception as e:
+                self.after(0, self.show_error, "Ошибка правил", str(e))
+                return
+            for line in report.report_lines():
+                self.log_async(line)
+
+        self._start_reader(task)
 
     def open_cleaning_dialog(self):
         if self.df is None:
@@ -161,7 +274,7 @@ class DataLoadApp(tk.Tk):
 
         dialog = tk.Toplevel(self)
         dialog.title("Очистка данных")
-        dialog.geometry("400x400")
+        dialog.geometry("400x540")
         dialog.transient(self)
         dialog.grab_set()
 
@@ -175,21 +288,52 @@ class DataLoadApp(tk.Tk):
         encode_var = tk.StringVar(value="onehot")
         tk.Radiobutton(dialog, text="One-Hot Encoding", variable=encode_var, value="onehot").pack(anchor="w", padx=40)
         tk.Radiobutton(dialog, text="Label Encoding", variable=encode_var, value="label").pack(anchor="w", padx=40)
+        tk.Radiobutton(dialog, text="Частотное (много категорий)", variable=encode_var, value="frequency").pack(anchor="w", padx=40)
+        tk.Radiobutton(dialog, text="Хэширование (32 столбца)", variable=encode_var, value="hash").pack(anchor="w", padx=40)
 
         tk.Label(dialog, text="Нормализация числовых признаков:", font=("Arial", 10, "bold")).pack(anchor="w", padx=20, pady=(20, 5))
         scale_var = tk.StringVar(value="standard")
         tk.Radiobutton(dialog, text="Стандартизация (Standard)", variable=scale_var, value="standard").pack(anchor="w", padx=40)
         tk.Radiobutton(dialog, text="Мин-макс (Min-Max)", variable=scale_var, value="minmax").pack(anchor="w", padx=40)
+        tk.Radiobutton(dialog, text="Устойчивое (медиана / IQR)", variable=scale_var, value="robust").pack(anchor="w", padx=40)
+        tk.Radiobutton(dialog, text="Квантильное (0..1)", variable=scale_var, value="quantile").pack(anchor="w", padx=40)
+
+        inplace_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(dialog, text="Без копий (экономия памяти)", variable=inplace_var).pack(anchor="w", padx=20, pady=(15, 0))
 
         btn_frame = tk.Frame(dialog)
         btn_frame.pack(pady=30)
 
         def apply_cleaning():
-            df_cleaned = self.df.copy()
-            df_cleaned = self.cleaner.handle_missing_values(df_cleaned, strategy=missing_var.get())
-            df_cleaned = self.cleaner.drop_duplicates(df_cleaned)
-            df_cleaned = self.cleaner.encode_categorical(df_cleaned, method=encode_var.get())
-            df_cleaned = self.cleaner.scale_numeric(df_cleaned, method=scale_var.get())
+            # В режиме без копий данные меняются на месте: пик памяти ~1x вместо 3-4 копий
+            inplace = inplace_var.get()
+            if inplace and self._readers:
+                messagebox.showerror("Ошибка", "Данные ещё читаются фоновой задачей (валидация, анализ, отчёт): "
+                                               "дождитесь её завершения или снимите флажок «Без копий».")
+                return
+            source = self.df
+            columns = list(source.columns)
+            if inplace:
+                # Данные отвязываются от приложения, пока очистка не завершится успешно
+                self._df = None
+            # Отдельный очиститель на каждый запуск: режим inplace не остаётся в общем self.cleaner
+            cleaner = DataCleaner(inplace=inplace)
+            try:
+                df_cleaned = source if inplace else source.copy()
+                df_cleaned = cleaner.handle_missing_values(df_cleaned, strategy=missing_var.get())
+                df_cleaned = cleaner.drop_duplicates(df_cleaned)
+                df_cleaned = cleaner.encode_categorical(df_cleaned, method=encode_var.get())
+                df_cleaned = cleaner.scale_numeric(df_cleaned, method=scale_var.get())
+            except Exception as e:
+                self._df = source
+                if inplace and list(source.columns) != columns:
+                    # Часть столбцов уже перенесена очисткой без копий: версия данных меняется
+                    self.df = source
+                    self.show_error("Ошибка очистки", f"{e}\nДанные изменены частично — загрузите их заново.")
+                else:
+                    self.show_error("Ошибка очистки", str(e))
+                return
+            self.cleaner = cleaner
             self.df = df_cleaned
             self.clear_log()
             self.log("[INFO] Очистка данных завершена.")
@@ -300,7 +444,7 @@ class DataLoadApp(tk.Tk):
                 name = entries_data['report_name']
                 out_dir = entries_data['out_dir']
 
-                self.report = DataReport(self.df, report_name=name)
+                self.report = DataReport(self.df, report_name=name, profile=self.profile)
                 self.clear_log()
                 self.log("[REPORT] Генерация отчёта...")
 
@@ -313,16 +457,16 @@ class DataLoadApp(tk.Tk):
                             make_static_plots=entries_data['plots'],
                             make_interactive_plots=entries_data['interactive'],
                         )
-                        self.log("[REPORT] Отчёт успешно создан:")
+                        self.log_async("[REPORT] Отчёт успешно создан:")
                         for k, v in artifacts.items():
                             if isinstance(v, dict):
                                 for sub_k, sub_v in v.items():
-                                    self.log(f"  {k}.{sub_k}: {sub_v}")
+                                    self.log_async(f"  {k}.{sub_k}: {sub_v}")
                             else:
-                                self.log(f"  {k}: {v}")
+                                self.log_async(f"  {k}: {v}")
 
                         if entries_data['send']:
-                            self.log("[REPORT] Отправка на email...")
+                            self.log_async("[REPORT] Отправка на email...")
                             try:
                                 DataReport.send_full_report_smtp(
                                     artifacts=artifacts,
@@ -336,16 +480,16 @@ class DataLoadApp(tk.Tk):
                                     body="Автоматически сгенерированный отчёт прикреплён.",
                                     use_tls=True,
                                 )
-                                self.log("[REPORT] ✅ Отчёт успешно отправлен по email.")
+                                self.log_async("[REPORT] ✅ Отчёт успешно отправлен по email.")
                             except Exception as e:
-                                self.log(f"[ERROR] Отправка не удалась: {type(e).__name__}: {e}")
+                                self.log_async(f"[ERROR] Отправка не удалась: {type(e).__name__}: {e}")
                         else:
-                            self.log(f"[REPORT] 📁 Путь к файлам: {os.path.abspath(out_dir)}")
+                            self.log_async(f"[REPORT] 📁 Путь к файлам: {os.path.abspath(out_dir)}")
 
                     except Exception as e:
-                        self.log(f"[ERROR] Ошибка при генерации/отправке: {e}")
+                        self.log_async(f"[ERROR] Ошибка при генерации/отправке: {e}")
 
-                threading.Thread(target=task, daemon=True).start()
+                self._start_reader(task)
                 dialog.destroy()
 
             except Exception as e:
@@ -362,7 +506,7 @@ class DataLoadApp(tk.Tk):
             self.show_error("Ошибка", "Сначала загрузите данные.")
             return
 
-        self.analyzer = DataAnalyzer(self.df)
+        self.analyzer = DataAnalyzer(self.df, profile=self.profile)
         self.analyzer.set_log_func(self.log)
         dialog = tk.Toplevel(self)
         dialog.title("Анализ данных")
@@ -376,7 +520,10 @@ class DataLoadApp(tk.Tk):
         # Статистика
         stats_tab = tk.Frame(notebook)
         notebook.add(stats_tab, text="Статистика")
-        tk.Button(stats_tab, text="Показать статистики", command=self.run_basic_stats).pack(pady=20)
+        approx_mode_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(stats_tab, text="Приближённая мода (по выборке)", variable=approx_mode_var).pack(pady=(15, 0))
+        tk.Button(stats_tab, text="Показать статистики",
+                  command=lambda: self.run_basic_stats("approx" if approx_mode_var.get() else "exact")).pack(pady=10)
 
         # Аномалии
         anomaly_tab = tk.Frame(notebook)
@@ -392,7 +539,7 @@ class DataLoadApp(tk.Tk):
 
         tk.Label(reg_tab, text="Целевая переменная:", font=("Arial", 10)).pack(anchor="w", padx=20, pady=5)
         target_reg = tk.StringVar()
-        cols_num = [col for col in self.df.select_dtypes(include=[np.number]).columns]
+        cols_num = self.profile.numeric_columns
         ttk.Combobox(reg_tab, textvariable=target_reg, values=cols_num).pack(fill=tk.X, padx=20, pady=5)
 
         # Добавьте выбор модели (и объявите model_reg_var)
@@ -423,14 +570,14 @@ class DataLoadApp(tk.Tk):
         tk.Button(clf_tab, text="Обучить классификацию",
                   command=lambda: self.run_classification(target_clf.get(), model_var.get())).pack(pady=10)
 
-    def run_basic_stats(self):
+    def run_basic_stats(self, mode="exact"):
         self.clear_log()
         self.log("[ANALYSIS] Расчет базовых статистик...")
 
         def task():
-            self.analyzer.basic_statistics()
+            self.analyzer.basic_statistics(mode=mode)
 
-        threading.Thread(target=task, daemon=True).start()
+        self._start_reader(task)
 
     def run_find_anomalies(self, z_thresh):
         self.clear_log()
@@ -439,7 +586,7 @@ class DataLoadApp(tk.Tk):
         def task():
             self.analyzer.find_anomalies(z_thresh)
 
-        threading.Thread(target=task, daemon=True).start()
+        self._start_reader(task)
 
     def run_regression(self, target, model_type):
         if not target:
@@ -451,7 +598,7 @@ class DataLoadApp(tk.Tk):
         def task():
             self.analyzer.build_regression_model(target_column=target, model_type=model_type)
 
-        threading.Thread(target=task, daemon=True).start()
+        self._start_reader(task)
 
     def run_classification(self, target, model_type):
         if not target:
@@ -463,10 +610,16 @@ class DataLoadApp(tk.Tk):
         def task():
             self.analyzer.build_classification_model(target, model_type)
 
-        threading.Thread(target=task, daemon=True).start()
+        self._start_reader(task)
+
+    def _set_data(self, df):
+        """Новые данные из рабочего потока загрузки — вызывается в главном потоке через after."""
+        self.df = df
+        self._print_preview(df)
 
     def _print_preview(self, df, n=5):
-        self.log(f"Размер данных: {df.shape[0]} строк × {df.shape[1]} столбцов")
+        memory = format_bytes(df.memory_usage(deep=True).sum())
+        self.log(f"Размер данных: {df.shape[0]} строк × {df.shape[1]} столбцов, память: {memory}")
 
         if df.empty:
             self.log("\n[INFO] Данные пусты.")
@@ -496,23 +649,60 @@ class DataLoadApp(tk.Tk):
             self.log(f"... и ещё {len(df) - n} строк.")
 
     def load_csv(self):
-        path = tk.filedialog.askopenfilename(
-            title="Выберите CSV файл",
+        paths = tk.filedialog.askopenfilenames(
+            title="Выберите CSV файл(ы)",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
+        if not paths:
+            return
+
+        self.clear_log()
+        compact, refresh = self.compact_var.get(), self.refresh_var.get()
+        if len(paths) == 1:
+            self.log(f"[INFO] Выбран CSV: {paths[0]}")
+        else:
+            self.log(f"[INFO] Выбрано CSV файлов: {len(paths)}")
+
+        def task():
+            if len(paths) == 1:
+                df = self.loader.load_csv(paths[0], compact=compact, refresh=refresh)
+            else:
+                df = self.loader.load_files(
+                    list(paths), compact=compact,
+                    progress=lambda done, total, path: self.log_async(
+                        f"[INFO] [{done}/{total}] {os.path.basename(path)}")
+                )
+            if df is not None:
+                self.after(0, self._set_data, df)
+            else:
+                self.after(0, self.show_error, "Ошибка загрузки CSV", "Не удалось загрузить файл. Проверьте путь и формат.")
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def load_columnar(self):
+        path = tk.filedialog.askopenfilename(
+            title="Выберите Parquet / Arrow файл",
+            filetypes=[("Parquet / Arrow", "*.parquet *.feather *.arrow *.arrows *.ipc"), ("All files", "*.*")]
+        )
         if not path:
             return
 
+        columns = self.simple_input("Столбцы", "Столбцы через запятую (пусто — все):", "")
+        columns = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+
         self.clear_log()
-        self.log(f"[INFO] Выбран CSV: {path}")
+        self.log(f"[INFO] Выбран файл: {path}")
+        compact = self.compact_var.get()
 
         def task():
-            df = self.loader.load_csv(path)
+            if path.lower().endswith(".parquet"):
+                df = self.loader.load_parquet(path, columns=columns, compact=compact)
+            else:
+                df = self.loader.load_arrow(path, columns=columns, compact=compact)
             if df is not None:
-                self.df = df
-                self._print_preview(df)
+                self.after(0, self._set_data, df)
             else:
-                self.show_error("Ошибка загрузки CSV", "Не удалось загрузить файл. Проверьте путь и формат.")
+                self.after(0, self.show_error, "Ошибка загрузки", "Не удалось загрузить файл. Проверьте путь, формат и столбцы.")
 
         threading.Thread(target=task, daemon=True).start()
 
@@ -534,21 +724,21 @@ class DataLoadApp(tk.Tk):
 
         self.clear_log()
         self.log(f"[INFO] Выбран Excel: {path}, лист: {sheet}")
+        compact, refresh = self.compact_var.get(), self.refresh_var.get()
 
         def task():
-            df = self.loader.load_excel(path, sheet_name=sheet)
+            df = self.loader.load_excel(path, sheet_name=sheet, compact=compact, refresh=refresh)
             if df is not None:
-                self.df = df
-                self._print_preview(df)
+                self.after(0, self._set_data, df)
             else:
-                self.show_error("Ошибка загрузки Excel", "Проверьте путь, формат файла и имя листа.")
+                self.after(0, self.show_error, "Ошибка загрузки Excel", "Проверьте путь, формат файла и имя листа.")
 
         threading.Thread(target=task, daemon=True).start()
 
     def load_postgresql(self):
         dialog = tk.Toplevel(self)
         dialog.title("Подключение к PostgreSQL")
-        dialog.geometry("500x400")
+        dialog.geometry("560x500")
         dialog.transient(self)
         dialog.grab_set()
 
@@ -559,7 +749,8 @@ class DataLoadApp(tk.Tk):
             ("Port:", "port", "5432"),
             ("Database:", "database", ""),
             ("User:", "user", ""),
-            ("Password:", "password", "")
+            ("Password:", "password", ""),
+            ("Чанк, строк (0 — загрузить целиком,\n>0 — только потоковая проверка):", "chunksize", "0")
         ]:
             tk.Label(dialog, text=label_text).grid(row=row, column=0, sticky="w", padx=10, pady=5)
             entry = tk.Entry(dialog, width=40, show="*" if key == "password" else "")
@@ -572,43 +763,86 @@ class DataLoadApp(tk.Tk):
         sql_text = scrolledtext.ScrolledText(dialog, height=8, width=40)
         sql_text.grid(row=row, column=1, padx=10, pady=5)
 
+        bulk_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(dialog, text="Быстрая выгрузка (COPY)", variable=bulk_var).grid(
+            row=row + 1, column=1, sticky="w", padx=10)
+
         def on_ok():
             values = {k: e.get().strip() for k, e in fields.items()}
             sql_query = sql_text.get("1.0", tk.END).strip()
             if not sql_query:
                 messagebox.showerror("Ошибка", "SQL-запрос не может быть пустым.")
                 return
+            try:
+                port = int(values["port"])
+                chunksize = int(values["chunksize"] or 0)
+            except ValueError:
+                messagebox.showerror("Ошибка", "Порт и размер чанка должны быть целыми числами.")
+                return
+            if chunksize < 0:
+                messagebox.showerror("Ошибка", "Размер чанка не может быть отрицательным.")
+                return
+            if chunksize and bulk_var.get():
+                messagebox.showerror("Ошибка", "Быстрая выгрузка (COPY) читает результат целиком: "
+                                               "укажите чанк 0 или снимите флажок.")
+                return
             dialog.destroy()
 
             self.clear_log()
             self.log("[INFO] Подключение к PostgreSQL...")
+            compact, refresh = self.compact_var.get(), self.refresh_var.get()
+            bulk = bulk_var.get()
+
+            def validate_stream(chunks):
+                """Поток не собирается в один DataFrame: он проверяется по чанкам, self.df не меняется."""
+                def on_progress(event):
+                    self.log_async(f"[VALIDATION] {event.message}")
+
+                try:
+                    with contextlib.closing(chunks):
+                        result = DataValidator.validate_chunks(chunks, verbose=False, progress=on_progress)
+                except Exception as e:
+                    self.after(0, self.show_error, "Ошибка PostgreSQL", f"Потоковая загрузка прервана: {e}")
+                    return
+                if result is None:
+                    self.log_async("[WARNING] Запрос выполнен, но данные пусты.")
+                    return
+                for line in result.report_lines():
+                    self.log_async(line)
+                self.log_async("\n[VALIDATION] Потоковая проверка завершена (загруженные данные не изменены).\n")
 
             def task():
                 df = self.loader.load_from_postgresql(
                     host=values["host"],
-                    port=int(values["port"]),
+                    port=port,
                     database=values["database"],
                     user=values["user"],
                     password=values["password"],
-                    sql_query=sql_query
+                    sql_query=sql_query,
+                    compact=compact,
+                    refresh=refresh,
+                    chunksize=chunksize or None,
+                    progress=lambda rows: self.log_async(f"[INFO] Получено строк: {rows}"),
+                    bulk=bulk
                 )
-                if df is not None:
-                    self.df = df
-                    self._print_preview(df)
+                if df is not None and chunksize:
+                    validate_stream(df)
+                elif df is not None:
+                    self.after(0, self._set_data, df)
                 else:
-                    self.show_error("Ошибка PostgreSQL", "Проверьте параметры подключения и SQL-запрос.")
+                    self.after(0, self.show_error, "Ошибка PostgreSQL", "Проверьте параметры подключения и SQL-запрос.")
 
             threading.Thread(target=task, daemon=True).start()
 
         btn_frame = tk.Frame(dialog)
-        btn_frame.grid(row=row + 1, column=0, columnspan=2, pady=10)
+        btn_frame.grid(row=row + 2, column=0, columnspan=2, pady=10)
         tk.Button(btn_frame, text="Отмена", width=10, command=dialog.destroy).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Загрузить", width=10, command=on_ok).pack(side=tk.LEFT, padx=5)
 
     def load_api(self):
         dialog = tk.Toplevel(self)
         dialog.title("Загрузка из API")
-        dialog.geometry("500x400")
+        dialog.geometry("560x470")
         dialog.transient(self)
         dialog.grab_set()
 
@@ -630,9 +864,25 @@ class DataLoadApp(tk.Tk):
         prefix_entry.insert(0, "Bearer")
         prefix_entry.grid(row=4, column=1, padx=10, pady=5)
 
+        tk.Label(dialog, text="Пагинация:").grid(row=5, column=0, sticky="w", padx=10, pady=5)
+        pagination_var = tk.StringVar(value="нет")
+        ttk.Combobox(dialog, textvariable=pagination_var, values=["нет", "offset", "cursor", "link"],
+                     state="readonly", width=10).grid(row=5, column=1, sticky="w", padx=10, pady=5)
+
+        tk.Label(dialog, text="Ключ записей (напр. data):").grid(row=6, column=0, sticky="w", padx=10, pady=5)
+        records_entry = tk.Entry(dialog, width=40)
+        records_entry.grid(row=6, column=1, padx=10, pady=5)
+
+        stream_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(dialog, text="Потоковый разбор (JSON-массив / NDJSON)", variable=stream_var).grid(
+            row=7, column=1, sticky="w", padx=10)
+
         def on_ok():
             url = url_entry.get().strip()
             expect_json = json_var.get()
+            pagination = pagination_var.get()
+            records_key = records_entry.get().strip() or None
+            stream = stream_var.get()
             token = token_entry.get().strip()
             prefix = prefix_entry.get().strip()
 
@@ -647,22 +897,29 @@ class DataLoadApp(tk.Tk):
             dialog.destroy()
             self.clear_log()
             self.log(f"[INFO] Загрузка из API: {url}")
+            compact, refresh = self.compact_var.get(), self.refresh_var.get()
 
             def task():
-                df = self.loader.load_from_api(url, headers=headers, expect_json=expect_json)
+                if pagination != "нет" and expect_json:
+                    df = self.loader.load_from_api_paginated(
+                        url, headers=headers, pagination=pagination, records_key=records_key, compact=compact,
+                        progress=lambda pages, rows: self.log_async(f"[INFO] Страниц: {pages}, строк: {rows}")
+                    )
+                else:
+                    df = self.loader.load_from_api(url, headers=headers, expect_json=expect_json, compact=compact,
+                                                   stream=stream, refresh=refresh)
                 if isinstance(df, pd.DataFrame):
-                    self.df = df
-                    self._print_preview(df)
+                    self.after(0, self._set_data, df)
                 elif isinstance(df, str):
-                    self.log("\n[INFO] Получен текстовый ответ:")
-                    self.log(df[:2000])
+                    self.log_async("\n[INFO] Получен текстовый ответ:")
+                    self.log_async(df[:2000])
                 else:
-                    self.show_error("Ошибка API", "Не удалось получить данные. Проверьте URL, токен и формат ответа.")
+                    self.after(0, self.show_error, "Ошибка API", "Не удалось получить данные. Проверьте URL, токен и формат ответа.")
 
             threading.Thread(target=task, daemon=True).start()
 
         btn_frame = tk.Frame(dialog)
-        btn_frame.grid(row=5, column=0, columnspan=2, pady=20)
+        btn_frame.grid(row=8, column=0, columnspan=2, pady=20)
         tk.Button(btn_frame, text="Отмена", width=10, command=dialog.destroy).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Загрузить", width=10, command=on_ok).pack(side=tk.LEFT, padx=5)
 
@@ -19,6 +19,16 @@ class TestDataAnalyzer(unittest.TestCase):
         except Exception as e:
             self.fail(f"basic_statistics() вызвала ошибку: {e}")
 
+    def test_basic_statistics_frame_matches_pandas(self):
+        stats = self.analyzer.basic_statistics()
+        numeric = self.df[["age", "salary"]]
+        expected = pd.DataFrame({
+            "mean": numeric.mean(), "median": numeric.median(), "mode": numeric.mode().iloc[0],
+            "std": numeric.std(), "min": numeric.min(), "max": numeric.max(),
+        })
+        pd.testing.assert_frame_equal(stats, expected, check_dtype=False)
+        self.assertNotIn("mode", self.analyzer.basic_statistics(mode=None).columns)
+
     def test_find_anomalies(self):
         try:
             self.analyzer.find_anomalies(z_thresh=2.0)
@@ -0,0 +1,103 @@
+import unittest
+import os
+import shutil
+import unittest.mock
+import pandas as pd
+from data_cache import DatasetCache, default_cache_dir
+from data_loader import DataLoader
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = "test_cache"
+        self.csv_file = "test_cache_data.csv"
+        self.df = pd.DataFrame({"A": range(100), "B": ["x", "y"] * 50})
+        self.df.to_csv(self.csv_file, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        if os.path.exists(self.csv_file):
+            os.remove(self.csv_file)
+
+    def test_put_get_roundtrip(self):
+        cache = DatasetCache(self.cache_dir)
+        key = DatasetCache.make_key("test", name="roundtrip")
+        self.assertIsNone(cache.get(key))
+        self.assertTrue(cache.put(key, self.df))
+        pd.testing.assert_frame_equal(cache.get(key), self.df)
+        # Индекс сохраняется на диске и читается новым экземпляром
+        pd.testing.assert_frame_equal(DatasetCache(self.cache_dir).get(key), self.df)
+
+    def test_invalidate_and_clear(self):
+        cache = DatasetCache(self.cache_dir)
+        k1, k2 = DatasetCache.make_key("t", n=1), DatasetCache.make_key("t", n=2)
+        cache.put(k1, self.df)
+        cache.put(k2, self.df)
+        cache.invalidate(k1)
+        self.assertIsNone(cache.get(k1))
+        self.assertIsNotNone(cache.get(k2))
+        cache.clear()
+        self.assertIsNone(cache.get(k2))
+        self.assertEqual(cache.size_bytes, 0)
+
+    def test_lru_eviction(self):
+        cache = DatasetCache(self.cache_dir)
+        keys = [DatasetCache.make_key("t", n=i) for i in range(3)]
+        cache.put(keys[0], self.df)
+        cache.max_bytes = cache.size_bytes * 2
+        cache.put(keys[1], self.df)
+        cache.get(keys[0])  # keys[0] использован позже keys[1]
+        cache.put(keys[2], self.df)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_ttl_skips_files(self):
+        cache = DatasetCache(self.cache_dir, ttl=-1)
+        sql_key = DatasetCache.sql_key("SELECT 1", "localhost", 5432, "db", "user")
+        file_key = DatasetCache.file_key(self.csv_file)
+        cache.put(sql_key, self.df, kind="sql")
+        cache.put(file_key, self.df, kind="file")
+        self.assertIsNone(cache.get(sql_key))
+        self.assertIsNotNone(cache.get(file_key))
+
+    def test_evicted_file_is_a_miss(self):
+        # Файл удалён другим потоком между проверкой под блокировкой и чтением
+        cache = DatasetCache(self.cache_dir)
+        key = DatasetCache.make_key("t", n=0)
+        cache.put(key, self.df)
+        os.remove(cache._path(key, cache.fmt))
+        with unittest.mock.patch("data_cache.os.path.exists", return_value=True):
+            self.assertIsNone(cache.get(key))
+
+    def test_default_dir_is_per_user(self):
+        with unittest.mock.patch.dict(os.environ, {"XDG_CACHE_HOME": os.path.abspath(self.cache_dir),
+                                                   "LOCALAPPDATA": os.path.abspath(self.cache_dir)}):
+            cache = DatasetCache()
+        self.assertEqual(cache.cache_dir, os.path.join(os.path.abspath(self.cache_dir), "dataloadapp"))
+        self.assertTrue(os.path.isdir(cache.cache_dir))
+        self.assertTrue(os.path.isabs(default_cache_dir()))
+
+    def test_loader_uses_cache(self):
+        loader = DataLoader(cache=DatasetCache(self.cache_dir))
+        first = loader.load_csv(self.csv_file)
+        key = DatasetCache.file_key(self.csv_file, source="csv", compact=False)
+        self.assertIsNotNone(loader.cache.get(key))
+        pd.testing.assert_frame_equal(loader.load_csv(self.csv_file), first)
+
+        # Изменение файла меняет ключ
+        self.df.head(10).to_csv(self.csv_file, index=False)
+        os.utime(self.csv_file, ns=(0, 10 ** 18))
+        self.assertEqual(len(loader.load_csv(self.csv_file)), 10)
+
+    def test_refresh_bypasses_cache(self):
+        loader = DataLoader(cache=DatasetCache(self.cache_dir))
+        self.assertIsNotNone(loader.cache.ttl)  # SQL и API не кэшируются бессрочно
+        key = DatasetCache.file_key(self.csv_file, source="csv", compact=False)
+        loader.cache.put(key, self.df.head(3), kind="file")
+        self.assertEqual(len(loader.load_csv(self.csv_file)), 3)
+        self.assertEqual(len(loader.load_csv(self.csv_file, refresh=True)), 100)
+        # Свежий результат заменил запись в кэше
+        self.assertEqual(len(loader.cache.get(key)), 100)
+
+if __name__ == "__main__":
+    unittest.main()
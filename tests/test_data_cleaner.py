@@ -1,6 +1,13 @@
 import unittest
 import pandas as pd
-from data_cleaner import DataCleaner
+import os
+import pickle
+import contextlib
+import io
+import tempfile
+import unittest.mock
+import numpy as np
+from data_cleaner import CleaningPipeline, DataCleaner, NumericScaler
 
 class TestDataCleaner(unittest.TestCase):
     def setUp(self):
@@ -50,5 +57,385 @@ class TestDataCleaner(unittest.TestCase):
         self.assertAlmostEqual(scaled["numeric"].min(), 0.0, places=5)
         self.assertAlmostEqual(scaled["numeric"].max(), 1.0, places=5)
 
+    def test_drop_duplicates_chunks(self):
+        df = pd.DataFrame({"a": [1, 2, 1, 3, 2], "b": ["x", "y", "x", "z", "y"]})
+        chunks = (df.iloc[i:i + 2] for i in range(0, len(df), 2))
+        result = pd.concat(list(self.cleaner.drop_duplicates(chunks)))
+        self.assertEqual(result["a"].tolist(), [1, 2, 3])
+
+    def test_drop_duplicates_many_chunks_and_cap(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"a": rng.integers(0, 300, 2000)})
+        chunks = [df.iloc[i:i + 50] for i in range(0, len(df), 50)]
+        result = pd.concat(list(self.cleaner.drop_duplicates(iter(chunks))))
+        pd.testing.assert_frame_equal(result, df.drop_duplicates())
+        # После max_seen хэшей новые строки не запоминаются, их повторы остаются
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            capped = pd.concat(list(self.cleaner.drop_duplicates(iter(chunks), max_seen=100)))
+        self.assertIn("[WARNING]", out.getvalue())
+        self.assertGreater(len(capped), len(result))
+        self.assertFalse(capped.iloc[:100].duplicated().any())
+
+    def test_drop_duplicates_chunks_confirms_hash_matches(self):
+        # Все хэши совпадают (как при коллизии): внутри чанка удаляются только настоящие повторы
+        df = pd.DataFrame({"a": [1, 2, 1, 3], "b": ["x", "y", "x", "z"]})
+        constant = lambda frame: np.zeros(len(frame), dtype=np.uint64)
+        with unittest.mock.patch("data_cleaner.row_hashes", constant), \
+                unittest.mock.patch("chunk_stats.row_hashes", constant), \
+                contextlib.redirect_stdout(io.StringIO()):
+            result = pd.concat(list(self.cleaner.drop_duplicates(iter([df]))))
+        self.assertEqual(result["a"].tolist(), [1, 2, 3])
+
+    def test_drop_duplicates_subset_keep(self):
+        df = pd.DataFrame({"a": [1, 2, 1, 3, 2], "b": ["x", "y", "q", "z", "y"]})
+        for keep in ("first", "last", False):
+            result = self.cleaner.drop_duplicates(df, subset=["a"], keep=keep)
+            pd.testing.assert_frame_equal(result, df.drop_duplicates(subset=["a"], keep=keep))
+
+    def test_handle_missing_chunks(self):
+        chunks = [self.df.iloc[:3], self.df.iloc[3:]]
+        result = pd.concat(list(self.cleaner.handle_missing_values(iter(chunks), strategy="mean")))
+        self.assertFalse(result["numeric"].isna().any())
+
+class TestCategoricalEncoding(unittest.TestCase):
+    def setUp(self):
+        self.cleaner = DataCleaner()
+        self.df = pd.DataFrame({
+            "city": ["A", "B", "A", "C", "A", "D", None, "B"],
+            "y": [1.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0],
+        })
+
+    def test_onehot_int8_and_sparse(self):
+        dense = self.cleaner.encode_categorical(self.df, method="onehot")
+        self.assertEqual(str(dense["city_A"].dtype), "int8")
+        sparse = self.cleaner.encode_categorical(self.df, method="onehot", sparse=True)
+        self.assertIsInstance(sparse["city_A"].dtype, pd.SparseDtype)
+        city_cols = [c for c in dense.columns if c.startswith("city_")]
+        pd.testing.assert_frame_equal(sparse[city_cols].sparse.to_dense(), dense[city_cols])
+
+    def test_max_categories_other_bucket(self):
+        encoded = self.cleaner.encode_categorical(self.df, method="onehot", max_categories=2)
+        self.assertEqual([c for c in encoded.columns if c.startswith("city_")], ["city_A", "city_B", "city_other"])
+        self.assertEqual(encoded["city_other"].tolist(), [0, 0, 0, 1, 0, 1, 0, 0])
+
+    def test_hash_frequency_target(self):
+        hashed = self.cleaner.encode_categorical(self.df, method="hash", n_features=4)
+        hash_cols = [c for c in hashed.columns if c.startswith("city_hash_")]
+        self.assertEqual(len(hash_cols), 4)
+        self.assertEqual(hashed[hash_cols].sum(axis=1).tolist(), [1, 1, 1, 1, 1, 1, 0, 1])
+
+        freq = self.cleaner.encode_categorical(self.df, method="frequency")
+        self.assertAlmostEqual(freq["city"].iloc[0], 3 / 8)
+
+        encoded = self.cleaner.encode_categorical(self.df, method="target", target="y", smoothing=2.0)
+        prior = self.df["y"].mean()
+        self.assertAlmostEqual(encoded["city"].iloc[0], (2 + 2 * prior) / (3 + 2))
+        self.assertEqual(encoded["y"].tolist(), self.df["y"].tolist())
+
+class TestImputation(unittest.TestCase):
+    def setUp(self):
+        self.cleaner = DataCleaner()
+        self.df = pd.DataFrame({
+            "region": ["a", "b", "a", "b", "a", "b", "a"],
+            "t": [5, 1, 2, 3, 4, 6, 1],
+            "x": [None, 1.0, 2.0, None, None, 5.0, 10.0],
+            "s": [None, "q", None, None, "r", None, "z"],
+        })
+
+    def test_group_mean_with_global_fallback(self):
+        df = self.df.copy()
+        df.loc[df["region"] == "b", "x"] = None
+        result = self.cleaner.handle_missing_values(df, strategy="mean", group_by="region")
+        self.assertEqual(result["x"].tolist()[::2], [6.0, 2.0, 6.0, 10.0])
+        self.assertEqual(result.loc[1, "x"], 6.0)  # у группы b значений нет — общее среднее
+
+    def test_ffill_bfill_by_time_match_pandas(self):
+        ordered = self.df.sort_values("t", kind="stable")
+        for strategy in ("ffill", "bfill"):
+            result = self.cleaner.handle_missing_values(self.df, strategy=strategy, group_by="region", order_by="t")
+            expected = getattr(ordered.groupby("region")[["x", "s"]], strategy)().reindex(self.df.index)
+            pd.testing.assert_frame_equal(result[["x", "s"]], expected, check_dtype=False)
+            self.assertEqual(result["region"].tolist(), self.df["region"].tolist())
+
+    def test_rolling_matches_pandas(self):
+        result = self.cleaner.handle_missing_values(self.df, strategy="rolling", group_by="region",
+                                                    order_by="t", window=2)
+        ordered = self.df.sort_values(["region", "t"], kind="stable")
+        rolled = ordered.groupby("region")["x"].rolling(2, min_periods=1).mean().reset_index(level=0, drop=True)
+        expected = ordered["x"].fillna(rolled).reindex(self.df.index)
+        pd.testing.assert_series_equal(result["x"], expected)
+
+    def test_ffill_order_by_tz_aware_and_extreme_ints(self):
+        x = [1.0, None, 3.0, None]
+        df = pd.DataFrame({"t": pd.date_range("2024-01-01", periods=4, tz="Europe/Moscow")[[2, 0, 3, 1]], "x": x})
+        result = self.cleaner.handle_missing_values(df, strategy="ffill", order_by="t")
+        self.assertEqual(result["x"].tolist()[::2], [1.0, 3.0])
+        self.assertTrue(result["x"].iloc[[1, 3]].isna().all())
+        info = np.iinfo(np.int64)
+        df = pd.DataFrame({"t": np.array([info.min, 0, info.max, 5]), "x": x})
+        result = self.cleaner.handle_missing_values(df, strategy="ffill", order_by="t")
+        self.assertEqual(result["x"].tolist(), [1.0, 1.0, 3.0, 1.0])
+
+    def test_streaming_carries_state(self):
+        ordered = self.df.sort_values("t", kind="stable")
+        chunks = [ordered.iloc[:3], ordered.iloc[3:5], ordered.iloc[5:]]
+        for strategy in ("ffill", "rolling"):
+            full = self.cleaner.handle_missing_values(ordered, strategy=strategy, group_by="region",
+                                                      order_by="t", window=2)
+            streamed = pd.concat(list(self.cleaner.handle_missing_values(
+                iter(chunks), strategy=strategy, group_by="region", order_by="t", window=2)))
+            pd.testing.assert_frame_equal(streamed, full)
+
+    def test_streaming_running_group_mean(self):
+        chunks = [self.df.iloc[:3], self.df.iloc[3:]]
+        result = pd.concat(list(self.cleaner.handle_missing_values(iter(chunks), strategy="mean", group_by="region")))
+        # Первый чанк: у группы a только значение 2.0; во втором — уже (2 + 10) / 2
+        self.assertEqual(result.loc[0, "x"], 2.0)
+        self.assertEqual(result.loc[4, "x"], 6.0)
+        self.assertEqual(result.loc[3, "x"], 3.0)
+
+    def test_streaming_fitted_mean_matches_batch(self):
+        chunks = [self.df.iloc[:3], self.df.iloc[3:]]
+        for group_by in (None, "region"):
+            cleaner = DataCleaner()
+            cleaner.fit_imputer(iter(chunks), group_by=group_by)
+            streamed = pd.concat(list(cleaner.handle_missing_values(iter(chunks), strategy="mean")))
+            expected = cleaner.handle_missing_values(self.df, strategy="mean", group_by=group_by,
+                                                     columns=["x"] if group_by else None)
+            pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+class TestDateConversion(unittest.TestCase):
+    def setUp(self):
+        self.cleaner = DataCleaner()
+        self.df = pd.DataFrame({
+            "day_first": ["05/01/2023", "17/02/2023", None, "05/01/2023", "01/03/2023"],
+            "mixed": ["2023-01-05", "17/02/2023", None, "2023-01-05", "01/03/2023"],
+            "name": ["x", "y", "z", "w", "v"],
+            "partly": ["05.01.2023", "06.01.2023", "bad", "07.01.2023", "08.01.2023"],
+        })
+
+    def test_single_format_per_column(self):
+        # 05/01 можно прочитать как %m/%d, но 17/02 — только как %d/%m: весь столбец читается одинаково
+        result = self.cleaner.convert_dates(self.df, ["day_first"])
+        expected = pd.to_datetime(["2023-01-05", "2023-02-17", None, "2023-01-05", "2023-03-01"])
+        self.assertEqual(result["day_first"].tolist(), expected.tolist())
+        self.assertEqual(self.cleaner.date_formats["day_first"], ["%d/%m/%Y"])
+
+    def test_conflicting_formats_are_not_mixed(self):
+        result = self.cleaner.convert_dates(self.df, ["mixed"], dayfirst=True)
+        self.assertIn("mixed", self.cleaner.date_failures)
+        pd.testing.assert_series_equal(result["mixed"], self.df["mixed"])
+        # Явно заданные форматы применяются по очереди
+        result = self.cleaner.convert_dates(self.df, ["mixed"], formats={"mixed": ["%Y-%m-%d", "%d/%m/%Y"]})
+        self.assertEqual(result["mixed"].tolist(), self.cleaner.convert_dates(self.df, ["day_first"])["day_first"].tolist())
+
+    def test_blank_strings_are_missing(self):
+        df = pd.DataFrame({"d": ["2023-01-05", "", "  ", None]})
+        result = self.cleaner.convert_dates(df, ["d"])
+        self.assertEqual(self.cleaner.date_failures, {})
+        self.assertEqual(result["d"].iloc[0], pd.Timestamp("2023-01-05"))
+        self.assertTrue(result["d"].iloc[1:].isna().all())
+
+    def test_reports_failed_columns(self):
+        result = self.cleaner.convert_dates(self.df, ["name", "partly", "missing"], dayfirst=True)
+        self.assertEqual(set(self.cleaner.date_failures), {"name", "partly", "missing"})
+        pd.testing.assert_frame_equal(result, self.df)
+
+    def test_max_invalid_allows_nat(self):
+        result = self.cleaner.convert_dates(self.df, ["partly"], dayfirst=True, max_invalid=0.25)
+        self.assertTrue(pd.isna(result.loc[2, "partly"]))
+        self.assertEqual(result.loc[0, "partly"], pd.Timestamp("2023-01-05"))
+        self.assertEqual(self.cleaner.date_failures, {})
+
+    def test_chunks_reuse_first_chunk_formats(self):
+        chunks = [self.df.iloc[:2], self.df.iloc[2:]]
+        result = pd.concat(list(self.cleaner.convert_dates(iter(chunks), ["day_first"])))
+        pd.testing.assert_series_equal(result["day_first"],
+                                       self.cleaner.convert_dates(self.df, ["day_first"])["day_first"])
+
+    def test_chunks_decide_per_stream(self):
+        good = pd.DataFrame({"d": ["13.02.2023", "14.02.2023"], "bad": ["x", "y"]})
+        worse = pd.DataFrame({"d": ["bad", "worse"], "bad": ["2023-01-01", "2023-01-02"]})
+        with contextlib.redirect_stdout(io.StringIO()):
+            chunks = list(self.cleaner.convert_dates(iter([good, worse]), ["d", "bad"], max_invalid=0.1))
+        # Решение по первому чанку: d — datetime во всех чанках, bad — нигде
+        self.assertTrue(all(pd.api.types.is_datetime64_any_dtype(c["d"]) for c in chunks))
+        self.assertTrue(chunks[1]["d"].isna().all())
+        self.assertEqual(chunks[1]["bad"].tolist(), ["2023-01-01", "2023-01-02"])
+        # Ошибки копятся по всему потоку
+        self.assertEqual(set(self.cleaner.date_failures), {"d", "bad"})
+        self.assertIn("не разобрано 2 из 4", self.cleaner.date_failures["d"])
+        self.assertEqual(self.cleaner.date_formats["d"], ["%d.%m.%Y"])
+
+class TestScaling(unittest.TestCase):
+    def setUp(self):
+        self.cleaner = DataCleaner()
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            "x": rng.normal(10, 3, 2000),
+            "y": rng.integers(0, 50, 2000),
+            "flag": rng.integers(0, 2, 2000),
+        })
+        self.df.loc[::17, "x"] = None
+        self.chunks = [self.df.iloc[i:i + 300] for i in range(0, len(self.df), 300)]
+
+    def test_partial_fit_matches_full_fit(self):
+        for method in ("standard", "minmax"):
+            full = NumericScaler(method).fit(self.df)
+            streamed = NumericScaler(method).fit(iter(self.chunks))
+            pd.testing.assert_series_equal(streamed.offset, full.offset)
+            pd.testing.assert_series_equal(streamed.scale, full.scale)
+        self.assertEqual(full.scale_columns, ["x", "y"])
+
+    def test_robust_uses_median_and_iqr(self):
+        scaled = self.cleaner.scale_numeric(self.df, method="robust")
+        q1, median, q3 = self.df["x"].quantile([0.25, 0.5, 0.75])
+        expected = (self.df["x"] - median) / (q3 - q1)
+        pd.testing.assert_series_equal(scaled["x"], expected)
+        self.assertEqual(scaled["flag"].tolist(), self.df["flag"].tolist())
+
+    def test_quantile_maps_to_unit_interval(self):
+        scaled = self.cleaner.scale_numeric(self.df, method="quantile")
+        self.assertAlmostEqual(scaled["x"].min(), 0.0)
+        self.assertAlmostEqual(scaled["x"].max(), 1.0)
+        self.assertTrue(scaled["x"].isna().equals(self.df["x"].isna()))
+        self.assertAlmostEqual(scaled["x"].median(), 0.5, places=2)
+
+    def test_fitted_scaler_applies_to_batches_and_chunks(self):
+        self.cleaner.fit_scaler(iter(self.chunks), method="standard")
+        streamed = pd.concat(list(self.cleaner.scale_numeric(iter(self.chunks))))
+        batch = self.cleaner.scale_numeric(self.df.iloc[:10], fit=False)
+        pd.testing.assert_frame_equal(batch, streamed.iloc[:10])
+        self.assertAlmostEqual(streamed["x"].mean(), 0.0, places=10)
+
+    def test_partial_fit_after_exact_fit(self):
+        # Точные квантили не дообучаются; standard/minmax продолжают накопление
+        for method in ("robust", "quantile"):
+            scaler = NumericScaler(method).fit(self.df)
+            with self.assertRaises(RuntimeError):
+                scaler.partial_fit(self.chunks[0])
+            scaler.reset().partial_fit(self.chunks[0])
+        scaler = NumericScaler("minmax").fit(self.df.iloc[:300]).partial_fit(self.df.iloc[300:])
+        self.assertEqual(scaler.offset["x"], self.df["x"].min())
+
+    def test_scale_stream_requires_fit(self):
+        with self.assertRaises(RuntimeError):
+            self.cleaner.scale_numeric(iter(self.chunks))
+
+class TestLabelEncoding(unittest.TestCase):
+    def setUp(self):
+        self.cleaner = DataCleaner()
+        self.df = pd.DataFrame({
+            "city": ["B", "A", None, "C", "A"],
+            "grade": pd.Categorical(["lo", "hi", "hi", "mid", "lo"], categories=["lo", "mid", "hi"]),
+            "n": [1, 2, 3, 4, 5],
+        })
+
+    def test_vocabularies_and_unseen(self):
+        encoded = self.cleaner.encode_categorical(self.df, method="label")
+        self.assertEqual(encoded["city"].tolist(), [1, 0, -1, 2, 0])
+        self.assertEqual(encoded["grade"].tolist(), [0, 2, 2, 1, 0])
+        self.assertEqual(list(self.cleaner.label_encoders["city"]), ["A", "B", "C"])
+
+        batch = pd.DataFrame({"city": ["C", "Z", "A"], "grade": ["mid", "top", "lo"], "n": [1, 2, 3]})
+        applied = self.cleaner.apply_label_encoding(batch)
+        self.assertEqual(applied["city"].tolist(), [2, -1, 0])
+        self.assertEqual(applied["grade"].tolist(), [1, -1, 0])
+        decoded = self.cleaner.decode_labels(applied)
+        self.assertEqual(decoded["city"].tolist()[::2], ["C", "A"])
+        self.assertTrue(pd.isna(decoded["city"].iloc[1]))
+
+    def test_parallel_wide_frame(self):
+        wide = pd.DataFrame({f"c{i}": ["x", "y", "x", "z"] for i in range(10)})
+        encoded = self.cleaner.encode_categorical(wide, method="label", max_workers=4)
+        self.assertTrue((encoded.to_numpy() == [[0], [1], [0], [2]]).all())
+        self.assertEqual(len(self.cleaner.label_encoders), 10)
+
+class TestInplaceCleaning(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "numeric": [1.0, 2.0, None, 4.0, 5.0, 2.0],
+            "ints": [3, 1, 4, 1, 5, 1],
+            "categorical": ["A", "B", "A", None, "C", "B"],
+            "flag": [0, 1, 0, 1, 0, 1],
+        })
+
+    def chain(self, cleaner, df, missing):
+        df = cleaner.handle_missing_values(df, strategy=missing)
+        df = cleaner.drop_duplicates(df)
+        df = cleaner.encode_categorical(df, method="onehot")
+        return cleaner.scale_numeric(df, method="standard")
+
+    def test_matches_copy_mode(self):
+        for missing in ("mean", "median", "drop"):
+            expected = self.chain(DataCleaner(), self.df.copy(), missing)
+            result = self.chain(DataCleaner(inplace=True), self.df.copy(), missing)
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_onehot_inserts_one_block(self):
+        df = pd.DataFrame({"x": np.arange(300.0), "cat": [f"v{i % 40}" for i in range(300)]})
+        expected = DataCleaner().encode_categorical(df.copy(), method="onehot")
+        result = DataCleaner(inplace=True).encode_categorical(df, method="onehot")
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(result._mgr.nblocks, 2)
+        self.assertEqual(result.filter(like="cat_").sum(axis=1).tolist(), [1] * 300)
+
+    def test_modifies_passed_frame(self):
+        df = self.df.copy()
+        result = DataCleaner(inplace=True).handle_missing_values(df, strategy="mean")
+        self.assertIs(result, df)
+        self.assertFalse(df["numeric"].isna().any())
+        # Режим по умолчанию исходник не трогает
+        DataCleaner().scale_numeric(self.df)
+        self.assertEqual(self.df["ints"].tolist(), [3, 1, 4, 1, 5, 1])
+
+class TestCleaningPipeline(unittest.TestCase):
+    def setUp(self):
+        self.cleaner = DataCleaner()
+        self.df = pd.DataFrame({
+            "numeric": [1.0, 2.0, None, 4.0, 5.0, 7.0],
+            "categorical": ["A", "B", "A", None, "C", "B"],
+            "target": [0, 1, 0, 1, 0, 1],
+        })
+
+    def test_fit_transform_matches_cleaner(self):
+        for encode in ("onehot", "label"):
+            pipeline = CleaningPipeline([("missing", {"strategy": "mean"}), ("encode", {"method": encode}),
+                                         ("scale", {"method": "standard"})])
+            result = pipeline.fit_transform(self.df)
+            expected = self.cleaner.scale_numeric(self.cleaner.encode_categorical(
+                self.cleaner.handle_missing_values(self.df, "mean"), method=encode), "standard")
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_transform_uses_fitted_state(self):
+        pipeline = self.cleaner.fit_pipeline(self.df, missing="median", encode="onehot", scale="minmax")
+        batch = pd.DataFrame({"numeric": [None, 7.0], "categorical": ["Z", "B"], "target": [1, 0]})
+        result = pipeline.transform(batch)
+        # Пропуск заполнен медианой эталона (4.0), масштаб — по min/max эталона (1..7)
+        self.assertAlmostEqual(result["numeric"].iloc[0], 0.5)
+        self.assertAlmostEqual(result["numeric"].iloc[1], 1.0)
+        self.assertEqual(list(result.columns), ["numeric", "target", "categorical_A", "categorical_B", "categorical_C"])
+        self.assertEqual(result.loc[0, ["categorical_A", "categorical_B", "categorical_C"]].sum(), 0)
+
+    def test_label_unseen_and_chunks(self):
+        pipeline = CleaningPipeline([("encode", {"method": "label"})]).fit(self.df)
+        chunks = [pd.DataFrame({"categorical": ["B", "Q"]}), pd.DataFrame({"categorical": ["A"]})]
+        result = pd.concat(list(pipeline.transform(iter(chunks))))
+        self.assertEqual(result["categorical"].tolist(), [1, -1, 0])
+
+    def test_pickle_roundtrip(self):
+        pipeline = self.cleaner.fit_pipeline(self.df)
+        restored = pickle.loads(pickle.dumps(pipeline))
+        pd.testing.assert_frame_equal(restored.transform(self.df), pipeline.transform(self.df))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pipeline.pkl")
+            pipeline.save(path)
+            pd.testing.assert_frame_equal(CleaningPipeline.load(path).transform(self.df), pipeline.transform(self.df))
+
+    def test_not_fitted(self):
+        with self.assertRaises(RuntimeError):
+            CleaningPipeline([("scale", {})]).transform(self.df)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
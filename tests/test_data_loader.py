@@ -1,7 +1,15 @@
 import unittest
+import unittest.mock
+import contextlib
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 import pandas as pd
 import os
-from data_loader import DataLoader
+import tempfile
+from data_loader import DataLoader, _wrap_copy_query
 
 class TestDataLoader(unittest.TestCase):
     @classmethod
@@ -49,9 +57,344 @@ class TestDataLoader(unittest.TestCase):
         self.assertEqual(len(df.columns), 1)
         self.assertIn("Y", df.columns)
 
+    def test_load_csv_chunks(self):
+        chunks = self.loader.load_csv(self.csv_file, chunksize=2)
+        chunks = list(chunks)
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual(chunks[0].dtypes.to_dict(), chunks[1].dtypes.to_dict())
+
+    def test_compact_dtypes(self):
+        df = pd.DataFrame({
+            "small": [1, 2, 3, 4] * 250,
+            "neg": [-5, 0, 5, 100] * 250,
+            "half": [0.5, 1.5, None, 2.25] * 250,
+            "precise": [0.1, 0.2, 0.3, 0.4] * 250,
+            "cat": ["a", "b", "a", "b"] * 250,
+        })
+        compact = DataLoader.compact_dtypes(df)
+        self.assertEqual(compact["small"].dtype, "uint8")
+        self.assertEqual(compact["neg"].dtype, "int8")
+        self.assertEqual(compact["half"].dtype, "float32")
+        self.assertEqual(compact["precise"].dtype, "float64")
+        self.assertIsInstance(compact["cat"].dtype, pd.CategoricalDtype)
+        self.assertLess(compact.memory_usage(deep=True).sum(), df.memory_usage(deep=True).sum())
+        pd.testing.assert_frame_equal(compact.astype(df.dtypes.to_dict()), df)
+
+    def test_compact_chunks_keep_stable_dtypes(self):
+        path = "test_compact_chunks.csv"
+        pd.DataFrame({
+            "small": [1, 2, 3, 4] * 50 + [200, 250] * 100,
+            "cat": ["a", "b"] * 100 + ["c", "d"] * 100,
+            "half": [0.5, 1.5] * 200,
+        }).to_csv(path, index=False)
+        try:
+            chunks = list(self.loader.load_csv(path, chunksize=200, compact=True))
+        finally:
+            os.remove(path)
+        self.assertEqual(chunks[0].dtypes.to_dict(), chunks[1].dtypes.to_dict())
+        combined = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(combined.dtypes.to_dict(), chunks[0].dtypes.to_dict())
+        self.assertEqual(combined["small"].dtype, "uint8")
+        self.assertEqual(combined["half"].dtype, "float32")
+        self.assertTrue(pd.api.types.is_string_dtype(combined["cat"]))
+        self.assertEqual(sorted(combined["cat"].unique()), ["a", "b", "c", "d"])
+
+    def test_compact_chunk_widens_on_overflow(self):
+        dtypes = DataLoader.compact_dtype_map(pd.DataFrame({"n": [1, 2, 3]}), stream=True)
+        chunk = DataLoader._compact_chunk(pd.DataFrame({"n": [1, 70000]}), dtypes)
+        self.assertEqual(chunk["n"].tolist(), [1, 70000])
+        self.assertEqual(dtypes["n"], chunk["n"].dtype)
+
+    def test_load_csv_compact(self):
+        df = self.loader.load_csv(self.csv_file, compact=True)
+        self.assertEqual(df["A"].dtype, "uint8")
+
+    def test_engine_registry(self):
+        with DataLoader(idle_timeout=60) as loader:
+            e1 = loader._get_engine("localhost", 5432, "db", "user", "pw")
+            e2 = loader._get_engine("localhost", "5432", "db", "user", "pw")
+            e3 = loader._get_engine("localhost", 5432, "other", "user", "pw")
+            self.assertIs(e1, e2)
+            self.assertIsNot(e1, e3)
+            self.assertEqual(len(loader._engines), 2)
+
+            loader.idle_timeout = -1
+            loader._get_engine("localhost", 5432, "db", "user", "pw")
+            self.assertEqual(len(loader._engines), 1)
+        self.assertEqual(loader._engines, {})
+
+    def test_stream_sql_query(self):
+        # SQLite вместо PostgreSQL: проверяется разбиение на чанки и отчёт о прогрессе
+        from sqlalchemy import create_engine
+        engine = create_engine("sqlite://")
+        pd.DataFrame({"a": range(10)}).to_sql("t", engine, index=False)
+        progress = []
+        chunks = list(self.loader._stream_sql_query(engine, "SELECT a FROM t", 4, progress.append))
+        self.assertEqual([len(c) for c in chunks], [4, 4, 2])
+        self.assertEqual(progress, [4, 8, 10])
+
+    def test_postgresql_bulk_with_chunksize_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.loader.load_from_postgresql("localhost", 5432, "db", "user", "pw", "SELECT 1",
+                                             chunksize=100, bulk=True)
+
+    def test_stream_sql_query_close_releases_connection(self):
+        from sqlalchemy import create_engine
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'db.sqlite')}")
+            pd.DataFrame({"a": range(10)}).to_sql("t", engine, index=False)
+            chunks = self.loader._stream_sql_query(engine, "SELECT a FROM t", 4)
+            next(chunks)
+            self.assertEqual(engine.pool.checkedout(), 1)
+            chunks.close()
+            self.assertEqual(engine.pool.checkedout(), 0)
+            engine.dispose()
+
+    def test_copy_query(self):
+        # Подмена psycopg2-соединения: copy_expert пишет CSV в переданный файл
+        class FakeCursor:
+            def copy_expert(self, sql, file):
+                FakeCursor.sql = sql
+                for i in range(0, 3000, 1000):
+                    file.write(("id,name\n" if i == 0 else "").encode())
+                    file.write("".join(f"{j},n{j}\n" for j in range(i, i + 1000)).encode())
+
+            def close(self):
+                pass
+
+        class FakeEngine:
+            def raw_connection(self):
+                conn = unittest.mock.Mock()
+                conn.cursor.return_value = FakeCursor()
+                return conn
+
+        df = DataLoader._copy_query(FakeEngine(), "SELECT id, name FROM t;")
+        self.assertEqual(FakeCursor.sql,
+                         "COPY (SELECT id, name FROM t) TO STDOUT WITH (FORMAT csv, HEADER true)")
+        self.assertEqual(len(df), 3000)
+        self.assertEqual(df["id"].iloc[-1], 2999)
+
+    def test_copy_query_wrapping(self):
+        self.assertEqual(_wrap_copy_query("SELECT id FROM t; -- все строки\n"),
+                         "COPY (SELECT id FROM t) TO STDOUT WITH (FORMAT csv, HEADER true)")
+        wrapped = _wrap_copy_query("SELECT '--;' AS \"a;b\" /* ; */ FROM t;")
+        self.assertEqual(wrapped,
+                         "COPY (SELECT '--;' AS \"a;b\"   FROM t) TO STDOUT WITH (FORMAT csv, HEADER true)")
+        for query in ("SELECT 1; DROP TABLE t", "-- пусто"):
+            with self.assertRaises(ValueError):
+                _wrap_copy_query(query)
+
+    def test_load_excel_all_sheets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sheets.xlsx")
+            with pd.ExcelWriter(path) as writer:
+                pd.DataFrame({"X": [1, 2]}).to_excel(writer, sheet_name="First", index=False)
+                pd.DataFrame({"Y": [3]}).to_excel(writer, sheet_name="Second", index=False)
+
+            for workers in (1, 2):
+                frames = self.loader.load_excel(path, sheet_name=None, max_workers=workers)
+                self.assertEqual(list(frames), ["First", "Second"])
+                self.assertEqual(frames["First"]["X"].tolist(), [1, 2])
+                self.assertEqual(frames["Second"]["Y"].tolist(), [3])
+
+    def test_load_excel_engines(self):
+        self.assertEqual(DataLoader.excel_engine("a.xlsx", "openpyxl"), "openpyxl")
+        self.assertIn(DataLoader.excel_engine("a.xlsx"), ("calamine", "openpyxl"))
+        df = self.loader.load_excel(self.xlsx_file, engine="openpyxl")
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertIsNone(self.loader.load_excel(self.xlsx_file, sheet_name="Missing"))
+
+    def test_load_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(3):
+                pd.DataFrame({"A": [i, i], "B": ["x", "y"]}).to_csv(os.path.join(tmp, f"part{i}.csv"), index=False)
+            progress = []
+            df = self.loader.load_files(os.path.join(tmp, "*.csv"), max_workers=2,
+                                        progress=lambda done, total, path: progress.append((done, total)))
+            self.assertEqual(df["A"].tolist(), [0, 0, 1, 1, 2, 2])
+            self.assertIsInstance(df["source_file"].dtype, pd.CategoricalDtype)
+            self.assertEqual(df["source_file"].iloc[-1], "part2.csv")
+            self.assertEqual(progress[-1], (3, 3))
+
+            pd.DataFrame({"A": [9], "C": [1]}).to_csv(os.path.join(tmp, "part9.csv"), index=False)
+            self.assertIsNone(self.loader.load_files(tmp, max_workers=1))
+            df = self.loader.load_files(tmp, max_workers=1, strict_schema=False, source_column=None)
+            self.assertEqual(len(df), 7)
+            self.assertIn("C", df.columns)
+
+    def test_load_files_schema_by_column_set(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pd.DataFrame({"A": [1, 2], "B": ["x", "y"]}).to_csv(os.path.join(tmp, "part0.csv"), index=False)
+            # Тот же набор столбцов в другом порядке, float вместо int — схема совпадает
+            pd.DataFrame({"B": ["z"], "A": [3.5]}).to_csv(os.path.join(tmp, "part1.csv"), index=False)
+            df = self.loader.load_files(tmp, max_workers=1, source_column=None)
+            self.assertEqual(list(df.columns), ["A", "B"])
+            self.assertEqual(df["B"].tolist(), ["x", "y", "z"])
+
+            pd.DataFrame({"A": ["q"], "C": [1]}).to_csv(os.path.join(tmp, "part2.csv"), index=False)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertIsNone(self.loader.load_files(tmp, max_workers=1))
+            message = out.getvalue()
+            self.assertIn("нет столбцов ['B']", message)
+            self.assertIn("лишние столбцы ['C']", message)
+            self.assertIn("другие типы", message)
+
+    def test_load_parquet_and_arrow(self):
+        df = pd.DataFrame({"year": [2023, 2023, 2024, 2024], "amount": [1.0, -2.0, 3.0, 4.0], "name": list("abcd")})
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path = os.path.join(tmp, "data.parquet")
+            df.to_parquet(parquet_path, row_group_size=2)
+            result = self.loader.load_parquet(parquet_path, columns=["year", "amount"],
+                                              filters=[("year", "=", 2024)])
+            self.assertEqual(list(result.columns), ["year", "amount"])
+            self.assertEqual(result["amount"].tolist(), [3.0, 4.0])
+
+            arrow_path = os.path.join(tmp, "data.arrow")
+            df.to_feather(arrow_path)
+            result = self.loader.load_arrow(arrow_path, columns=["name", "amount"], filters=[("amount", ">", 0)])
+            self.assertEqual(result["name"].tolist(), ["a", "c", "d"])
+
+            import pyarrow as pa
+            stream_path = os.path.join(tmp, "data.arrows")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(stream_path, "wb") as sink, pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            result = self.loader.load_arrow(stream_path, columns=["year"])
+            self.assertEqual(result["year"].tolist(), [2023, 2023, 2024, 2024])
+
+            self.assertIsNone(self.loader.load_parquet(os.path.join(tmp, "missing.parquet")))
+
     def test_load_from_api_json(self):
         # Тест с моком будет в расширенной версии
         pass  # Заглушка для примера
 
+class MockApiHandler(BaseHTTPRequestHandler):
+    """Локальный API: 2500 записей с offset-, cursor- и Link-пагинацией."""
+    total = 2500
+    failures = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        limit = int(q.get("limit", 1000))
+        if parsed.path in ("/ndjson", "/array"):
+            records = [{"id": i, "meta": {"v": i * 2}} for i in range(self.total)]
+            if parsed.path == "/ndjson":
+                body = "\n".join(json.dumps(r) for r in records).encode()
+            else:
+                body = json.dumps(records).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if parsed.path == "/flaky" and MockApiHandler.failures.get("flaky", 0) > 0:
+            MockApiHandler.failures["flaky"] -= 1
+            return self._send({"error": "busy"}, status=503)
+        if parsed.path in ("/items", "/flaky"):
+            start = int(q.get("offset", 0))
+        elif parsed.path == "/cursor":
+            start = int(q.get("cursor", 0))
+        elif parsed.path == "/countdown":
+            # Курсор — число оставшихся страниц после запрошенной: у последней страницы он равен 0
+            pages = -(-self.total // limit)
+            start = (pages - 1 - int(q["cursor"])) * limit if "cursor" in q else 0
+        else:
+            start = int(q.get("page", 0)) * limit
+        records = [{"id": i, "meta": {"v": i * 2}} for i in range(start, min(start + limit, self.total))]
+        if parsed.path == "/cursor":
+            nxt = start + limit if start + limit < self.total else None
+            return self._send({"data": records, "next_cursor": nxt})
+        if parsed.path == "/countdown":
+            left = -(-(self.total - start - limit) // limit)
+            return self._send({"data": records, "next_cursor": left - 1 if left > 0 else None})
+        if parsed.path == "/link":
+            headers = {}
+            if start + limit < self.total:
+                port = self.server.server_address[1]
+                headers["Link"] = f'<http://127.0.0.1:{port}/link?page={start // limit + 1}&limit={limit}>; rel="next"'
+            return self._send(records, headers=headers)
+        return self._send({"data": records})
+
+
+class TestPaginatedApi(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), MockApiHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.loader = DataLoader(http_backoff=0)
+
+    def tearDown(self):
+        self.loader.close()
+
+    def test_offset_pagination(self):
+        pages = []
+        df = self.loader.load_from_api_paginated(f"{self.base}/items", records_key="data", max_workers=4,
+                                                 progress=lambda p, r: pages.append((p, r)))
+        self.assertEqual(len(df), 2500)
+        self.assertEqual(df["id"].tolist(), list(range(2500)))
+        self.assertIn("meta.v", df.columns)
+        self.assertEqual(pages[-1], (3, 2500))
+
+    def test_cursor_pagination(self):
+        df = self.loader.load_from_api_paginated(f"{self.base}/cursor", pagination="cursor", records_key="data")
+        self.assertEqual(df["id"].tolist(), list(range(2500)))
+
+    def test_cursor_pagination_zero_cursor(self):
+        # Курсор 0 — обычное значение, конец потока только при отсутствии курсора
+        df = self.loader.load_from_api_paginated(f"{self.base}/countdown", pagination="cursor", records_key="data")
+        self.assertEqual(df["id"].tolist(), list(range(2500)))
+
+    def test_link_pagination(self):
+        df = self.loader.load_from_api_paginated(f"{self.base}/link?page=0", pagination="link", page_size=700)
+        self.assertEqual(df["id"].tolist(), list(range(2500)))
+
+    def test_retry_on_503(self):
+        MockApiHandler.failures["flaky"] = 2
+        df = self.loader.load_from_api_paginated(f"{self.base}/flaky", records_key="data", max_workers=1)
+        self.assertEqual(len(df), 2500)
+
+    def test_stream_ndjson_and_array(self):
+        for path in ("/ndjson", "/array"):
+            df = self.loader.load_from_api(f"{self.base}{path}", stream=True, batch_size=300)
+            self.assertEqual(df["id"].tolist(), list(range(2500)), path)
+            self.assertIn("meta.v", df.columns)
+
+    def test_iter_json_records_small_chunks(self):
+        body = ' [ {"a": 12345, "s": "при\u0432ет"}, {"a": [1, 2]} ,\n{"a": -0.5e3} ] '.encode()
+        response = unittest.mock.Mock()
+        response.iter_content = lambda chunk_size: (body[i:i + 3] for i in range(0, len(body), 3))
+        records = list(DataLoader._iter_json_records(response))
+        self.assertEqual(records, [{"a": 12345, "s": "привет"}, {"a": [1, 2]}, {"a": -500.0}])
+
+    def test_load_from_api_uses_session(self):
+        df = self.loader.load_from_api(f"{self.base}/link", params={"limit": 5})
+        self.assertEqual(len(df), 5)
+        self.assertIsNotNone(self.loader._session)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
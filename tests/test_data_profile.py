@@ -0,0 +1,82 @@
+import unittest
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from data_analyze import DataAnalyzer
+from data_profile import DataProfile, column_mode
+from data_report import DataReport
+from data_validator import DataValidator
+
+class TestDataProfile(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "a": [1.0, 2.0, None, 4.0, 100.0, 2.0],
+            "b": [3, 1, 4, 1, 5, 9],
+            "c": ["x", "y", "x", None, "z", "x"],
+        })
+        self.profile = DataProfile(self.df)
+
+    def test_statistics_match_pandas_and_are_cached(self):
+        numeric = self.df[["a", "b"]]
+        for name in ("mean", "median", "std", "min", "max"):
+            pd.testing.assert_series_equal(self.profile.stat(name), getattr(numeric, name)(),
+                                           check_names=False, check_dtype=False)
+        pd.testing.assert_frame_equal(self.profile.corr(), numeric.corr())
+        pd.testing.assert_series_equal(self.profile.missing(), self.df.isna().sum())
+        count = self.profile.computations
+        self.profile.stat("mean")
+        self.profile.corr()
+        self.assertEqual(self.profile.computations, count)
+        with self.assertRaises(ValueError):
+            self.profile.stat("variance")
+
+    def test_mode_matches_pandas(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            "ints": rng.integers(-3, 20, 500),
+            "floats": rng.normal(size=500).round(1),
+            "big": rng.integers(0, 10**12, 500),
+            "ties": [1.5, 0.5] * 250,
+        })
+        expected = df.mode().iloc[0].astype(float)
+        pd.testing.assert_series_equal(DataProfile(df).mode(), expected, check_names=False)
+        self.assertTrue(np.isnan(column_mode(np.array([np.nan, np.nan]))))
+        # По выборке явное преобладающее значение находится так же
+        values = np.where(rng.random(10_000) < 0.3, 7.25, rng.normal(size=10_000))
+        self.assertEqual(column_mode(values, "approx", sample_size=1000), 7.25)
+
+    def test_summary_handles_missing_and_inf(self):
+        df = pd.DataFrame({"x": [np.inf, 1.0, None, 3.0], "empty": [np.nan] * 4})
+        summary = DataProfile(df).summary()
+        self.assertEqual(summary.loc["x", "max"], np.inf)
+        self.assertEqual(summary.loc["x", "min"], 1.0)
+        self.assertEqual(summary.loc["x", "median"], 3.0)
+        self.assertTrue(summary.loc["empty"].isna().all())
+
+    def test_shared_across_modules(self):
+        report = DataReport(self.df, profile=self.profile)
+        metrics = report.generate_key_metrics()
+        count = self.profile.computations
+        # Повторные метрики (PDF, Excel) и статистики анализатора берутся из кэша
+        report.generate_key_metrics()
+        with contextlib.redirect_stdout(io.StringIO()):
+            DataAnalyzer(self.df, profile=self.profile).find_anomalies()
+        self.assertEqual(self.profile.computations, count)
+        self.assertEqual(metrics["numeric_summary"]["a"]["median"], 2.0)
+
+        DataValidator.validate_data(self.df, verbose=False, profile=self.profile)
+        count = self.profile.computations
+        result = DataValidator.validate_data(self.df, verbose=False, profile=self.profile)
+        self.assertEqual(self.profile.computations, count)
+        self.assertEqual(result.missing["a"], 1)
+
+    def test_profile_for_other_frame_is_not_reused(self):
+        other = self.df.copy()
+        self.assertIs(DataProfile.of(self.df, self.profile), self.profile)
+        self.assertIsNot(DataProfile.of(other, self.profile), self.profile)
+        self.assertIsNot(DataReport(other, profile=self.profile).profile, self.profile)
+
+
+if __name__ == "__main__":
+    unittest.main()
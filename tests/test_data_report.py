@@ -18,6 +18,19 @@ class TestDataReport(unittest.TestCase):
         self.assertIn("rows", metrics)
         self.assertEqual(metrics["rows"], 3)
 
+    def test_generate_key_metrics_chunks(self):
+        df = pd.DataFrame({"A": [1, 2, None, 4, 5, 6], "B": [2.0, 1.0, 7.0, 3.0, None, 8.0]})
+        expected = DataReport(df).generate_key_metrics()
+        chunks = (df.iloc[i:i + 4] for i in range(0, len(df), 4))
+        metrics = DataReport(report_name="stream").generate_key_metrics(chunks=chunks)
+        self.assertEqual(metrics["rows"], 6)
+        self.assertEqual(metrics["missing_values_total"], expected["missing_values_total"])
+        for col in ("A", "B"):
+            for key in ("mean", "median", "std", "min", "max"):
+                self.assertAlmostEqual(metrics["numeric_summary"][col][key],
+                                       expected["numeric_summary"][col][key], places=6)
+        self.assertAlmostEqual(metrics["correlation"]["A"]["B"], expected["correlation"]["A"]["B"], places=6)
+
     def test_export_pdf(self):
         pdf_path = self.report.export_pdf(os.path.join(self.out_dir, "test.pdf"))
         self.assertTrue(os.path.exists(pdf_path))
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+import pandas as pd
+from data_rules import RuleSet, HAS_YAML
+from data_validator import DataValidator
+
+class TestRuleSet(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "id": [1, 2, 3, 3, 5, 6],
+            "age": [25, -1, 40, None, 200, 33],
+            "email": ["a@b.ru", "bad", "c@d.com", "e@f.org", None, "g@h.ru"],
+            "country": pd.Series(["RU", "KZ", "XX", "RU", "BY", "RU"], dtype="category"),
+            "client": [10, 11, 12, 99, None, 10],
+            "start": [1, 2, 3, 4, 5, 6],
+            "end": [2, 3, 1, 5, 6, 7],
+        })
+        self.spec = {
+            "columns": {
+                "id": {"dtype": "int", "nullable": False, "unique": True},
+                "age": {"dtype": "number", "nullable": False, "min": 0, "max": 130},
+                "email": {"pattern": r"^[^@]+@[^@]+\.[a-z]+$"},
+                "country": {"isin": ["RU", "KZ", "BY"]},
+                "client": {"foreign_key": "clients.id"},
+            },
+            "checks": [{"name": "dates_order", "expr": "start <= end"}],
+        }
+        self.references = {"clients": pd.DataFrame({"id": [10, 11, 12]})}
+
+    def counts(self, report):
+        return {r.name: r.violations for r in report.results}
+
+    def test_violation_counts(self):
+        report = RuleSet(self.spec).validate(self.df, references=self.references, verbose=False)
+        counts = self.counts(report)
+        self.assertEqual(counts["id.unique"], 1)
+        self.assertEqual(counts["id.nullable"], 0)
+        self.assertEqual(counts["age.nullable"], 1)
+        self.assertEqual(counts["age.min"], 1)
+        self.assertEqual(counts["age.max"], 1)
+        self.assertEqual(counts["email.pattern"], 1)
+        self.assertEqual(counts["country.isin"], 1)
+        self.assertEqual(counts["client.foreign_key"], 1)
+        self.assertEqual(counts["dates_order"], 1)
+        self.assertFalse(report.ok)
+        failed = {r.name: r for r in report.failed}
+        self.assertEqual(failed["age.min"].sample_index, [1])
+        json.dumps(report.to_dict())
+
+    def test_chunks_match_full(self):
+        rules = RuleSet(self.spec)
+        full = rules.validate(self.df, references=self.references, verbose=False)
+        chunks = (self.df.iloc[i:i + 2] for i in range(0, len(self.df), 2))
+        streamed = rules.validate(chunks, references=self.references, verbose=False)
+        self.assertEqual(self.counts(full), self.counts(streamed))
+        self.assertEqual(streamed.rows, len(self.df))
+
+    def test_dtype_mismatch_counts_bad_values(self):
+        df = pd.DataFrame({"n": ["1", "2.5", "x", None]})
+        report = RuleSet({"columns": {"n": {"dtype": "int"}}}).validate(df, verbose=False)
+        self.assertEqual(report.results[0].violations, 2)
+
+    def test_missing_reference_and_column(self):
+        spec = {"columns": {"client": {"foreign_key": "clients.id"}, "nope": {"nullable": False}}}
+        report = RuleSet(spec).validate(self.df, verbose=False)
+        self.assertTrue(all(r.error for r in report.results))
+
+    def test_unique_confirms_hash_matches(self):
+        # Все хэши совпадают (как при коллизии): нарушением считается только настоящий повтор
+        constant = lambda df: np.zeros(len(df), dtype=np.uint64)
+        with unittest.mock.patch("data_rules.row_hashes", constant), \
+                unittest.mock.patch("chunk_stats.row_hashes", constant):
+            report = RuleSet(self.spec).validate(self.df, references=self.references, verbose=False)
+        self.assertEqual(self.counts(report)["id.unique"], 1)
+        self.assertEqual(RuleSet(self.spec).reference_tables, ["clients"])
+
+    def test_string_dtype_checks_content(self):
+        df = pd.DataFrame({
+            "mixed": pd.Series(["x", 1, b"y", None, "z", 2.5], dtype=object),
+            "text": ["p", "q", "r", "s", "t", "u"],
+            "cat": pd.Series(["x", 1, "x", "y", 1, "x"], dtype="category"),
+            "num": range(6),
+        })
+        spec = {"columns": {col: {"dtype": "string"} for col in df.columns}}
+        report = RuleSet(spec).validate(df, verbose=False)
+        self.assertEqual(self.counts(report), {"mixed.dtype": 3, "text.dtype": 0, "cat.dtype": 2, "num.dtype": 6})
+
+    def test_unknown_rule(self):
+        with self.assertRaises(ValueError):
+            RuleSet({"columns": {"id": {"between": [1, 2]}}})
+
+    def test_from_file_via_validator(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.spec, f)
+            report = DataValidator.validate_rules(self.df, path, references=self.references, verbose=False)
+            self.assertEqual(self.counts(report)["id.unique"], 1)
+            if HAS_YAML:
+                import yaml
+                path = os.path.join(tmp, "rules.yaml")
+                with open(path, "w", encoding="utf-8") as f:
+                    yaml.safe_dump(self.spec, f)
+                report = DataValidator.validate_rules(self.df, path, references=self.references, verbose=False)
+                self.assertEqual(self.counts(report)["age.max"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
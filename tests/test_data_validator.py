@@ -0,0 +1,185 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from scipy import stats
+from unittest import mock
+import chunk_stats
+from chunk_stats import ChunkStats, KLLSketch, duplicated_rows
+from data_validator import DataValidator, ValidationEvent, ValidationResult
+
+class TestDataValidator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 2001
+        self.df = pd.DataFrame({
+            "heavy": rng.standard_t(3, size=n),
+            "with_nan": np.where(rng.random(n) < 0.1, np.nan, rng.normal(size=n)),
+            "ints": rng.integers(0, 100, size=n),
+            "const": 1.0,
+            "text": rng.choice(["a", "b"], size=n),
+        })
+        self.df = pd.concat([self.df, self.df.head(3)], ignore_index=True)
+
+    def test_validate_returns_result(self):
+        result = DataValidator.validate_data(self.df, verbose=False)
+        self.assertIsInstance(result, ValidationResult)
+        self.assertEqual(result.rows, len(self.df))
+        self.assertEqual(result.duplicates, 3)
+        self.assertEqual(result.missing["with_nan"], int(self.df["with_nan"].isna().sum()))
+        self.assertEqual(set(result.numeric), {"heavy", "with_nan", "ints", "const"})
+
+    def test_outliers_match_reference(self):
+        # Эталон — прежняя реализация: цикл по столбцам с quantile и scipy.stats.zscore
+        result = DataValidator.validate_data(self.df, verbose=False)
+        for col in result.numeric:
+            data = self.df[col].dropna()
+            q1, q3 = data.quantile(0.25), data.quantile(0.75)
+            iqr = q3 - q1
+            expected_iqr = int(((data < q1 - 1.5 * iqr) | (data > q3 + 1.5 * iqr)).sum())
+            with np.errstate(invalid="ignore", divide="ignore"):
+                expected_z = int((np.abs(stats.zscore(data)) > 3).sum())
+            self.assertAlmostEqual(result.numeric[col]["q1"], q1)
+            self.assertAlmostEqual(result.numeric[col]["q3"], q3)
+            self.assertEqual(result.numeric[col]["iqr_outliers"], expected_iqr, col)
+            self.assertEqual(result.numeric[col]["z_outliers"], expected_z, col)
+
+    def test_to_dict_is_plain(self):
+        result = DataValidator.validate_data(self.df, verbose=False)
+        json.dumps(result.to_dict())
+
+    def test_not_dataframe(self):
+        self.assertIsNone(DataValidator.validate_data(42))
+
+    def test_progress_events(self):
+        events = []
+        with mock.patch("builtins.print") as fake_print:
+            result = DataValidator.validate_data(self.df, verbose=False, progress=events.append)
+        fake_print.assert_not_called()
+        self.assertTrue(all(isinstance(e, ValidationEvent) for e in events))
+        self.assertEqual(events[0].stage, "start")
+        self.assertEqual(events[-1].stage, "done")
+        fractions = [e.fraction for e in events]
+        self.assertEqual(fractions, sorted(fractions))
+        restored = json.loads(result.to_json())
+        self.assertEqual(restored["duplicates"], result.duplicates)
+
+    def test_progress_events_for_chunks(self):
+        events = []
+        chunks = (self.df.iloc[i:i + 500] for i in range(0, len(self.df), 500))
+        DataValidator.validate_data(chunks, verbose=False, progress=events.append)
+        self.assertEqual(sum(e.stage == "chunk" for e in events), 5)
+        self.assertEqual(events[-1].stage, "done")
+
+    def test_duplicate_subset(self):
+        result = DataValidator.validate_data(self.df, verbose=False, duplicate_subset=["text"])
+        self.assertEqual(result.duplicates, int(self.df.duplicated(subset=["text"]).sum()))
+
+    def test_duplicated_rows_matches_pandas(self):
+        df = self.df.copy()
+        df.loc[::5, "text"] = None
+        for keep in ("first", "last", False):
+            np.testing.assert_array_equal(duplicated_rows(df, keep=keep), df.duplicated(keep=keep).to_numpy())
+
+    def test_duplicated_rows_confirms_collisions(self):
+        # Все строки с одним хэшем: результат всё равно должен совпасть с точным сравнением
+        with mock.patch.object(chunk_stats, "row_hashes", lambda df: np.zeros(len(df), dtype=np.uint64)):
+            mask = duplicated_rows(self.df, subset=["ints", "text"])
+        np.testing.assert_array_equal(mask, self.df.duplicated(subset=["ints", "text"]).to_numpy())
+
+    def test_duplicated_rows_with_pyarrow_strings_and_na(self):
+        df = pd.DataFrame({
+            "s": pd.array(["a", None, "a", None, "b", None], dtype="string[pyarrow]"),
+            "n": pd.array([1, 2, 1, 2, None, None], dtype="Int64"),
+        })
+        for keep in ("first", "last", False):
+            np.testing.assert_array_equal(duplicated_rows(df, keep=keep), df.duplicated(keep=keep).to_numpy())
+        # Одинаковый хэш у всех строк: пары NA/значение сравниваются без ошибки
+        with mock.patch.object(chunk_stats, "row_hashes", lambda df: np.zeros(len(df), dtype=np.uint64)):
+            np.testing.assert_array_equal(duplicated_rows(df), df.duplicated().to_numpy())
+        self.assertEqual(DataValidator.validate_data(df, verbose=False).duplicates, 2)
+
+class TestStreamingValidation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n = 200_000
+        self.df = pd.DataFrame({
+            "x": rng.standard_t(4, size=n),
+            "y": np.where(rng.random(n) < 0.05, np.nan, rng.exponential(size=n)),
+            "k": rng.integers(0, 50, size=n),
+        })
+        self.df = pd.concat([self.df, self.df.sample(1000, random_state=0)], ignore_index=True)
+
+    def chunks(self, size=30_000):
+        return (self.df.iloc[i:i + size] for i in range(0, len(self.df), size))
+
+    def test_stream_matches_full_within_bounds(self):
+        full = DataValidator.validate_data(self.df, verbose=False)
+        stream = DataValidator.validate_chunks(self.chunks(), verbose=False)
+        self.assertTrue(stream.approximate)
+        self.assertEqual(stream.rows, full.rows)
+        self.assertEqual(stream.duplicates, full.duplicates)
+        self.assertEqual(stream.missing, full.missing)
+        eps = 2 * KLLSketch(400).rank_error
+        for col, exact in full.numeric.items():
+            approx = stream.numeric[col]
+            n = exact["count"]
+            self.assertAlmostEqual(approx["mean"], exact["mean"], places=8)
+            self.assertAlmostEqual(approx["std"], exact["std"], places=8)
+            sorted_col = np.sort(self.df[col].dropna().to_numpy())
+            for q in ("q1", "q3"):
+                # С учётом повторяющихся значений: целевой ранг должен попасть в диапазон рангов оценки
+                lo = np.searchsorted(sorted_col, approx[q], side="left")
+                hi = np.searchsorted(sorted_col, approx[q], side="right")
+                target = (0.25 if q == "q1" else 0.75) * n
+                self.assertTrue(lo - eps * n <= target <= hi + eps * n, (col, q))
+            for key in ("iqr_outliers", "z_outliers"):
+                self.assertLessEqual(abs(approx[key] - exact[key]), eps * n + 1, (col, key))
+
+    def test_merge_equals_single_pass(self):
+        parts = [ChunkStats().update(chunk) for chunk in self.chunks(50_000)]
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        single = ChunkStats()
+        for chunk in self.chunks(50_000):
+            single.update(chunk)
+        self.assertEqual(merged.rows, single.rows)
+        self.assertEqual(merged.duplicates, single.duplicates)
+        np.testing.assert_allclose(merged.mean, single.mean)
+        np.testing.assert_allclose(merged.m2, single.m2)
+        result = DataValidator.validate_chunks(iter([]), stats=merged, verbose=False)
+        self.assertEqual(result.rows, len(self.df))
+
+    def test_correlation_with_large_offset(self):
+        # Значения ~1e9 с единичной дисперсией: сырые суммы n·Σxy − Σx·Σy здесь теряют все знаки
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=50_000)
+        df = pd.DataFrame({"a": 1e9 + x, "b": 1e9 + x + 0.5 * rng.normal(size=50_000),
+                           "c": np.where(rng.random(50_000) < 0.1, np.nan, rng.normal(size=50_000))})
+        parts = [ChunkStats().update(df.iloc[i:i + 7000]) for i in range(0, len(df), 7000)]
+        acc = parts[0]
+        for part in parts[1:]:
+            acc.merge(part)
+        np.testing.assert_allclose(acc.correlation().to_numpy(), df.corr().to_numpy(), atol=1e-7)
+
+    def test_seen_hashes_stay_in_few_runs(self):
+        acc = ChunkStats()
+        for chunk in self.chunks(1000):
+            acc.update(chunk)
+        self.assertEqual(acc.duplicates, int(self.df.duplicated().sum()))
+        runs = acc._seen_hashes.runs
+        self.assertLessEqual(len(runs), 2 * np.log2(len(self.df)))
+        self.assertEqual(sum(len(r) for r in runs), len(self.df) - 1000)
+
+    def test_duplicate_sketch_after_exact_limit(self):
+        acc = ChunkStats(max_exact_rows=10_000)
+        for chunk in self.chunks():
+            acc.update(chunk)
+        self.assertFalse(acc.exact_duplicates)
+        distinct = len(self.df) - 1000
+        # HyperLogLog: относительная ошибка ~0.8%, проверяем с запасом 3σ
+        self.assertLessEqual(abs(acc.duplicates - 1000), 0.025 * distinct)
+
+if __name__ == "__main__":
+    unittest.main()